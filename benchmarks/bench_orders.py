@@ -0,0 +1,46 @@
+"""
+Benchmarks du chemin des commandes (pytest-benchmark) : parsing des datagrammes et tri par marge (slack).
+"""
+from functools import partial
+import pytest
+from conftest import T0
+from benchmarks.parser_throughput import make_datagrams, legacy_parse
+from pizzeria.classes.clock import SimulatedClock
+from pizzeria.classes.memory_db import MemoryDatabase
+from pizzeria.classes.parser import parse_order
+from pizzeria.classes.stats import SharedContext, PizzeriaStats
+
+BATCH_SIZES = [10, 100, 1_000]
+
+@pytest.fixture(scope="module")
+def datagrams() -> list[bytes]:
+    return make_datagrams(1_000)
+
+@pytest.fixture(scope="module")
+def state(request, order_processor):
+    """Moteur sur les données de server/init.sql (en mémoire)."""
+    context = SharedContext()
+    context.stats = PizzeriaStats()
+    db = MemoryDatabase.from_sql(str(request.config.rootpath.parent / "server" / "init.sql"))
+    return order_processor.EngineState(db, context, clock=SimulatedClock(T0))
+
+@pytest.mark.benchmark(group="parsing (1000 commandes)")
+def test_parse_order(benchmark, datagrams):
+    orders = benchmark(lambda: [parse_order(data) for data in datagrams])
+    assert len(orders) == len(datagrams)
+
+@pytest.mark.benchmark(group="parsing (1000 commandes)")
+def test_legacy_order(benchmark, datagrams):
+    orders = benchmark(lambda: [legacy_parse(data) for data in datagrams])
+    assert len(orders) == len(datagrams)
+
+@pytest.mark.benchmark(group="slack sort")
+@pytest.mark.parametrize("batch_size", BATCH_SIZES, ids=lambda n: f"batch={n}")
+def test_slack_sort(benchmark, state, order_processor, batch_size):
+    """Tri d'un lot par marge croissante (comme flush_batch), clients connus."""
+    from benchmarks.replay import generate_log
+    calculate_slack = order_processor.calculate_slack
+    orders = [parse_order(data) for data in generate_log(state.db, batch_size, rate=2.0)]
+    ranked = benchmark(sorted, orders, key=partial(calculate_slack, state=state))
+    slacks = [calculate_slack(o, state) for o in ranked]
+    assert slacks == sorted(slacks)
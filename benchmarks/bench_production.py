@@ -0,0 +1,72 @@
+"""
+Benchmarks du cœur d'ordonnancement (pytest-benchmark).
+
+USE:
+    python -m pytest benchmarks                          # résultats enregistrés dans .benchmarks/
+    python -m pytest benchmarks --benchmark-compare      # compare au dernier enregistrement
+    python -m pytest benchmarks --benchmark-compare-fail=median:10%
+"""
+from datetime import timedelta
+import pytest
+from conftest import T0, CAPACITY, PLANNING_LENGTHS, STATION_COUNTS, make_manager
+
+@pytest.mark.benchmark(group="calculate_earliest_start")
+def test_earliest_start_free(benchmark, station):
+    """Cas favorable : 2 pizzas, il y a de la place dès T0."""
+    assert benchmark(station.calculate_earliest_start, "Reine", "G", 2, 6, T0) == T0
+
+@pytest.mark.benchmark(group="calculate_earliest_start")
+def test_earliest_start_full(benchmark, station):
+    """Pire cas : un four entier, il faut attendre la fin de tout le planning."""
+    start = benchmark(station.calculate_earliest_start, "Reine", "G", CAPACITY, 6, T0)
+    assert start >= max(task.end for task in station.planning)
+
+@pytest.mark.benchmark(group="check_capacity_interval")
+def test_check_capacity_interval(benchmark, station):
+    """Fenêtre de 10 min au milieu du planning."""
+    middle = station.planning[len(station.planning) // 2].start
+    assert benchmark(station.check_capacity_interval, middle, middle + timedelta(minutes=10), 1)
+
+@pytest.mark.benchmark(group="find_and_assign_station")
+@pytest.mark.parametrize("planning_length", PLANNING_LENGTHS, ids=lambda n: f"planning={n}")
+@pytest.mark.parametrize("stations", STATION_COUNTS, ids=lambda n: f"stations={n}")
+def test_find_and_assign_station(benchmark, stations, planning_length):
+    """
+    Choix du poste + réservation. La réservation est annulée après chaque appel
+    (planning de taille constante d'une mesure à l'autre) : l'annulation est comptée dans la mesure.
+    """
+    manager = make_manager(stations, planning_length)
+    by_id = {station.id: station for station in manager.stations}
+    deadline = T0 + timedelta(days=7)
+
+    def assign_and_rollback():
+        station_id, end = manager.find_and_assign_station("Reine", "G", 4, 6, deadline)
+        by_id[station_id].cancel_task(end - timedelta(minutes=6), end, 4)
+        return end
+
+    assert benchmark(assign_and_rollback) is not None
+    assert all(len(station.planning) == planning_length for station in manager.stations)
+
+@pytest.mark.benchmark(group="find_best_station (postes spécialisés)")
+@pytest.mark.parametrize("stations", [24, 96], ids=lambda n: f"stations={n}")
+def test_find_best_station_mixed_floor(benchmark, stations):
+    """Recherche seule sur un atelier hétérogène : seuls les postes éligibles sont examinés."""
+    manager = make_manager(stations, 1_000, mixed=True)
+    station, start = benchmark(manager.find_best_station, "Veggie", "G", 4, 6, T0 + timedelta(days=7))
+    assert station.accepts("Veggie", "G", 4)
+
+@pytest.mark.benchmark(group="find_best_station (minorants / tous les postes)")
+@pytest.mark.parametrize("bounded", [True, False], ids=["minorants", "exhaustif"])
+@pytest.mark.parametrize("quantity", [4, 24], ids=lambda n: f"qté={n}")
+@pytest.mark.parametrize("stations", [24, 96], ids=lambda n: f"stations={n}")
+def test_find_best_station_bounded(benchmark, stations, quantity, bounded):
+    """
+    Recherche seule au milieu des plannings (four chargé) : postes triés par minorant de démarrage
+    contre parcours de tous les postes éligibles. Les minorants restent en cache d'un appel à l'autre,
+    comme entre deux commandes qui ne touchent pas les mêmes postes.
+    """
+    manager = make_manager(stations, 1_000)
+    manager.clock.advance_to(T0 + timedelta(hours=4))
+    manager.bounded_search = bounded
+    station, start = benchmark(manager.find_best_station, "Reine", "G", quantity, 6, T0 + timedelta(days=7))
+    assert station is not None and start >= T0 + timedelta(hours=4)
@@ -0,0 +1,36 @@
+"""
+Mémoire occupée par la table client chargée au lancement :
+dict {id: Client} contre ClientIndex (deux arrays triés : IDs 'q', distances 'i').
+
+USE:
+    python -m benchmarks.client_memory [nb_clients]
+"""
+import sys
+import random
+import tracemalloc
+from pizzeria.classes.client import Client, ClientIndex
+
+def measure(build) -> tuple[int, int]:
+    """(mémoire retenue, pic) en octets pendant la construction."""
+    tracemalloc.start()
+    table = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+    return current, peak
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(42)
+    rows = [(500000 + i, rng.randint(5, 45)) for i in range(count)]
+
+    dict_mem, dict_peak = measure(lambda: {c.id: c for c in (Client(*row) for row in rows)})
+    index_mem, index_peak = measure(lambda: ClientIndex.from_pairs(iter(rows)))
+
+    mb = 1024 * 1024
+    print(f"[BENCH] > Clients             : {count}")
+    print(f"[BENCH] > dict[id, Client]    : {dict_mem / mb:8.1f} Mo (pic {dict_peak / mb:8.1f} Mo) | {dict_mem / count:6.1f} octets/client")
+    print(f"[BENCH] > ClientIndex         : {index_mem / mb:8.1f} Mo (pic {index_peak / mb:8.1f} Mo) | {index_mem / count:6.1f} octets/client")
+    # Ce que l'index déclare pour ses arrays (le reste : marge de croissance des arrays, sets/dict annexes)
+    data = ClientIndex.from_pairs(iter(rows)).memory_usage()
+    print(f"[BENCH] >   dont arrays       : {data / mb:8.1f} Mo | {data / count:6.1f} octets/client")
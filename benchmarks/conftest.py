@@ -0,0 +1,58 @@
+"""
+Plannings synthétiques pour les benchmarks pytest (bench_*.py), sans PostgreSQL :
+les postes sont construits via MemoryDatabase, le temps est celui d'une SimulatedClock.
+"""
+import random
+from datetime import datetime, timedelta
+import pytest
+from pizzeria.classes.clock import SimulatedClock
+from pizzeria.classes.memory_db import MemoryDatabase
+from pizzeria.classes.production import ProductionManager, ProductionStation
+
+T0 = datetime(2025, 11, 26, 10, 0, 0)
+CAPACITY = 32
+PIZZAS = ["Veggie", "Margarita", "Reine", "Carnivore", "Orientale", "Andalouse", "4_Fromages", "Chevre", "Chorizo", "Calzone"]
+
+# Paramètres communs : nombre de tâches par poste, nombre de postes
+PLANNING_LENGTHS = [10, 100, 1_000, 10_000]
+STATION_COUNTS = [1, 6, 24]
+
+def fill_planning(station: ProductionStation, length: int, seed: int = 0) -> ProductionStation:
+    """
+    Planning réaliste : une tâche toutes les 30 s à partir de T0, 5 à 7 min de cuisson,
+    1 ou 2 pizzas -> une douzaine de tâches simultanées, le four n'est jamais plein (< 32).
+    """
+    rng = random.Random(seed * 100_003 + station.id)
+    for i in range(length):
+        start = T0 + timedelta(seconds=30 * i)
+        station.assign_task(rng.choice(PIZZAS), rng.choice("GM"), rng.randint(1, 2), rng.randint(5, 7), start)
+    return station
+
+def make_manager(stations: int, planning_length: int, mixed: bool = False) -> ProductionManager:
+    """
+    Gestionnaire de 'stations' postes, chacun avec 'planning_length' tâches.
+    mixed : postes spécialisés (un tiers M, un tiers G, un quart sans Veggie) au lieu de polyvalents.
+    """
+    if mixed:
+        rows = [(i, CAPACITY, True, "-MG"[i % 3], "Veggie" if i % 4 == 0 else "-") for i in range(1, stations + 1)]
+    else:
+        rows = [(i, CAPACITY, True, "-", "-") for i in range(1, stations + 1)]
+    db = MemoryDatabase({"Production": rows})
+    manager = ProductionManager(db, SimulatedClock(T0))
+    for station in manager.stations:
+        fill_planning(station, planning_length)
+    return manager
+
+@pytest.fixture(scope="session")
+def order_processor():
+    """
+    Moteur complet, importé seulement par les benchmarks qui s'en servent :
+    il tire psycopg2 (via Database), sans lequel le reste de la suite doit quand même tourner.
+    """
+    pytest.importorskip("psycopg2", reason="pizzeria.order_processor importe psycopg2")
+    from pizzeria import order_processor
+    return order_processor
+
+@pytest.fixture(params=PLANNING_LENGTHS, ids=lambda n: f"planning={n}")
+def station(request) -> ProductionStation:
+    return fill_planning(ProductionStation(1, CAPACITY, True, "-", "-"), request.param)
@@ -0,0 +1,58 @@
+"""
+Benchmark du parsing des commandes : chemin historique (decode + split + Order/strptime)
+contre le parser rapide sur les octets (pizzeria.classes.parser).
+
+USE:
+    python -m benchmarks.parser_throughput [nb_commandes]
+"""
+import sys
+import random
+import time
+from datetime import datetime, timedelta
+from pizzeria.classes.order import Order
+from pizzeria.classes.parser import parse_order
+
+PIZZAS = ["Veggie", "Margarita", "Reine", "Carnivore", "Orientale", "Andalouse", "4_Fromages", "Chevre", "Chorizo", "Calzone"]
+
+def make_datagrams(count: int) -> list[bytes]:
+    """Commandes au format du broadcaster (server/order_broadcaster.py)."""
+    rng = random.Random(42)
+    start = datetime(2025, 11, 26, 10, 0, 0)
+    datagrams = []
+    for i in range(count):
+        now = start + timedelta(seconds=i // 10)
+        delivery = now + timedelta(minutes=rng.randint(30, 90))
+        datagrams.append(
+            f"{now.strftime('%d/%m/%Y %H:%M:%S')},{rng.randint(500000, 600000)},{rng.choice(PIZZAS)},"
+            f"{rng.choice('GM')},{rng.randint(1, 5)},{delivery.strftime('%H:%M')}".encode()
+        )
+    return datagrams
+
+def legacy_parse(data: bytes) -> Order:
+    return Order(*data.decode().split(','))
+
+def measure(parse, datagrams: list[bytes], rounds: int = 5) -> float:
+    """Meilleur débit (commandes/s) sur plusieurs passes."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for data in datagrams:
+            parse(data)
+        best = min(best, time.perf_counter() - start)
+    return len(datagrams) / best
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    datagrams = make_datagrams(count)
+
+    # Les deux parsers doivent donner le même résultat (received_at : instant du décodage, forcément différent)
+    fields = [f for f in Order.__slots__ if f != "received_at"]
+    for data in datagrams[:1000]:
+        a, b = legacy_parse(data), parse_order(data)
+        assert all(getattr(a, f) == getattr(b, f) for f in fields), data
+
+    legacy = measure(legacy_parse, datagrams)
+    fast = measure(parse_order, datagrams)
+    print(f"[BENCH] > Commandes        : {count}")
+    print(f"[BENCH] > Order + strptime : {legacy:>12,.0f} commandes/s")
+    print(f"[BENCH] > parse_order      : {fast:>12,.0f} commandes/s  (x{fast / legacy:.1f})")
@@ -0,0 +1,168 @@
+"""
+Rejoue un journal de commandes (même format que server/order_broadcaster.py,
+une commande par ligne) dans le moteur, avec une horloge simulée et une BDD en mémoire :
+le temps ne s'écoule qu'au rythme des horodatages du journal, donc aussi vite que le CPU.
+
+Le batching (BATCH_SIZE / BUFFER_TIMEOUT) est le même qu'en fonctionnement réel,
+mais mesuré en temps SIMULÉ.
+
+USE:
+    python -m benchmarks.replay commandes.log [--sql server/init.sql]
+    python -m benchmarks.replay --generate 10000 [--rate 2.0] [--scheduler lookahead] [--journal /tmp/journal]
+
+Rapport :
+-> Débit (commandes/s, temps réel)
+-> Taux d'acceptation et chiffre d'affaires accepté
+-> Latence par commande : attente dans le buffer (temps simulé) et calcul (temps réel)
+"""
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from pizzeria.classes.clock import SimulatedClock
+from pizzeria.classes.memory_db import MemoryDatabase
+from pizzeria.classes.metrics import Histogram
+from pizzeria.classes.parser import parse_order, OrderParseError
+from pizzeria.classes.stats import SharedContext, PizzeriaStats
+from pizzeria.order_processor import EngineState, flush_batch, BATCH_SIZE, BUFFER_TIMEOUT, SCHEDULERS
+
+def read_log(path: str) -> list[bytes]:
+    """Lignes du journal (accepte aussi la sortie du broadcaster : "Commande envoyée : ...")."""
+    datagrams = []
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if b" : " in line: line = line.rsplit(b" : ", 1)[1]
+            if line: datagrams.append(line)
+    return datagrams
+
+def generate_log(db: MemoryDatabase, count: int, rate: float, seed: int = 42) -> list[bytes]:
+    """Journal synthétique : arrivées de Poisson à 'rate' commandes/s, clients et pizzas de la BDD."""
+    rng = random.Random(seed)
+    client_ids = [row[0] for row in db.rows["Client"]]
+    pizzas = [(row[0], row[1]) for row in db.rows["Pizza"]]
+    now = datetime(2025, 11, 26, 10, 0, 0)
+    datagrams = []
+    for _ in range(count):
+        now += timedelta(seconds=rng.expovariate(rate))
+        name, size = rng.choice(pizzas)
+        delivery = now + timedelta(minutes=rng.randint(30, 90))
+        datagrams.append(
+            f"{now.strftime('%d/%m/%Y %H:%M:%S')},{rng.choice(client_ids)},{name},{size},"
+            f"{rng.randint(1, 5)},{delivery.strftime('%H:%M')}".encode()
+        )
+    return datagrams
+
+def replay(datagrams: list[bytes], db: MemoryDatabase, batch_size: int = BATCH_SIZE, buffer_timeout: float = BUFFER_TIMEOUT, scheduler: str = "greedy", journal: str | None = None) -> dict:
+    """
+    Fait passer le journal dans le moteur et retourne les compteurs du rapport.
+    journal : dossier du journal des décisions du moteur (repris s'il existe déjà, cf. EngineState.open_journal)
+    """
+    orders, malformed = [], 0
+    for data in datagrams:
+        try:
+            orders.append(parse_order(data))
+        except OrderParseError:
+            malformed += 1
+    if not orders:
+        return {"orders": 0, "malformed": malformed}
+
+    clock = SimulatedClock(orders[0].timestamp)
+    context = SharedContext()
+    context.stats = PizzeriaStats()
+    state = EngineState(db, context, clock=clock, scheduler=scheduler)
+    if journal: state.open_journal(journal)
+
+    wait = Histogram("replay_wait_seconds", "Attente dans le buffer (temps simulé)")
+    compute = Histogram("replay_compute_seconds", "Calcul par commande (temps réel)")
+    accepted = refused = 0
+    revenue = 0
+    flushes = Histogram("replay_flush_seconds", "Calcul par lot (temps réel)")
+    buffer, buffer_start = [], None
+
+    def flush(trigger: str) -> None:
+        nonlocal accepted, refused, revenue
+        flush_start = time.perf_counter()
+        decisions = flush_batch(state, buffer, trigger)
+        flush_time = time.perf_counter() - flush_start
+        flushes.observe(flush_time)
+        per_order = flush_time / len(buffer)
+        for order, ok in zip(buffer, decisions):
+            wait.observe((clock.now() - order.timestamp).total_seconds())
+            compute.observe(per_order)
+            if ok:
+                accepted += 1
+                revenue += int(state.catalog.get(order.pizza_name, order.pizza_size).price or 0) * order.quantity
+            else: refused += 1
+        buffer.clear()
+
+    timeout = timedelta(seconds=buffer_timeout)
+    start = time.perf_counter()
+    for order in orders:
+        # Le timeout du buffer est tombé AVANT l'arrivée de cette commande
+        if buffer and order.timestamp >= buffer_start + timeout:
+            clock.advance_to(buffer_start + timeout)
+            flush(f"TIMEOUT ({buffer_timeout}s)")
+
+        clock.advance_to(order.timestamp)
+        if not buffer: buffer_start = clock.now()
+        buffer.append(order)
+        if len(buffer) >= batch_size:
+            flush("TAILLE ATTEINTE")
+
+    if buffer:
+        clock.advance_to(buffer_start + timeout)
+        flush(f"TIMEOUT ({buffer_timeout}s)")
+    elapsed = time.perf_counter() - start
+    state.close()
+
+    return {
+        "orders": len(orders),
+        "malformed": malformed,
+        "elapsed": elapsed,
+        "simulated": clock.monotonic(),
+        "accepted": accepted,
+        "refused": refused,
+        "revenue": revenue,
+        "flushes": flushes,
+        "wait": wait,
+        "compute": compute,
+        "db_round_trips": db.round_trips
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rejoue un journal de commandes dans le moteur (horloge simulée, BDD en mémoire)")
+    parser.add_argument("log", nargs="?", help="Journal de commandes (une commande par ligne)")
+    parser.add_argument("--sql", default="server/init.sql", help="Script SQL dont les INSERT remplissent la BDD en mémoire")
+    parser.add_argument("--generate", type=int, metavar="N", help="Génère N commandes au lieu de lire un journal")
+    parser.add_argument("--rate", type=float, default=2.0, help="Commandes/s (temps simulé) du journal généré")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--timeout", type=float, default=BUFFER_TIMEOUT, help="Timeout du buffer (s, temps simulé)")
+    parser.add_argument("--scheduler", choices=SCHEDULERS, default="greedy")
+    parser.add_argument("--journal", metavar="DOSSIER", help="Journalise les décisions du moteur dans ce dossier")
+    args = parser.parse_args()
+
+    db = MemoryDatabase.from_sql(args.sql)
+    if args.generate:
+        datagrams = generate_log(db, args.generate, args.rate)
+    elif args.log:
+        datagrams = read_log(args.log)
+    else:
+        parser.error("Un journal ou --generate N est nécessaire.")
+
+    report = replay(datagrams, db, args.batch_size, args.timeout, args.scheduler, args.journal)
+    if not report["orders"]:
+        print(f"[REPLAY] > Aucune commande lisible ({report['malformed']} illisible(s)).")
+        sys.exit(1)
+
+    decided = report["accepted"] + report["refused"]
+    wait, compute = report["wait"], report["compute"]
+    print(f"[REPLAY] > Commandes          : {report['orders']} (+{report['malformed']} illisible(s))")
+    print(f"[REPLAY] > Temps simulé       : {timedelta(seconds=int(report['simulated']))} rejoué en {report['elapsed']:.2f} s")
+    print(f"[REPLAY] > Débit              : {report['orders'] / report['elapsed']:>10,.0f} commandes/s")
+    print(f"[REPLAY] > Acceptées          : {report['accepted']} / {decided} ({report['accepted'] / decided:.1%})")
+    print(f"[REPLAY] > Chiffre d'affaires : {report['revenue']} €")
+    print(f"[REPLAY] > Attente buffer     : p50={wait.quantile(0.5):.2f}s p99={wait.quantile(0.99):.2f}s max={wait.max:.2f}s (simulé)")
+    print(f"[REPLAY] > Calcul / commande  : p50={compute.quantile(0.5) * 1e6:.0f}µs p99={compute.quantile(0.99) * 1e6:.0f}µs max={compute.max * 1e6:.0f}µs")
+    print(f"[REPLAY] > Allers-retours BDD : {report['db_round_trips']}")
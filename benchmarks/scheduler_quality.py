@@ -0,0 +1,37 @@
+"""
+Compare les ordonnanceurs de lot (glouton / lookahead / revenue) sur le même journal de commandes
+rejoué à plusieurs débits : qualité (commandes acceptées, chiffre d'affaires) et temps CPU par lot.
+
+USE:
+    python -m benchmarks.scheduler_quality [nb_commandes] [--batch-size 16] [--rates 0.05 0.1 0.2]
+"""
+import argparse
+from benchmarks.replay import generate_log, replay
+from pizzeria.classes.memory_db import MemoryDatabase
+from pizzeria.order_processor import SCHEDULERS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ordonnanceur glouton contre ordonnancement du lot entier")
+    parser.add_argument("count", nargs="?", type=int, default=2000)
+    parser.add_argument("--sql", default="server/init.sql")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout du buffer (s, temps simulé)")
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.05, 0.1, 0.2, 0.5], help="Débits (commandes/s) du journal généré")
+    args = parser.parse_args()
+
+    db = MemoryDatabase.from_sql(args.sql)
+    print(f"[BENCH] > {args.count} commandes par journal, lots de {args.batch_size}")
+    print(f"[BENCH] > {'Débit':>7} | {'Ordonnanceur':<12} | {'Acceptées':>9} | {'CA (€)':>8} | {'Lot p50':>9} | {'Lot p99':>9}")
+    for rate in args.rates:
+        datagrams = generate_log(db, args.count, rate)
+        baseline = None
+        for scheduler in SCHEDULERS:
+            report = replay(datagrams, db, args.batch_size, args.timeout, scheduler)
+            flushes = report["flushes"]
+            gain = ""
+            if baseline is None:
+                baseline = report
+            else:
+                gain = f"  ({report['accepted'] - baseline['accepted']:+d} cmd, {report['revenue'] - baseline['revenue']:+d} €)"
+            print(f"[BENCH] > {rate:>7} | {scheduler:<12} | {report['accepted']:>9} | {report['revenue']:>8} | "
+                  f"{flushes.quantile(0.5) * 1000:>7.2f}ms | {flushes.quantile(0.99) * 1000:>7.2f}ms{gain}")
@@ -1,10 +1,29 @@
 from pizzeria import order_processor
+from pizzeria.async_processor import start_processing_async
+import argparse
 import threading
 import sys
 from web.tcp import run_web_server_thread
 from pizzeria.classes.stats import SharedContext, PizzeriaStats
+from pizzeria.classes.log import setup_logging
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Système de gestion de pizzeria (Engine + Web)")
+    parser.add_argument("--mode", choices=["select", "asyncio"], default="select",
+                        help="Moteur de réception des commandes (boucle select ou asyncio)")
+    parser.add_argument("--listen", action="store_true",
+                        help="Applique en direct les modifications des tables (LISTEN/NOTIFY, cf. server/init.sql)")
+    parser.add_argument("--journal", metavar="DOSSIER",
+                        help="Journalise les décisions dans ce dossier et y reprend les réservations des fours au redémarrage")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO",
+                        help="Niveau de log du moteur (DEBUG affiche chaque commande reçue)")
+    parser.add_argument("--log-json", metavar="FICHIER",
+                        help="Écrit aussi les logs (une décision par ligne) au format JSON-lines dans ce fichier")
+    args = parser.parse_args()
+
+    # Logs écrits par un thread dédié : le moteur ne bloque jamais sur stdout
+    setup_logging(args.log_level, args.log_json)
+
     print("[MAIN] > INFO: Lancement du système complet (Engine + Web)...")
 
     context = SharedContext()
@@ -15,8 +34,11 @@ if __name__ == "__main__":
     web_thread.start()
 
     try:
-        order_processor.start_processing(context)
+        if args.mode == "asyncio":
+            start_processing_async(context, listen=args.listen, journal=args.journal)
+        else:
+            order_processor.start_processing(context, listen=args.listen, journal=args.journal)
         print("[MAIN] > SUCCESS: Script arrêté avec succès.")
     except KeyboardInterrupt:
         print("\n[MAIN] > KILL: Arrêt demandé par l'utilisateur.")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
@@ -0,0 +1,218 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from .classes.order import Order
+from .classes.network import BroadCastReceiver
+from .classes.stats import SharedContext
+from .classes.parser import parse_order, OrderParseError
+from .classes.listener import ChangeListener
+from .classes.log import get_logger
+from .classes.metrics import REGISTRY
+from .order_processor import EngineState, _init_engine, _start_listener, flush_batch, BATCH_SIZE, BUFFER_TIMEOUT, UDP_PORT, UDP_RCVBUF, ORDERS_RECEIVED, ORDERS_MALFORMED
+
+log = get_logger("ASYNC")
+
+class IngestionMetrics:
+    """
+    Compteurs du mode asyncio (réception -> batching -> ordonnancement).
+    """
+    def __init__(self) -> None:
+        self.received = 0           # Datagrammes reçus
+        self.dropped = 0            # Datagrammes jetés (file de réception pleine)
+        self.parse_errors = 0       # Datagrammes illisibles
+        self.batches = 0            # Lots envoyés à l'ordonnancement
+        self.max_rx_depth = 0       # Pic de remplissage de la file de réception
+        self.backpressure_waits = 0 # Fois où le batcher a dû attendre l'ordonnanceur
+
+    def register(self) -> None:
+        """Export /metrics (lu à chaque export, sans coût sur le chemin de réception)."""
+        REGISTRY.callback("pizzeria_async_datagrams_total", "Datagrammes du mode asyncio, par issue", lambda: {
+            "received": self.received, "dropped": self.dropped, "malformed": self.parse_errors}, kind="counter", label="outcome")
+        REGISTRY.callback("pizzeria_async_batches_total", "Lots envoyés à l'ordonnancement (mode asyncio)", lambda: self.batches, kind="counter")
+        REGISTRY.callback("pizzeria_async_backpressure_waits_total", "Attentes du batcher sur l'ordonnanceur (mode asyncio)", lambda: self.backpressure_waits, kind="counter")
+        REGISTRY.callback("pizzeria_async_rx_queue_peak", "Pic de remplissage de la file de réception (mode asyncio)", lambda: self.max_rx_depth)
+
+    def __str__(self):
+        return (f"Reçus: {self.received} | Jetés: {self.dropped} | Illisibles: {self.parse_errors} | "
+                f"Lots: {self.batches} | Pic file: {self.max_rx_depth} | Attentes ordo.: {self.backpressure_waits}")
+
+
+class OrderDatagramProtocol(asyncio.DatagramProtocol):
+    """
+    Réception UDP : on ne fait QUE mettre le datagramme dans la file bornée.
+    Si la file est pleine (ordonnancement à la traîne), le paquet est jeté et compté.
+    """
+    def __init__(self, rx_queue: asyncio.Queue, metrics: IngestionMetrics) -> None:
+        self.rx_queue = rx_queue
+        self.metrics = metrics
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.metrics.received += 1
+        try:
+            self.rx_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.metrics.dropped += 1
+            return
+        self.metrics.max_rx_depth = max(self.metrics.max_rx_depth, self.rx_queue.qsize())
+
+    def error_received(self, exc: Exception) -> None:
+        log.error("Réception UDP: %s", exc)
+
+
+def _decode(data: bytes, metrics: IngestionMetrics) -> Order | None:
+    """Décodage d'un datagramme, les erreurs sont comptées au lieu de casser la boucle."""
+    try:
+        order = parse_order(data)
+    except OrderParseError:
+        metrics.parse_errors += 1
+        ORDERS_MALFORMED.inc()
+        return None
+    ORDERS_RECEIVED.inc()
+    return order
+
+async def _batcher(rx_queue: asyncio.Queue, batch_queue: asyncio.Queue, metrics: IngestionMetrics) -> None:
+    """
+    Constitution des lots : le lot part dès qu'il est plein (BATCH_SIZE)
+    OU que BUFFER_TIMEOUT secondes se sont écoulées depuis sa première commande.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        order = _decode(await rx_queue.get(), metrics)
+        if order is None: continue
+
+        # Initialisation du chrono au premier élément du buffer
+        order_buffer = [order]
+        deadline = loop.time() + BUFFER_TIMEOUT
+        trigger = f"TIMEOUT ({BUFFER_TIMEOUT}s)"
+
+        while len(order_buffer) < BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0: break
+            try:
+                data = await asyncio.wait_for(rx_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            order = _decode(data, metrics)
+            if order:
+                order_buffer.append(order)
+
+        if len(order_buffer) >= BATCH_SIZE:
+            trigger = "TAILLE ATTEINTE"
+
+        # File des lots bornée : si l'ordonnanceur est en retard, on attend ici
+        # (et c'est la file de réception qui absorbe, puis jette, le surplus)
+        if batch_queue.full():
+            metrics.backpressure_waits += 1
+        await batch_queue.put((order_buffer, trigger))
+        metrics.batches += 1
+
+async def _scheduler(batch_queue: asyncio.Queue, state: EngineState, executor: ThreadPoolExecutor, replanned: asyncio.Event) -> None:
+    """
+    Ordonnancement : chaque lot est traité dans UN thread dédié, pour que la boucle
+    asyncio continue de vider le socket pendant le calcul.
+    (Un seul thread -> les lots restent traités un par un, dans l'ordre.)
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        order_buffer, trigger = await batch_queue.get()
+        try:
+            await loop.run_in_executor(executor, flush_batch, state, order_buffer, trigger)
+        except Exception as e:
+            log.critical("Erreur traitement du lot: %s", e)
+        replanned.set()
+
+async def _ticker(state: EngineState, executor: ThreadPoolExecutor, replanned: asyncio.Event) -> None:
+    """
+    Publie l'état du dashboard à chaque début / fin de cuisson.
+    On dort jusqu'au prochain événement du planning, ou jusqu'à ce qu'un lot
+    ait modifié le planning (l'événement le plus proche a pu changer).
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        replanned.clear()
+        next_event = await loop.run_in_executor(executor, state.prod_manager.next_event, state.clock.now())
+        timeout = None if next_event is None else max(0.0, (next_event - state.clock.now()).total_seconds())
+        try:
+            await asyncio.wait_for(replanned.wait(), timeout)
+            continue
+        except asyncio.TimeoutError:
+            pass
+        await loop.run_in_executor(executor, state.publish)
+
+def _apply_notifications(listener: ChangeListener, state: EngineState) -> None:
+    state.apply_changes(listener.poll())
+
+async def _listen(listener: ChangeListener, state: EngineState, executor: ThreadPoolExecutor) -> None:
+    """
+    Modifications de la BDD (LISTEN/NOTIFY) : le socket n'est surveillé que tant que l'abonnement est actif,
+    sinon on retente le ré-abonnement à intervalles croissants (cf. ChangeListener.reconnect).
+    """
+    loop = asyncio.get_running_loop()
+    readable = asyncio.Event()
+    while True:
+        if not listener.connected:
+            await asyncio.sleep(listener.retry_in())
+            if not await loop.run_in_executor(executor, listener.reconnect): continue
+        readable.clear()
+        loop.add_reader(listener, readable.set)
+        try:
+            await readable.wait()
+        finally:
+            loop.remove_reader(listener)
+        # Lecture (I/O BDD, éventuelle coupure) et application dans le thread d'ordonnancement :
+        # rien de bloquant sur la boucle, et jamais en même temps qu'un lot
+        try:
+            await loop.run_in_executor(executor, _apply_notifications, listener, state)
+        except Exception as e:
+            log.error("Modifications de la BDD non appliquées : %s", e)
+
+async def _report(metrics: IngestionMetrics, rx_queue: asyncio.Queue, period: float = 30.0) -> None:
+    """Affiche régulièrement les compteurs d'ingestion."""
+    while True:
+        await asyncio.sleep(period)
+        log.info("%s | File: %d/%d", metrics, rx_queue.qsize(), rx_queue.maxsize)
+
+async def _run(context: SharedContext, rx_queue_size: int, batch_queue_size: int, listen: bool, journal: str | None) -> None:
+    state = _init_engine(context, journal)
+    if state is None: return
+
+    metrics = IngestionMetrics()
+    metrics.register()
+    rx_queue = asyncio.Queue(maxsize=rx_queue_size)
+    batch_queue = asyncio.Queue(maxsize=batch_queue_size)
+    replanned = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    with BroadCastReceiver(UDP_PORT, rcvbuf=UDP_RCVBUF) as r, ThreadPoolExecutor(max_workers=1, thread_name_prefix="scheduler") as executor:
+        transport, _ = await loop.create_datagram_endpoint(lambda: OrderDatagramProtocol(rx_queue, metrics), sock=r.sock)
+        log.info("En attente de commandes (mode asyncio)...")
+
+        tasks = [
+            _batcher(rx_queue, batch_queue, metrics),
+            _scheduler(batch_queue, state, executor, replanned),
+            _ticker(state, executor, replanned),
+            _report(metrics, rx_queue)
+        ]
+        listener = _start_listener(state) if listen else None
+        if listener:
+            tasks.append(_listen(listener, state, executor))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            if listener:
+                listener.close()
+            transport.close()
+            # Attendre la fin du lot en cours : la photo finale ne doit pas croiser un flush_batch
+            executor.shutdown(wait=True)
+            state.close()
+            log.info("%s", metrics)
+
+def start_processing_async(context: SharedContext, rx_queue_size: int = 1024, batch_queue_size: int = 2, listen: bool = False, journal: str | None = None) -> None:
+    """
+    Variante asyncio de order_processor.start_processing :
+    Réception, batching et ordonnancement sont trois tâches séparées reliées par des files bornées,
+    les paquets continuent donc d'être lus pendant qu'un lot est en cours de traitement.
+    """
+    try:
+        asyncio.run(_run(context, rx_queue_size, batch_queue_size, listen, journal))
+    except KeyboardInterrupt:
+        log.info("Arrêt du processeur de commandes.")
@@ -0,0 +1,136 @@
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, NamedTuple
+from .production import ProductionManager, ProductionStation
+from .metrics import REGISTRY
+
+# Temps de recherche max par lot (s) : au-delà on garde la meilleure solution trouvée
+BUDGET_SECONDS = 0.05
+# Postes essayés par commande (ceux qui finissent le plus tôt)
+MAX_BRANCHES = 3
+# Profondeur max de la recherche (récursive) : un lot plus gros est traité par tranches
+MAX_WINDOW = 200
+
+SEARCH_NODES = REGISTRY.histogram("pizzeria_batch_search_nodes", "Nœuds explorés par l'ordonnanceur de lot")
+SEARCH_TIMEOUTS = REGISTRY.counter("pizzeria_batch_search_timeouts_total", "Lots dont la recherche a atteint le budget de temps")
+
+class BatchRequest(NamedTuple):
+    """Une commande du lot, déjà validée (pizza et client connus, deadline calculée)."""
+    pizza_name: str
+    pizza_size: str
+    quantity: int
+    prod_time: int
+    deadline: datetime
+    value: float            # Ce que rapporte l'acceptation (1 -> nb de commandes, prix x qté -> CA)
+
+
+class Placement(NamedTuple):
+    station_id: int
+    start: datetime
+    end: datetime
+
+
+class BatchScheduler:
+    """
+    Ordonnancement d'un lot ENTIER (au lieu de placer les commandes une par une) :
+    maximise la valeur totale acceptée (nb de commandes ou chiffre d'affaires).
+
+    Branch-and-bound en profondeur, dans l'ordre des marges (comme le glouton) :
+    -> Pour chaque commande : la placer sur l'un des MAX_BRANCHES postes qui finissent le plus tôt,
+       ou la refuser (pour laisser la place aux suivantes)
+    -> Les placements sont essayés pour de vrai dans les plannings (assign_task), puis annulés
+    -> Coupe : valeur actuelle + valeur de toutes les commandes restantes <= meilleure solution
+
+    La première solution explorée est exactement celle du glouton : le résultat n'est jamais
+    moins bon, et si le budget de temps est atteint on garde la meilleure solution trouvée.
+    """
+
+    def __init__(self, prod_manager: ProductionManager, budget: float = BUDGET_SECONDS, max_branches: int = MAX_BRANCHES) -> None:
+        self.prod_manager = prod_manager
+        self.budget = budget
+        self.max_branches = max_branches
+        # Infos de la dernière recherche
+        self.nodes = 0
+        self.timed_out = False
+
+    def _candidates(self, request: BatchRequest, now: datetime, limit: int) -> List[tuple[datetime, int, ProductionStation, datetime]]:
+        """Postes pouvant finir la commande avant sa deadline, triés par fin de cuisson (puis ID, comme le glouton)."""
+        found = []
+        duration = timedelta(minutes=request.prod_time)
+        for station in self.prod_manager.eligible_stations(request.pizza_name, request.pizza_size, request.quantity):
+            start = station.earliest_start(request.quantity, duration, now, request.deadline - duration)
+            if start:
+                found.append((start + duration, station.id, station, start))
+        found.sort(key=lambda c: (c[0], c[1]))
+        return found[:limit]
+
+    def schedule(self, requests: List[BatchRequest], now: datetime) -> List[Optional[Placement]]:
+        """
+        Place le lot et réserve les postes retenus.
+        Retourne pour chaque commande son placement, ou None si elle est refusée.
+        """
+        self.nodes = 0
+        self.timed_out = False
+        placements = []
+        for i in range(0, len(requests), MAX_WINDOW):
+            placements.extend(self._schedule_window(requests[i:i + MAX_WINDOW], now))
+        SEARCH_NODES.observe(self.nodes)
+        if self.timed_out: SEARCH_TIMEOUTS.inc()
+        return placements
+
+    def _schedule_window(self, requests: List[BatchRequest], now: datetime) -> List[Optional[Placement]]:
+        n = len(requests)
+        self._requests = requests
+        self._now = now
+
+        # Ajouter des tâches ne fait que retarder les débuts possibles :
+        # une commande impossible sur le planning actuel le reste quoi qu'on place avant elle
+        feasible = [bool(self._candidates(r, now, 1)) for r in requests]
+
+        # Borne : valeur maximale encore atteignable à partir de la commande i
+        self._remaining = [0.0] * (n + 1)
+        for i in reversed(range(n)):
+            self._remaining[i] = self._remaining[i + 1] + (requests[i].value if feasible[i] else 0)
+        self._feasible = feasible
+
+        self._current: List[Optional[Placement]] = [None] * n
+        self._best: List[Optional[Placement]] = [None] * n
+        self._best_value = -1.0
+        self._deadline = time.perf_counter() + self.budget
+        self._search(0, 0.0)
+
+        # Réservation définitive de la meilleure solution (les essais ont tous été annulés)
+        stations = {station.id: station for station in self.prod_manager.stations}
+        for request, placement in zip(requests, self._best):
+            if placement:
+                stations[placement.station_id].assign_task(request.pizza_name, request.pizza_size, request.quantity, request.prod_time, placement.start)
+        return self._best
+
+    def _search(self, i: int, value: float) -> None:
+        self.nodes += 1
+
+        # Même en acceptant tout le reste, on ne fera pas mieux
+        if value + self._remaining[i] <= self._best_value: return
+
+        if i == len(self._requests):
+            self._best_value = value
+            self._best = list(self._current)
+            return
+
+        # Budget écoulé : on garde la meilleure solution (il y en a toujours une, celle du glouton)
+        if self._best_value >= 0 and (self.timed_out or time.perf_counter() > self._deadline):
+            self.timed_out = True
+            return
+
+        request = self._requests[i]
+        if self._feasible[i]:
+            for end, station_id, station, start in self._candidates(request, self._now, self.max_branches):
+                # Essai : réservation puis annulation
+                station.assign_task(request.pizza_name, request.pizza_size, request.quantity, request.prod_time, start)
+                self._current[i] = Placement(station_id, start, end)
+                self._search(i + 1, value + request.value)
+                station.cancel_task(start, end, request.quantity)
+            self._current[i] = None
+
+        # Branche "refusée"
+        self._search(i + 1, value)
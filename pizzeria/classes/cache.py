@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+class LoadError(Exception):
+    """Levée par un loader quand la BDD n'a pas pu répondre (à ne pas confondre avec une entité inexistante)."""
+
+class EntityCache:
+    """
+    Cache des entités qu'on va chercher dynamiquement dans la BDD centrale
+    (clients ou pizzas inconnus au lancement du script).
+
+    -> Entrées positives  : entité trouvée, re-vérifiée après refresh_ttl secondes
+    -> Entrées négatives  : entité inexistante, mémorisée negative_ttl secondes
+                            (évite de marteler la BDD avec le même ID bidon)
+    -> BDD indisponible   : l'entité déjà connue est gardée (re-vérifiée après negative_ttl),
+                            une clé jamais chargée n'est pas mémorisée comme inexistante
+    -> Taille bornée      : éviction LRU (la moins récemment utilisée)
+    -> Compteurs          : hits / negative_hits / misses / load_errors / evictions
+    """
+
+    def __init__(self, loader: Callable[[Hashable], Any], max_size: int = 10_000, refresh_ttl: float = 300.0, negative_ttl: float = 5.0,
+                 bulk_loader: Callable[[list], dict | None] = None) -> None:
+        """
+        Paramètres :
+        - loader       : Fonction appelée en cas de miss, retourne l'entité ou None (inexistante),
+                         lève LoadError si la BDD n'a pas répondu
+        - max_size     : Nombre max d'entrées (positives + négatives)
+        - refresh_ttl  : Durée de validité (s) d'une entité trouvée
+        - negative_ttl : Durée de validité (s) d'une entité introuvable
+        - bulk_loader  : (Optionnel) Version groupée du loader : liste de clés -> {clé: entité}
+                         (lève LoadError si le chargement a échoué)
+        """
+        self.loader = loader
+        self.bulk_loader = bulk_loader
+        self.max_size = max_size
+        self.refresh_ttl = refresh_ttl
+        self.negative_ttl = negative_ttl
+
+        # Clé -> (entité ou None, date d'expiration)
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.load_errors = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() < entry[1]
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Retourne l'entité associée à la clé (ou None si elle n'existe pas).
+        Ne fait appel au loader (donc à la BDD) que si l'entrée est absente ou périmée.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                if value is None: self.negative_hits += 1
+                else: self.hits += 1
+                return value
+
+        self.misses += 1
+        try:
+            value = self.loader(key)
+        except LoadError:
+            # BDD indisponible : on garde l'ancienne entité un court moment, mais on ne conclut
+            # pas à son absence (le prochain get() retentera)
+            self.load_errors += 1
+            if entry is None or entry[0] is None: return None
+            self.put(key, entry[0], self.negative_ttl)
+            return entry[0]
+
+        self.put(key, value)
+        return value
+
+    def prefetch(self, keys: Iterable[Hashable]) -> None:
+        """
+        Charge en UN seul appel au bulk_loader toutes les clés absentes ou périmées.
+        Les clés introuvables deviennent des entrées négatives, les get() suivants
+        ne toucheront donc plus la BDD.
+        """
+        if self.bulk_loader is None: return
+
+        now = time.monotonic()
+        missing = []
+        for key in set(keys):
+            entry = self._entries.get(key)
+            if entry is None or now >= entry[1]:
+                missing.append(key)
+        if not missing: return
+
+        self.misses += len(missing)
+        try:
+            found = self.bulk_loader(missing)
+        except LoadError:
+            # Échec du chargement -> on ne mémorise rien, get() retentera clé par clé
+            self.load_errors += 1
+            return
+
+        for key in missing:
+            self.put(key, found.get(key))
+
+    def put(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Ajoute (ou remplace) une entrée. value=None -> entrée négative. ttl : durée de validité imposée (s)."""
+        if ttl is None: ttl = self.refresh_ttl if value is not None else self.negative_ttl
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Oublie une entrée (elle sera rechargée au prochain accès)."""
+        self._entries.pop(key, None)
@@ -1,8 +1,134 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator
+
+# Types des arrays de ClientIndex : IDs sur 8 octets (aucune limite à 2^31 côté BDD), distances (min) sur 4
+_ID_TYPE = 'q'
+_DISTANCE_TYPE = 'i'
+
 class Client:
 
+    __slots__ = ("id", "distance")
+
     def __init__(self, client_id, client_distance):
         self.id = int(client_id)
         self.distance = int(client_distance)
         
     def __str__(self):
-        return (f"Client ID: {self.id} | Client Distance: {self.distance}min")
\ No newline at end of file
+        return (f"Client ID: {self.id} | Client Distance: {self.distance}min")
+
+
+class ClientIndex:
+    """
+    Table des clients en version compacte : id -> distance.
+
+    Au lieu d'un dict de millions d'objets Client, on garde deux arrays parallèles
+    triés par ID (12 octets par client : ID 'q' + distance 'i') et on cherche par dichotomie.
+    Les clients ajoutés après le chargement vont dans un petit dict à côté
+    (insérer au milieu d'un array d'un million d'éléments coûterait trop cher).
+
+    S'utilise comme le dict client_map : index.get(id) -> Client | None
+    """
+
+    __slots__ = ("_ids", "_distances", "_extra", "_removed")
+
+    def __init__(self, ids: array = None, distances: array = None) -> None:
+        """ids DOIT être trié (croissant), distances dans le même ordre."""
+        self._ids = ids if ids is not None else array(_ID_TYPE)
+        self._distances = distances if distances is not None else array(_DISTANCE_TYPE)
+        self._extra: dict[int, int] = {}
+        self._removed: set[int] = set()
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[int, int]]) -> "ClientIndex":
+        """
+        Construit l'index depuis des couples (id, distance), sans liste intermédiaire.
+        Si les couples arrivent triés par ID (ORDER BY "ID"), aucun tri n'est nécessaire.
+        """
+        ids, distances = array(_ID_TYPE), array(_DISTANCE_TYPE)
+        is_sorted = True
+        for client_id, distance in pairs:
+            if is_sorted and ids and client_id <= ids[-1]:
+                is_sorted = False
+            ids.append(client_id)
+            distances.append(distance)
+
+        if not is_sorted:
+            order = sorted(range(len(ids)), key=ids.__getitem__)
+            ids = array(_ID_TYPE, (ids[i] for i in order))
+            distances = array(_DISTANCE_TYPE, (distances[i] for i in order))
+
+            # Doublons éventuels : le dernier lu gagne (comme dans un dict)
+            if any(ids[i] == ids[i + 1] for i in range(len(ids) - 1)):
+                return cls.from_pairs(dict(zip(ids, distances)).items())
+        return cls(ids, distances)
+
+    @classmethod
+    def from_clients(cls, clients: Iterable[Client]) -> "ClientIndex":
+        return cls.from_pairs((c.id, c.distance) for c in clients)
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._removed) + len(self._extra)
+
+    def __contains__(self, client_id: int) -> bool:
+        return self.distance(client_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        for client_id in self._ids:
+            if client_id not in self._removed:
+                yield client_id
+        yield from self._extra
+
+    def _find(self, client_id: int) -> int:
+        """Position de client_id dans les arrays triés (-1 si absent)."""
+        i = bisect_left(self._ids, client_id)
+        if i < len(self._ids) and self._ids[i] == client_id:
+            return i
+        return -1
+
+    def distance(self, client_id: int) -> int | None:
+        """Distance (min) du client, None s'il est inconnu."""
+        distance = self._extra.get(client_id)
+        if distance is not None:
+            return distance
+        i = self._find(client_id)
+        if i < 0 or client_id in self._removed:
+            return None
+        return self._distances[i]
+
+    def get(self, client_id: int, default: Client = None) -> Client | None:
+        """Même usage que dict.get : l'objet Client est créé à la demande."""
+        distance = self.distance(client_id)
+        if distance is None:
+            return default
+        return Client(client_id, distance)
+
+    def add(self, client: Client) -> None:
+        """Ajoute ou met à jour un client."""
+        i = self._find(client.id)
+        if i >= 0:
+            self._distances[i] = client.distance
+            self._removed.discard(client.id)
+        else:
+            self._extra[client.id] = client.distance
+
+    def __setitem__(self, client_id: int, client: Client) -> None:
+        self.add(client)
+
+    def remove(self, client_id: int) -> None:
+        """Retire un client (s'il existe)."""
+        if self._extra.pop(client_id, None) is None and self._find(client_id) >= 0:
+            self._removed.add(client_id)
+
+    def pop(self, client_id: int, default: Client = None) -> Client | None:
+        """Même usage que dict.pop : retire le client et le retourne."""
+        client = self.get(client_id)
+        if client is None:
+            return default
+        self.remove(client_id)
+        return client
+
+    def memory_usage(self) -> int:
+        """Taille approximative (octets) des données de l'index."""
+        return (self._ids.buffer_info()[1] * self._ids.itemsize
+                + self._distances.buffer_info()[1] * self._distances.itemsize)
@@ -0,0 +1,56 @@
+import time
+from datetime import datetime, timedelta
+
+class Clock:
+    """
+    Source du temps utilisée par le moteur (au lieu d'appeler datetime.now() partout).
+    -> SystemClock    : l'heure réelle (fonctionnement normal)
+    -> SimulatedClock : une heure qu'on avance à la main (replay, benchmarks),
+                        le moteur tourne alors aussi vite que le CPU le permet
+    """
+    def now(self) -> datetime:
+        raise NotImplementedError
+
+    def monotonic(self) -> float:
+        """Secondes écoulées (pour mesurer des durées), jamais en arrière."""
+        raise NotImplementedError
+
+
+class SystemClock(Clock):
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+class SimulatedClock(Clock):
+    """Horloge déterministe : le temps n'avance que par advance() / advance_to()."""
+
+    def __init__(self, start: datetime) -> None:
+        self.start = start
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def monotonic(self) -> float:
+        return (self._now - self.start).total_seconds()
+
+    def advance(self, delta: timedelta | float) -> datetime:
+        """Avance de delta (timedelta ou secondes)."""
+        if not isinstance(delta, timedelta):
+            delta = timedelta(seconds=delta)
+        if delta > timedelta(0):
+            self._now += delta
+        return self._now
+
+    def advance_to(self, t: datetime) -> datetime:
+        """Avance jusqu'à t (sans effet si t est dans le passé : le temps ne recule pas)."""
+        if t > self._now:
+            self._now = t
+        return self._now
+
+
+# Horloge par défaut du moteur
+SYSTEM_CLOCK = SystemClock()
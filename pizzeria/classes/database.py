@@ -1,43 +1,172 @@
+import time
+import threading
 import psycopg2
 
 from .client import Client
 from .pizza import Pizza
 from .production import ProductionStation
-from psycopg2 import sql
+from typing import Iterator
+from contextlib import contextmanager
+from psycopg2 import sql, pool
+from .metrics import REGISTRY
+from .log import get_logger
+
+log = get_logger("DATABASE")
+
+# Métriques BDD (exportées sur /metrics)
+POOL_WAIT_SECONDS = REGISTRY.histogram("pizzeria_db_pool_wait_seconds", "Attente d'une connexion libre dans le pool (s)")
+QUERY_SECONDS = REGISTRY.histogram("pizzeria_db_query_seconds", "Durée d'un aller-retour BDD (s)")
+QUERIES = REGISTRY.counter("pizzeria_db_roundtrips_total", "Allers-retours BDD")
+RECONNECTS = REGISTRY.counter("pizzeria_db_reconnects_total", "Connexions BDD perdues puis remplacées")
 
 class Database:
     """
     Classe base de données qui nous permet de récupérer tous les clients et les types de pizza.
+
+    Les connexions sont gérées par un pool borné : un cache miss coûte une requête,
+    pas une nouvelle connexion TCP + authentification au serveur PostgreSQL.
     """
 
-    def __init__(self, dbname: str = 'UE_ENS_PROJET', user: str = 'pguser', password: str = 'pguser', host: str = 'localhost', port: str = '5432') -> None:
+    def __init__(self, dbname: str = 'UE_ENS_PROJET', user: str = 'pguser', password: str = 'pguser', host: str = 'localhost', port: str = '5432',
+                 min_connections: int = 1, max_connections: int = 4, pool_timeout: float = 5.0, health_check_interval: float = 30.0) -> None:
         """
         Constructeur de la classe, par défaut, se connecte à une machine en local qui contient les bases de données.
         TODO: Implémenter 'dotenv' (library Python pour masquer mot de passe)
+
+        Paramètres du pool :
+        - min_connections / max_connections : Bornes du pool de connexions
+        - pool_timeout                      : Attente max (s) d'une connexion libre
+        - health_check_interval             : Au-delà de cette inactivité (s), on "ping" la connexion avant de l'utiliser
         """
+        self.pool = None
+        self._ALLOWED_COLUMNS = {}
+        self._dsn = {"dbname": dbname, "user": user, "password": password, "host": host, "port": port}
+        self.pool_timeout = pool_timeout
+        self.health_check_interval = health_check_interval
+
+        # Le pool de psycopg2 lève une erreur quand il est vide,
+        # le sémaphore permet d'ATTENDRE qu'une connexion se libère
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._last_used: dict[int, float] = {}
+
         # Tentative de connexion à la DB centrale
         try:
-            self.conn = psycopg2.connect(dbname=dbname, user=user, password=password, host=host, port=port)
-            self.cur = self.conn.cursor()
-            self._ALLOWED_COLUMNS = {}
-            print("[DATABASE] > SUCCESS: Connexion à la BDD réussie.")
+            self.pool = pool.ThreadedConnectionPool(min_connections, max_connections, **self._dsn)
+            log.info("Connexion à la BDD réussie.")
+
+            # Introspection faite UNE seule fois, le schéma reste en cache
             self.get_columns("Client", "Pizza", "Production")
 
         # FALLBACK d'erreur -> pas réussi à se connecter
         except psycopg2.OperationalError as e:
-            print(f"[DATABASE] > ERROR: {e.args[0].split("\n")[0]}")
-            self.conn = None
-            self.cur = None
+            log.error("%s", str(e).splitlines()[0])
+            self.pool = None
+
+    def _acquire(self):
+        """
+        Méthode qui emprunte une connexion au pool (en attendant si besoin).
+        Une connexion fermée ou restée inactive trop longtemps est vérifiée
+        et remplacée si elle ne répond plus.
+        """
+        wait_start = time.monotonic()
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise pool.PoolError("Aucune connexion disponible dans le pool.")
+
+        # Emprunts, attente totale et max : pizzeria_db_pool_wait_seconds (count / sum / max)
+        POOL_WAIT_SECONDS.observe(time.monotonic() - wait_start)
+
+        try:
+            # Au pire on essaie chaque connexion du pool puis une connexion neuve
+            for _ in range(self.pool.maxconn + 1):
+                conn = self.pool.getconn()
+                if not conn.closed and self._is_healthy(conn):
+                    return conn
+
+                # Connexion morte -> on la jette, le pool en recréera une
+                log.warning("Connexion perdue, reconnexion...")
+                RECONNECTS.inc()
+                self._last_used.pop(id(conn), None)
+                self.pool.putconn(conn, close=True)
+            raise psycopg2.OperationalError("Serveur de BDD injoignable.")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _is_healthy(self, conn) -> bool:
+        """Ping (SELECT 1) uniquement si la connexion n'a pas servi depuis un moment."""
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _release(self, conn, broken: bool = False) -> None:
+        """Méthode qui rend une connexion au pool (ou la ferme si elle est cassée)."""
+        try:
+            if broken:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+            self.pool.putconn(conn, close=broken or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def _cursor(self, name: str = None):
+        """
+        Context manager qui fournit un curseur sur une connexion du pool.
+        -> Commit si tout s'est bien passé, rollback sinon.
+        -> name : curseur nommé (côté serveur), les lignes arrivent par paquets
+        """
+        conn = self._acquire()
+        broken = False
+        try:
+            with conn.cursor(name=name) as cur:
+                yield cur
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        except Exception:
+            # Protection du rollback pour éviter le crash FATAL
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self._release(conn, broken)
 
-    def __del__(self) -> None:
+    def _query(self, query, params: tuple = None, handler=lambda cur: cur.fetchall()):
+        """
+        Méthode qui exécute une requête et applique handler(curseur) au résultat.
+        Si la connexion tombe pendant la requête, on retente UNE fois sur une connexion neuve.
+        """
+        for attempt in (1, 2):
+            try:
+                QUERIES.inc()
+                with QUERY_SECONDS.time(), self._cursor() as cur:
+                    cur.execute(query, params)
+                    return handler(cur)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                if attempt == 2: raise
+                log.warning("Requête interrompue, nouvelle tentative...")
+                RECONNECTS.inc()
+
+    def close(self) -> None:
         """
         Méthode pour se déconnecter du serveur des bases de données.
         (C'est pour faire les choses proprement parce qu'ici on aime la propreté.)
         """
-        if self.cur: self.cur.close()
-        if self.conn:
-            self.conn.close()
-            print("[DATABASE] > INFO: Connexion à la BDD fermée.")
+        if getattr(self, 'pool', None) and not self.pool.closed:
+            self.pool.closeall()
+            log.info("Connexions à la BDD fermées proprement.")
+        self.pool = None
     
     def get_entity(self, table_name: str, *filters: tuple[str, any]) -> Client | Pizza | ProductionStation | None:
         """
@@ -67,11 +196,10 @@ class Database:
 
         """
 
-        # Vérifications préventives de la table et récupération des colonnes autorisées
-        if not self.cur: return None
-        self.__init__()
+        # Vérifications préventives de la table (les colonnes autorisées sont déjà en cache)
+        if not self.pool: return None
         if table_name not in self._ALLOWED_COLUMNS:
-            print(f"[DATABASE] > ERROR: Table '{table_name}' inconnue.")
+            log.error("Table '%s' inconnue.", table_name)
             return None
 
         columns = self._ALLOWED_COLUMNS[table_name]
@@ -94,7 +222,7 @@ class Database:
             for col_name, val in filters:
                 # Sécurité : On vérifie que la colonne existe pour cette table
                 if col_name not in columns:
-                    print(f"[DATABASE] > WARN: Colonne '{col_name}' invalide pour {table_name}.")
+                    log.warning("Colonne '%s' invalide pour %s.", col_name, table_name)
                     return None
                 
                 # On ajoute "NomColonne = %s" à notre condition WHERE
@@ -112,15 +240,12 @@ class Database:
             return None
 
         try:
-            # Exécution de la requête SQL
-            self.cur.execute(query, tuple(query_values))
-
-            # Tuple réponse
-            row = self.cur.fetchone()
+            # Exécution de la requête SQL -> Tuple réponse
+            row = self._query(query, tuple(query_values), lambda cur: cur.fetchone())
 
             # Si tuple de réponse -> table locale pas à jour donc faut update la notre
             if row:
-                print(f"[DATABASE] > INFO: Entité trouvée dynamiquement dans {table_name}.")
+                log.debug("Entité trouvée dynamiquement dans %s.", table_name)
 
                 # Mise à jour de la DB locale
                 # L'opérateur *row "déplie" le tuple pour le passer en arguments au constructeur
@@ -133,15 +258,63 @@ class Database:
 
         # FALLBACK au cas où y'aurait une erreur de con
         except Exception as e:
-            print(f"[DATABASE] > ERROR (get_entity): {e}")
-            # Protection du rollback pour éviter le crash FATAL
-            try:
-                if self.conn and not self.conn.closed:
-                    self.conn.rollback()
-            except Exception:
-                pass # Si le rollback échoue, on ignore
+            # (Le rollback est déjà fait par le pool)
+            log.error("get_entity : %s", e)
+            return None
+
+    def get_entities(self, table_name: str, key_columns: tuple[str, ...], keys: list) -> list[Client] | list[Pizza] | list[ProductionStation] | None:
+        """
+        Version groupée de get_entity : récupère en UNE requête toutes les entités
+        dont la clé est dans keys (au lieu d'une requête par entité inconnue).
+
+        -> Une colonne clé       : WHERE "ID" = ANY(%s)                 (keys = [529997, 530143])
+        -> Plusieurs colonnes    : WHERE ("Nom", "Taille") IN %s        (keys = [("Veggie", "G"), ...])
+
+        USE:
+            db.get_entities("Client", ("ID",), [529997, 530143])
+            db.get_entities("Pizza", ("Nom", "Taille"), [("Veggie", "G"), ("Reine", "M")])
+
+        Retourne la liste des entités trouvées (les clés absentes n'existent pas),
+        ou None si la requête a échoué (on ne sait alors rien des clés demandées).
+        """
+        if not self.pool: return None
+        if table_name not in self._ALLOWED_COLUMNS:
+            log.error("Table '%s' inconnue.", table_name)
+            return None
+        if not keys: return []
+
+        columns = self._ALLOWED_COLUMNS[table_name]
+        for col_name in key_columns:
+            if col_name not in columns:
+                log.warning("Colonne '%s' invalide pour %s.", col_name, table_name)
+                return None
+
+        query = sql.SQL("SELECT {cols} FROM {table}").format(
+            cols=sql.SQL(', ').join(map(sql.Identifier, columns)),
+            table=sql.Identifier(table_name)
+        )
+
+        if len(key_columns) == 1:
+            query += sql.SQL(" WHERE {} = ANY(%s)").format(sql.Identifier(key_columns[0]))
+            params = (list(keys),)
+        else:
+            # psycopg2 transforme un tuple de tuples en ((a, b), (c, d))
+            query += sql.SQL(" WHERE ({}) IN %s").format(sql.SQL(', ').join(map(sql.Identifier, key_columns)))
+            params = (tuple(tuple(k) for k in keys),)
+
+        try:
+            rows = self._query(query, params)
+        except Exception as e:
+            log.error("get_entities : %s", e)
             return None
 
+        if rows:
+            log.debug("%d entité(s) trouvée(s) dynamiquement dans %s.", len(rows), table_name)
+        if table_name == "Client": return [Client(*row) for row in rows]
+        elif table_name == "Pizza": return [Pizza(*row) for row in rows]
+        elif table_name == "Production": return [ProductionStation(*row) for row in rows]
+        return []
+
     def get_columns(self, *table_name: tuple[str]):
         """
         Méthode qui récupère les colonnes d'une ou plusieurs DB.
@@ -152,14 +325,12 @@ class Database:
                 query = sql.SQL('SELECT * FROM "{table_name}" LIMIT 0').format(
                         table_name = sql.SQL(name)
                     )
-                self.cur.execute(query)
-
-                colnames = [desc[0] for desc in self.cur.description]
+                colnames = self._query(query, handler=lambda cur: [desc[0] for desc in cur.description])
 
                 self._ALLOWED_COLUMNS[name] = colnames
 
         except Exception as e:
-            print(f"[DATABASE] > WARN: Échec de l'introspection ({e}). Utilisation du schéma par défaut.")
+            log.warning("Échec de l'introspection (%s). Utilisation du schéma par défaut.", e)
             self._ALLOWED_COLUMNS = {
             "Client":       ["ID",      "Distance"],
                             # int       # int
@@ -184,7 +355,7 @@ class Database:
         """
 
         # Check pour s'assurer qu'on est bien connecté à la DB centrale
-        if not self.cur: return []
+        if not self.pool: return []
 
         # Colonnes
         cols_to_build_sql = []
@@ -205,11 +376,11 @@ class Database:
                     cols_to_return_str.append(col_name)
 
                 else:
-                    print(f"[DATABASE] > WARNING: Colonne '{col_name}' ignorée (non valide ou non autorisée).")
+                    log.warning("Colonne '%s' ignorée (non valide ou non autorisée).", col_name)
 
             # FALLBACK si le code ne trouve pas de colonnes valides à récupérer
             if not cols_to_build_sql:
-                print("[DATABASE] > ERROR (get_table): Aucune colonne valide à récupérer.")
+                log.error("get_table : Aucune colonne valide à récupérer.")
                 return []
 
             # On construit notre requête SQL en fonction des colonnes qu'on a demandé.
@@ -219,14 +390,15 @@ class Database:
             )
 
             # On execute notre requête
-            self.cur.execute(query)
+            load_start = time.perf_counter()
+            rows = self._query(query)
 
             # Liste des objets récupérés
             table_list = []
 
             # Pour chaque ligne de DB qu'on a récupéré, on créé un objet et 
             # on l'ajoute à une liste d'objets.
-            for row in self.cur.fetchall():
+            for row in rows:
                 if table_name == "Client":
                     client = Client(*row)
                     table_list.append(client)
@@ -237,21 +409,92 @@ class Database:
                     prod_station = ProductionStation(*row)
                     table_list.append(prod_station)
 
+            log.info("Table %s chargée : %d lignes en %.1f ms.", table_name, len(table_list), (time.perf_counter() - load_start) * 1000)
+
             # On renvoie la DB 'locale', qui est une liste d'objets.
             return table_list
         
         # FALLBACK si le nom de la base de données n'existe pas dans notre dico
-        print("[DATABASE] > WARN: Base de donnée non renseignée.")
+        log.warning("Base de donnée non renseignée.")
         return []
     
+    def iter_table(self, table_name: str, *columns_to_fetch: tuple[str], itersize: int = 10_000, order_by: str = None) -> Iterator[tuple]:
+        """
+        Version "streaming" de get_table pour les grosses tables (ex: Client).
+
+        get_table fait un fetchall() puis crée un objet par ligne : tout est en mémoire
+        en même temps. Ici on passe par un curseur nommé (côté serveur) : PostgreSQL
+        envoie les lignes par paquets de itersize, et on les rend une par une (tuples bruts).
+        -> L'appelant construit directement sa structure, sans liste intermédiaire.
+
+        USE:
+            for client_id, distance in db.iter_table("Client", "ID", "Distance", order_by="ID"):
+                ...
+        """
+        if not self.pool: return
+        if table_name not in self._ALLOWED_COLUMNS:
+            log.warning("Base de donnée non renseignée.")
+            return
+
+        allowed = self._ALLOWED_COLUMNS[table_name]
+        columns = columns_to_fetch or allowed
+        for col_name in (*columns, *((order_by,) if order_by else ())):
+            if col_name not in allowed:
+                log.error("iter_table : Colonne '%s' invalide pour %s.", col_name, table_name)
+                return
+
+        query = sql.SQL("SELECT {cols} FROM {table}").format(
+            cols=sql.SQL(', ').join(map(sql.Identifier, columns)),
+            table=sql.Identifier(table_name)
+        )
+        if order_by:
+            query += sql.SQL(" ORDER BY {}").format(sql.Identifier(order_by))
+
+        load_start = time.perf_counter()
+        count = 0
+        with self._cursor(name=f"stream_{table_name.lower()}") as cur:
+            cur.itersize = itersize
+            cur.execute(query)
+            for row in cur:
+                count += 1
+                yield row
+
+        log.info("Table %s chargée (streaming) : %d lignes en %.1f ms.", table_name, count, (time.perf_counter() - load_start) * 1000)
+
+    def listen(self, channel: str):
+        """
+        Ouvre une connexion DÉDIÉE (hors pool, elle reste ouverte en permanence)
+        abonnée au canal LISTEN/NOTIFY donné. Retourne la connexion psycopg2,
+        ses notifications arrivent dans conn.notifies après conn.poll().
+        """
+        conn = psycopg2.connect(**self._dsn)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+        log.info("Abonné au canal '%s'.", channel)
+        return conn
+
+    def build_entity(self, table_name: str, values: dict) -> Client | Pizza | ProductionStation | None:
+        """
+        Crée l'objet correspondant à une ligne reçue sous forme de dict {colonne: valeur}
+        (ex: ligne JSON envoyée par les triggers NOTIFY).
+        """
+        columns = self._ALLOWED_COLUMNS.get(table_name)
+        if not columns: return None
+        try:
+            row = [values[col_name] for col_name in columns]
+        except KeyError as e:
+            log.warning("Colonne %s absente de la ligne %s.", e, table_name)
+            return None
+        if table_name == "Client": return Client(*row)
+        elif table_name == "Pizza": return Pizza(*row)
+        elif table_name == "Production": return ProductionStation(*row)
+        return None
+
     def __del__(self):
         """
-        Destructeur : Ferme le curseur et la connexion.
+        Destructeur : Ferme toutes les connexions du pool.
         Ceci est appelé automatiquement lorsque l'objet n'est plus utilisé.
         (On aime toujours autant la propreté ici)
         """
-        if hasattr(self, 'cur') and self.cur: 
-            self.cur.close()
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
-            print("[DATABASE] > INFO: Connexion à la BDD fermée proprement.")
\ No newline at end of file
+        self.close()
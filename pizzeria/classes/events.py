@@ -0,0 +1,36 @@
+import threading
+
+class SnapshotHub:
+    """
+    Point de rendez-vous entre le moteur (qui publie) et le serveur web (qui diffuse).
+
+    Le moteur publie une photo immuable de son état (avec le JSON DÉJÀ sérialisé),
+    seulement quand il change : le JSON est construit une fois, quel que soit le
+    nombre de navigateurs. La publication remplace la référence (copy-on-write),
+    les lecteurs ne voient donc jamais un état à moitié mis à jour.
+    Chaque publication incrémente la version, les abonnés attendent une version
+    différente de la leur (un abonné lent saute les états intermédiaires).
+    """
+
+    def __init__(self, initial) -> None:
+        """initial : Photo de départ (objet avec un champ 'payload' et une méthode _replace)"""
+        self._cond = threading.Condition()
+        self.snapshot = initial
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+
+    def publish(self, snapshot) -> bool:
+        """Publie une nouvelle photo (ignorée si son JSON est identique au précédent)."""
+        with self._cond:
+            if snapshot.payload == self.snapshot.payload: return False
+            self.snapshot = snapshot._replace(version=self.snapshot.version + 1)
+            self._cond.notify_all()
+        return True
+
+    def wait(self, version: int, timeout: float | None = None):
+        """Bloque jusqu'à ce qu'une version différente de 'version' soit publiée (ou timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.snapshot.version != version, timeout)
+            return self.snapshot
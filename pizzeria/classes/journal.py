@@ -0,0 +1,342 @@
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from .production import Task
+from .metrics import REGISTRY
+from .log import get_logger
+
+log = get_logger("JOURNAL")
+
+# Photo complète toutes les SNAPSHOT_EVERY décisions (le journal repart alors de zéro)
+SNAPSHOT_EVERY = 5_000
+# Écart max (s) entre deux fsync du journal
+SYNC_INTERVAL = 0.5
+# Décisions en attente d'écriture au-delà desquelles on jette (et compte) plutôt que de remplir la mémoire
+MAX_PENDING = 100_000
+
+RECORDS = REGISTRY.counter("pizzeria_journal_records_total", "Décisions écrites dans le journal")
+DROPPED = REGISTRY.counter("pizzeria_journal_dropped_total", "Décisions non journalisées (file pleine, valeur hors format)")
+SNAPSHOT_SECONDS = REGISTRY.histogram("pizzeria_journal_snapshot_seconds", "Écriture d'une photo complète du planning (s)")
+
+# --- Format binaire (little-endian) ---
+# Journal : en-tête (magic, génération) puis une suite d'enregistrements
+#   b"A" <qqII> poste, début (µs), durée (min), quantité + nom, taille + ingrédients
+#   b"R"        commande refusée (deadline)
+# Photo   : en-tête (magic, génération du journal qui la suit), compteurs, ingrédients, tâches
+# Chaînes : longueur <H> + UTF-8, ingrédients : nombre <H> puis (nom, nb <I>)
+_WAL_MAGIC = b"PZJ1"
+_SNAP_MAGIC = b"PZS1"
+_HEADER = struct.Struct("<4sQ")
+_TASK = struct.Struct("<qqII")
+_LENGTH = struct.Struct("<H")
+_COUNTERS = struct.Struct("<QQ")
+_COUNT = struct.Struct("<I")
+_INGREDIENT = struct.Struct("<I")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MINUTE = timedelta(minutes=1)
+
+
+class Accepted(NamedTuple):
+    """Commande placée (de quoi refaire la réservation et les compteurs)."""
+    station_id: int
+    start: datetime
+    end: datetime
+    quantity: int
+    pizza_name: str
+    pizza_size: str
+    ingredients: Tuple[Tuple[str, int], ...]   # (ingrédient, nb), déjà multiplié par la quantité
+
+
+class Refused(NamedTuple):
+    """Commande refusée faute de poste à temps."""
+
+
+class Snapshot(NamedTuple):
+    """Photo de l'état : compteurs et tâches de chaque poste."""
+    accepted: int
+    refused: int
+    ingredients: dict
+    tasks: List[Tuple[int, Task]]              # (poste, tâche)
+
+
+def _fsync_directory(path: str) -> None:
+    """Rend durables les créations / renommages du dossier (sans objet sous Windows)."""
+    if os.name == "nt": return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _pack_str(value: str) -> bytes:
+    raw = value.encode('utf-8')
+    if len(raw) > 0xFFFF: raise ValueError(f"Chaîne trop longue pour le journal ({len(raw)} octets)")
+    return _LENGTH.pack(len(raw)) + raw
+
+def _unpack_str(buf: memoryview, pos: int) -> Tuple[str, int]:
+    n = _LENGTH.unpack_from(buf, pos)[0]
+    pos += _LENGTH.size
+    if pos + n > len(buf): raise IndexError("Chaîne tronquée")
+    return bytes(buf[pos:pos + n]).decode('utf-8'), pos + n
+
+def _pack_task(station_id: int, start: datetime, end: datetime, quantity: int, pizza_name: str, pizza_size: str) -> bytes:
+    return (_TASK.pack(station_id, (start - _EPOCH) // _MICROSECOND, (end - start) // _MINUTE, quantity)
+            + _pack_str(pizza_name) + _pack_str(pizza_size))
+
+def _unpack_task(buf: memoryview, pos: int) -> Tuple[int, Task, int]:
+    station_id, start_us, prod_time, quantity = _TASK.unpack_from(buf, pos)
+    pizza_name, pos = _unpack_str(buf, pos + _TASK.size)
+    pizza_size, pos = _unpack_str(buf, pos)
+    start = _EPOCH + timedelta(microseconds=start_us)
+    return station_id, Task(quantity, start, start + timedelta(minutes=prod_time), pizza_name, pizza_size), pos
+
+def _pack_ingredients(ingredients) -> bytes:
+    if len(ingredients) > 0xFFFF: raise ValueError(f"Trop d'ingrédients pour le journal ({len(ingredients)})")
+    parts = [_LENGTH.pack(len(ingredients))]
+    for ingredient, count in ingredients:
+        parts.append(_pack_str(ingredient) + _INGREDIENT.pack(count))
+    return b"".join(parts)
+
+def _unpack_ingredients(buf: memoryview, pos: int) -> Tuple[Tuple[Tuple[str, int], ...], int]:
+    count = _LENGTH.unpack_from(buf, pos)[0]
+    pos += _LENGTH.size
+    ingredients = []
+    for _ in range(count):
+        ingredient, pos = _unpack_str(buf, pos)
+        ingredients.append((ingredient, _INGREDIENT.unpack_from(buf, pos)[0]))
+        pos += _INGREDIENT.size
+    return tuple(ingredients), pos
+
+def _encode(record) -> bytes:
+    if isinstance(record, Refused):
+        return b"R"
+    return b"A" + _pack_task(record.station_id, record.start, record.end, record.quantity, record.pizza_name, record.pizza_size) + _pack_ingredients(record.ingredients)
+
+
+class Journal:
+    """
+    Journal binaire des décisions (append-only) + photos périodiques, pour redémarrer
+    sans perdre les réservations des fours.
+
+    -> Le thread moteur ne fait que déposer la décision dans une file bornée (aucune I/O, aucun encodage) :
+       file pleine (disque bloqué) -> décision jetée et comptée, le moteur n'attend jamais
+    -> Un thread d'écriture encode, écrit par paquets et fait un fsync au plus toutes les SYNC_INTERVAL s
+    -> Toutes les SNAPSHOT_EVERY décisions, le moteur copie son état (tâches en cours, compteurs) :
+       le thread d'écriture en fait une photo (écrite à côté puis renommée) et repart d'un journal vide
+    -> Au démarrage (load) : dernière photo, puis les décisions du journal qui la suivent
+
+    Chaque photo porte la génération du journal qui la suit : si l'arrêt tombe entre l'écriture
+    de la photo et la remise à zéro du journal, l'ancien journal (déjà dans la photo) est ignoré.
+    """
+
+    def __init__(self, directory: str, snapshot_every: int = SNAPSHOT_EVERY, sync_interval: float = SYNC_INTERVAL) -> None:
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.sync_interval = sync_interval
+        self.wal_path = os.path.join(directory, "journal.wal")
+        self.snapshot_path = os.path.join(directory, "snapshot.bin")
+
+        self.generation = 0
+        self._valid_size = 0            # Fin du dernier enregistrement complet (load)
+        self._since_snapshot = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=MAX_PENDING)
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+
+    # --- Démarrage ---
+
+    def load(self) -> Tuple[Optional[Snapshot], List]:
+        """
+        État enregistré : (dernière photo ou None, décisions écrites depuis).
+        Un dernier enregistrement incomplet (arrêt pendant l'écriture) est ignoré.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot, self.generation = self._decode_snapshot(memoryview(f.read()))
+
+        records = []
+        if os.path.exists(self.wal_path):
+            with open(self.wal_path, 'rb') as f:
+                buf = memoryview(f.read())
+            if len(buf) >= _HEADER.size:
+                magic, generation = _HEADER.unpack_from(buf, 0)
+                if magic == _WAL_MAGIC and generation == self.generation:
+                    records = self._decode_records(buf)
+                else:
+                    log.info("Journal %s ignoré (génération %s, photo : %s).", self.wal_path, generation, self.generation)
+        self._since_snapshot = len(records)
+        return snapshot, records
+
+    def _decode_snapshot(self, buf: memoryview) -> Tuple[Snapshot, int]:
+        magic, generation = _HEADER.unpack_from(buf, 0)
+        if magic != _SNAP_MAGIC: raise ValueError(f"Photo illisible : {self.snapshot_path}")
+        pos = _HEADER.size
+        accepted, refused = _COUNTERS.unpack_from(buf, pos)
+        ingredients, pos = _unpack_ingredients(buf, pos + _COUNTERS.size)
+        count = _COUNT.unpack_from(buf, pos)[0]
+        pos += _COUNT.size
+        tasks = []
+        for _ in range(count):
+            station_id, task, pos = _unpack_task(buf, pos)
+            tasks.append((station_id, task))
+        return Snapshot(accepted, refused, dict(ingredients), tasks), generation
+
+    def _decode_records(self, buf: memoryview) -> List:
+        records = []
+        pos = self._valid_size = _HEADER.size
+        try:
+            while pos < len(buf):
+                kind = buf[pos]
+                if kind == ord("R"):
+                    records.append(Refused())
+                    pos += 1
+                elif kind == ord("A"):
+                    station_id, task, pos = _unpack_task(buf, pos + 1)
+                    ingredients, pos = _unpack_ingredients(buf, pos)
+                    records.append(Accepted(station_id, task.start, task.end, task.quantity, task.pizza_name, task.pizza_size, ingredients))
+                else:
+                    break
+                self._valid_size = pos
+        except (struct.error, IndexError, UnicodeDecodeError):
+            pass
+        if self._valid_size < len(buf):
+            log.warning("Fin du journal incomplète ignorée (%d octet(s)).", len(buf) - self._valid_size)
+        return records
+
+    def start(self) -> None:
+        """Ouvre le journal (à la suite des décisions relues par load) et lance le thread d'écriture."""
+        exists = os.path.exists(self.wal_path) and self._valid_size
+        self._file = open(self.wal_path, 'r+b' if exists else 'wb')
+        if exists:
+            self._file.truncate(self._valid_size)
+            self._file.seek(self._valid_size)
+        else:
+            self._file.write(_HEADER.pack(_WAL_MAGIC, self.generation))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            _fsync_directory(self.directory)
+        self._thread = threading.Thread(target=self._writer, name="journal", daemon=True)
+        self._thread.start()
+
+    # --- Côté moteur (aucune I/O) ---
+
+    def _put(self, item) -> bool:
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            DROPPED.inc()
+            log.error("File du journal pleine : décision non journalisée.")
+            return False
+
+    def accepted(self, record: Accepted) -> None:
+        self._put(record)
+        self._since_snapshot += 1
+
+    def refused(self) -> None:
+        self._put(Refused())
+        self._since_snapshot += 1
+
+    def snapshot_due(self) -> bool:
+        return self._since_snapshot >= self.snapshot_every
+
+    def snapshot(self, stats, prod_manager) -> None:
+        """Copie de l'état (les tâches sont immuables : simple copie des références), écrite par le thread."""
+        tasks = [(station.id, task) for station in prod_manager.stations for task in station.planning]
+        # File pleine : on réessaiera au prochain lot
+        if self._put(Snapshot(stats.accepted_orders, stats.refused_orders, dict(stats.ingredients), tasks)):
+            self._since_snapshot = 0
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread:
+            try:
+                self._queue.put(None, timeout=timeout)
+                self._thread.join(timeout)
+            except queue.Full:
+                pass
+            if self._thread.is_alive():
+                log.error("Journal : écriture non terminée après %.0f s (%d élément(s) en attente perdus).", timeout, self._queue.qsize())
+            self._thread = None
+
+    # --- Thread d'écriture ---
+
+    def _writer(self) -> None:
+        last_sync = time.monotonic()
+        running = True
+        while running:
+            # Tout ce qui attend part en une seule écriture
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                chunk = []
+                for item in items:
+                    if item is None:
+                        running = False
+                    elif isinstance(item, Snapshot):
+                        self._file.write(b"".join(chunk))
+                        chunk = []
+                        self._write_snapshot(item)
+                    else:
+                        # Une valeur hors format ne doit ni tuer le thread ni faire perdre le reste du paquet
+                        try:
+                            chunk.append(_encode(item))
+                            RECORDS.inc()
+                        except (ValueError, struct.error) as e:
+                            DROPPED.inc()
+                            log.error("Décision non journalisée (%s)", e)
+                self._file.write(b"".join(chunk))
+                self._file.flush()
+
+                now = time.monotonic()
+                if not running or now - last_sync >= self.sync_interval:
+                    os.fsync(self._file.fileno())
+                    last_sync = now
+            except Exception as e:
+                # Disque plein, dossier supprimé... : le moteur continue, sans garantie au redémarrage
+                log.error("Écriture du journal impossible (%s)", e)
+        self._file.close()
+
+    def _write_snapshot(self, snapshot: Snapshot) -> None:
+        """Photo écrite à côté puis renommée (jamais de photo à moitié écrite), puis journal remis à zéro."""
+        with SNAPSHOT_SECONDS.time():
+            generation = self.generation + 1
+            tasks = []
+            for station_id, t in snapshot.tasks:
+                try:
+                    tasks.append(_pack_task(station_id, t.start, t.end, t.quantity, t.pizza_name, t.pizza_size))
+                except (ValueError, struct.error) as e:
+                    DROPPED.inc()
+                    log.error("Tâche absente de la photo (%s)", e)
+            parts = [_HEADER.pack(_SNAP_MAGIC, generation), _COUNTERS.pack(snapshot.accepted, snapshot.refused),
+                     _pack_ingredients(tuple(snapshot.ingredients.items())), _COUNT.pack(len(tasks))]
+            parts.extend(tasks)
+
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(b"".join(parts))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            # Le renommage doit être durable avant de vider le journal : sinon, après une panne,
+            # l'ancienne photo pourrait revenir sans les décisions qui la complétaient
+            _fsync_directory(self.directory)
+
+            self._file.seek(0)
+            self._file.truncate()
+            self._file.write(_HEADER.pack(_WAL_MAGIC, generation))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.generation = generation
@@ -0,0 +1,100 @@
+import json
+import time
+import psycopg2
+from typing import NamedTuple
+from .database import Database
+from .log import get_logger
+
+log = get_logger("LISTEN")
+
+class Change(NamedTuple):
+    """Modification d'une ligne reçue par NOTIFY."""
+    table: str
+    op: str             # INSERT / UPDATE / DELETE
+    row: dict           # Nouvelle ligne (ancienne ligne pour un DELETE)
+    old: dict | None    # Ancienne ligne (UPDATE uniquement)
+
+
+class ChangeListener:
+    """
+    Abonnement LISTEN/NOTIFY aux modifications des tables Client / Pizza / Production
+    (triggers définis dans server/init.sql).
+
+    L'objet a un fileno() : on peut le passer directement à select.select()
+    ou à loop.add_reader(), puis appeler poll() quand il est prêt.
+
+    Connexion perdue -> l'abonnement passe "déconnecté" (connected == False) : il ne doit plus
+    être surveillé, et reconnect() retente le ré-abonnement avec un délai croissant (retry_in()).
+    """
+
+    CHANNEL = "pizzeria_changes"
+    RETRY_MIN = 1.0     # Délai (s) avant la première tentative de ré-abonnement
+    RETRY_MAX = 60.0    # Délai max entre deux tentatives
+
+    def __init__(self, db: Database, channel: str = CHANNEL) -> None:
+        self.db = db
+        self.channel = channel
+        self.conn = db.listen(channel)
+        self._retry_delay = self.RETRY_MIN
+        self._retry_at = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self.conn is not None
+
+    def fileno(self) -> int:
+        return self.conn.fileno()
+
+    def retry_in(self) -> float | None:
+        """Secondes avant la prochaine tentative de ré-abonnement (None si connecté)."""
+        if self.connected: return None
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def reconnect(self) -> bool:
+        """
+        Tente le ré-abonnement si le délai est écoulé. Retourne True si l'abonnement est actif.
+        Les modifications faites pendant la coupure sont perdues (elles seront vues au prochain miss / redémarrage).
+        """
+        if self.connected: return True
+        if time.monotonic() < self._retry_at: return False
+        try:
+            self.conn = self.db.listen(self.channel)
+        except Exception as e:
+            self._retry_delay = min(self._retry_delay * 2, self.RETRY_MAX)
+            self._retry_at = time.monotonic() + self._retry_delay
+            log.warning("Ré-abonnement impossible (%s), nouvel essai dans %.0f s.", str(e).strip(), self._retry_delay)
+            return False
+        self._retry_delay = self.RETRY_MIN
+        return True
+
+    def _disconnected(self) -> None:
+        self.close()
+        self.conn = None
+        self._retry_at = time.monotonic() + self._retry_delay
+
+    def poll(self) -> list[Change]:
+        """Récupère les notifications en attente (non bloquant), [] si l'abonnement est coupé."""
+        if not self.connected: return []
+        try:
+            self.conn.poll()
+        except psycopg2.Error as e:
+            log.warning("Connexion perdue (%s), ré-abonnement dans %.0f s...", str(e).strip(), self._retry_delay)
+            self._disconnected()
+            return []
+
+        changes = []
+        while self.conn.notifies:
+            notify = self.conn.notifies.pop(0)
+            try:
+                payload = json.loads(notify.payload)
+                changes.append(Change(payload["table"], payload["op"], payload["row"], payload.get("old")))
+            except (ValueError, KeyError) as e:
+                log.warning("Notification illisible ignorée (%s).", e)
+        return changes
+
+    def close(self) -> None:
+        if self.conn is None: return
+        try:
+            self.conn.close()
+        except psycopg2.Error:
+            pass
@@ -0,0 +1,143 @@
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from .metrics import REGISTRY
+
+# Les niveaux s'affichent comme les anciens print ("[ORDER] > WARN: ...")
+LEVEL_NAMES = {"WARNING": "WARN", "CRITICAL": "FATAL"}
+
+def get_logger(tag: str) -> logging.Logger:
+    """Logger d'un composant, affiché avec son tag : get_logger("ORDER") -> "[ORDER] > INFO: ..." """
+    return logging.getLogger(f"pizzeria.{tag}")
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Format console historique : [TAG] > NIVEAU: message"""
+    def format(self, record: logging.LogRecord) -> str:
+        tag = record.name.rsplit('.', 1)[-1]
+        level = LEVEL_NAMES.get(record.levelname, record.levelname)
+        line = f"[{tag}] > {level}: {record.getMessage()}"
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Une ligne JSON par enregistrement (exploitable par jq, pandas...).
+    Les décisions sur les commandes ajoutent leurs champs via extra={"decision": {...}}.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": LEVEL_NAMES.get(record.levelname, record.levelname),
+            "tag": record.name.rsplit('.', 1)[-1],
+            "msg": record.getMessage()
+        }
+        decision = getattr(record, "decision", None)
+        if decision:
+            entry.update(decision)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limite les avertissements / erreurs répétés (même logger, même message type) :
+    au-delà de 'burst' messages par fenêtre de 'interval' secondes, les suivants sont
+    supprimés, et le premier message de la fenêtre suivante indique combien l'ont été.
+    Les messages INFO / DEBUG ne sont jamais limités (c'est le niveau qui les filtre).
+    """
+    MAX_KEYS = 1024
+
+    def __init__(self, interval: float = 10.0, burst: int = 5) -> None:
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        # (logger, message type) -> [début de fenêtre, nb de messages, nb supprimés]
+        self._windows: dict[tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING: return True
+
+        # record.msg est le message AVANT formatage ("... (%s)") : même clé quel que soit l'argument
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        window = self._windows.get(key)
+
+        if window is None or now - window[0] >= self.interval:
+            if len(self._windows) >= self.MAX_KEYS: self._windows.clear()
+            suppressed = window[2] if window else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} [{suppressed} message(s) identique(s) supprimé(s)]"
+            return True
+
+        window[1] += 1
+        if window[1] <= self.burst: return True
+        window[2] += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler qui ne bloque JAMAIS : si la file est pleine (sortie bloquée, terminal lent),
+    l'enregistrement est jeté et compté plutôt que de faire attendre le thread moteur.
+    """
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BackgroundListener(QueueListener):
+    """QueueListener dont l'arrêt n'attend pas indéfiniment le thread d'écriture (sortie bloquée...)."""
+    def stop(self, timeout: float = 2.0) -> None:
+        if self._thread:
+            try:
+                self.enqueue_sentinel()
+                self._thread.join(timeout)
+            except queue.Full:
+                pass
+            self._thread = None
+
+
+def setup_logging(level: str = "INFO", json_path: str = None, queue_size: int = 10_000) -> BackgroundListener:
+    """
+    Installe les logs du package 'pizzeria' :
+    -> Les threads moteur / web ne font que déposer l'enregistrement dans une file bornée
+    -> Un thread d'écriture (QueueListener) fait les I/O : console, et fichier JSON-lines si json_path
+    -> level filtre dès l'appel (un logger.debug() coupé ne coûte presque rien)
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(ConsoleFormatter())
+    handlers = [console]
+    if json_path:
+        json_file = logging.FileHandler(json_path, encoding='utf-8')
+        json_file.setFormatter(JsonLinesFormatter())
+        handlers.append(json_file)
+
+    root = logging.getLogger("pizzeria")
+    root.setLevel(level.upper())
+    root.handlers[:] = [queue_handler]
+    root.propagate = False
+
+    listener = BackgroundListener(log_queue, *handlers)
+    listener.start()
+    # Vide la file avant la fin du programme
+    atexit.register(listener.stop)
+
+    REGISTRY.callback("pizzeria_log_dropped_total", "Enregistrements de log jetés (file pleine)", lambda: queue_handler.dropped, kind="counter")
+    return listener
@@ -0,0 +1,115 @@
+import re
+from typing import Iterator
+from .client import Client
+from .pizza import Pizza
+from .production import ProductionStation
+
+# Même schéma que le schéma par défaut de Database.get_columns
+COLUMNS = {
+    "Client":       ["ID",      "Distance"],
+    "Pizza":        ["Nom",     "Taille",       "Composition",      "TPsProd",  "Prix"],
+    "Production":   ["Poste",   "Capacite",     "Disponibilite",    "Taille",   "Restriction"]
+}
+
+ENTITY_TYPES = {"Client": Client, "Pizza": Pizza, "Production": ProductionStation}
+
+_INSERT = re.compile(r'INSERT INTO "(\w+)"\s*\(([^)]*)\)\s*VALUES\s*(.*?);', re.S | re.I)
+_ROW = re.compile(r"\(((?:[^()']|'(?:[^']|'')*')*)\)")
+_VALUE = re.compile(r"\s*('(?:[^']|'')*'|[^,]+)\s*(?:,|$)")
+
+def _sql_value(token: str):
+    token = token.strip()
+    if token.startswith("'"): return token[1:-1].replace("''", "'")
+    if token.upper() in ("TRUE", "FALSE"): return token.upper() == "TRUE"
+    if token.upper() == "NULL": return None
+    return int(token)
+
+
+class MemoryDatabase:
+    """
+    Remplaçant en mémoire de Database (replay, benchmarks) : mêmes méthodes de lecture
+    que le moteur utilise (get_table, iter_table, get_entity, get_entities, build_entity),
+    sans serveur PostgreSQL. Les lignes sont des tuples dans l'ordre de COLUMNS.
+    """
+
+    def __init__(self, rows: dict[str, list[tuple]] = None) -> None:
+        self.rows = {table: list((rows or {}).get(table, ())) for table in COLUMNS}
+        self._ALLOWED_COLUMNS = COLUMNS
+        # Même test que le moteur fait sur Database ("connecté ?")
+        self.pool = True
+        # Index (table, colonnes clés) -> {clé: ligne}, construits à la première recherche
+        self._indexes: dict[tuple[str, tuple[str, ...]], dict] = {}
+        self.round_trips = 0
+
+    @classmethod
+    def from_sql(cls, path: str) -> "MemoryDatabase":
+        """Charge les INSERT d'un script SQL (ex: server/init.sql)."""
+        with open(path, encoding='utf-8') as f:
+            script = f.read()
+
+        rows = {table: [] for table in COLUMNS}
+        for table, cols, values in _INSERT.findall(script):
+            if table not in COLUMNS: continue
+            cols = [c.strip().strip('"') for c in cols.split(',')]
+            positions = [cols.index(c) for c in COLUMNS[table]]
+            for row in _ROW.findall(values):
+                parsed = [_sql_value(v) for v in _VALUE.findall(row)]
+                rows[table].append(tuple(parsed[p] for p in positions))
+        return cls(rows)
+
+    def _index(self, table_name: str, key_columns: tuple[str, ...]) -> dict:
+        key = (table_name, key_columns)
+        index = self._indexes.get(key)
+        if index is None:
+            positions = [COLUMNS[table_name].index(c) for c in key_columns]
+            index = {tuple(row[p] for p in positions): row for row in self.rows[table_name]}
+            self._indexes[key] = index
+        return index
+
+    def _build(self, table_name: str, row: tuple):
+        return ENTITY_TYPES[table_name](*row)
+
+    def get_table(self, table_name: str, *columns_to_fetch: tuple[str]) -> list:
+        self.round_trips += 1
+        if table_name not in COLUMNS: return []
+        return [self._build(table_name, row) for row in self.rows[table_name]]
+
+    def iter_table(self, table_name: str, *columns_to_fetch: tuple[str], itersize: int = 10_000, order_by: str = None) -> Iterator[tuple]:
+        self.round_trips += 1
+        if table_name not in COLUMNS: return
+        columns = COLUMNS[table_name]
+        positions = [columns.index(c) for c in (columns_to_fetch or columns)]
+        rows = self.rows[table_name]
+        if order_by:
+            order_position = columns.index(order_by)
+            rows = sorted(rows, key=lambda row: row[order_position])
+        for row in rows:
+            yield tuple(row[p] for p in positions)
+
+    def get_entity(self, table_name: str, *filters: tuple[str, any]):
+        self.round_trips += 1
+        if table_name not in COLUMNS or not filters: return None
+        key_columns = tuple(col_name for col_name, _ in filters)
+        row = self._index(table_name, key_columns).get(tuple(val for _, val in filters))
+        return self._build(table_name, row) if row else None
+
+    def get_entities(self, table_name: str, key_columns: tuple[str, ...], keys: list) -> list:
+        self.round_trips += 1
+        if table_name not in COLUMNS: return None
+        index = self._index(table_name, tuple(key_columns))
+        found = []
+        for k in keys:
+            row = index.get(tuple(k) if len(key_columns) > 1 else (k,))
+            if row: found.append(self._build(table_name, row))
+        return found
+
+    def build_entity(self, table_name: str, values: dict):
+        columns = COLUMNS.get(table_name)
+        if not columns: return None
+        try:
+            return self._build(table_name, [values[col_name] for col_name in columns])
+        except KeyError:
+            return None
+
+    def close(self) -> None:
+        self.pool = None
@@ -0,0 +1,203 @@
+import math
+import time
+import threading
+from typing import Callable
+
+class Counter:
+    """
+    Compteur croissant, éventuellement découpé selon UN label (ex: raison du refus).
+    Un seul thread écrit dans un compteur donné, la lecture (export) se fait sans verrou.
+    """
+    __slots__ = ("name", "help", "label", "values")
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label: str = None) -> None:
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values: dict[str | None, float] = {} if label else {None: 0}
+
+    def inc(self, amount: float = 1, label_value: str = None) -> None:
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def value(self, label_value: str = None) -> float:
+        return self.values.get(label_value, 0)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        return [(self.name, {self.label: v} if self.label else {}, n) for v, n in list(self.values.items())]
+
+
+class _Timer:
+    """Chronomètre pour 'with histogram.time():' (perf_counter, en secondes)."""
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: "Histogram") -> None:
+        self.histogram = histogram
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Histogram:
+    """
+    Histogramme façon HDR : buckets logarithmiques (SUB_BUCKETS par puissance de 2),
+    donc précision RELATIVE constante (~6 %) de la microseconde à plusieurs heures,
+    en mémoire fixe et en O(1) par mesure (pas de liste de toutes les valeurs).
+
+    Sert aussi pour des grandeurs sans unité (taille des lots...).
+    """
+    __slots__ = ("name", "help", "counts", "count", "sum", "max")
+    kind = "histogram"
+
+    SUB_BUCKETS = 8
+    MIN_EXP = -19   # 2^-20 ~ 1 µs
+    MAX_EXP = 14    # 2^14  ~ 4.5 h
+    N_BUCKETS = (MAX_EXP - MIN_EXP + 1) * SUB_BUCKETS
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.counts = [0] * self.N_BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, value: float) -> int:
+        if value <= 0: return 0
+        # value = m * 2^e avec 0.5 <= m < 1 -> octave e, sous-bucket selon m
+        m, e = math.frexp(value)
+        index = (e - cls.MIN_EXP) * cls.SUB_BUCKETS + int((m - 0.5) * 2 * cls.SUB_BUCKETS)
+        return min(max(index, 0), cls.N_BUCKETS - 1)
+
+    @classmethod
+    def _upper_bound(cls, index: int) -> float:
+        octave, sub = divmod(index, cls.SUB_BUCKETS)
+        return math.ldexp(0.5 + (sub + 1) / (2 * cls.SUB_BUCKETS), octave + cls.MIN_EXP)
+
+    def observe(self, value: float) -> None:
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max: self.max = value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def quantile(self, q: float) -> float:
+        """Valeur sous laquelle se trouvent q % des mesures (borne haute du bucket, précision ~6 %)."""
+        if not self.count: return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        """
+        Export Prometheus : buckets cumulés aux puissances de 2
+        (seulement la plage réellement utilisée, puis +Inf, _sum et _count).
+        """
+        counts = list(self.counts)
+        total = sum(counts)
+        used = [i for i, n in enumerate(counts) if n]
+        samples = []
+        if used:
+            first_octave, last_octave = used[0] // self.SUB_BUCKETS, used[-1] // self.SUB_BUCKETS
+            cumulative = sum(counts[:first_octave * self.SUB_BUCKETS])
+            for octave in range(first_octave, last_octave + 1):
+                cumulative += sum(counts[octave * self.SUB_BUCKETS:(octave + 1) * self.SUB_BUCKETS])
+                le = math.ldexp(1.0, octave + self.MIN_EXP)
+                samples.append((f"{self.name}_bucket", {"le": f"{le:g}"}, cumulative))
+        samples.append((f"{self.name}_bucket", {"le": "+Inf"}, total))
+        samples.append((f"{self.name}_sum", {}, self.sum))
+        samples.append((f"{self.name}_count", {}, total))
+        return samples
+
+    def summary(self) -> str:
+        """Résumé lisible (pour les logs d'arrêt)."""
+        return (f"n={self.count} p50={self.quantile(0.5) * 1000:.2f}ms "
+                f"p99={self.quantile(0.99) * 1000:.2f}ms max={self.max * 1000:.2f}ms")
+
+
+class CallbackMetric:
+    """
+    Métrique lue à l'export via une fonction (compteurs déjà tenus ailleurs :
+    cache, pool de connexions...). fn retourne un nombre, ou {valeur_label: nombre}.
+    """
+    __slots__ = ("name", "help", "kind", "fn", "label")
+
+    def __init__(self, name: str, help: str, kind: str, fn: Callable[[], float | dict], label: str = None) -> None:
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.label = label
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        result = self.fn()
+        if isinstance(result, dict):
+            return [(self.name, {self.label: k}, v) for k, v in result.items()]
+        return [(self.name, {}, result)]
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: dict) -> str:
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """Ensemble des métriques du process, exportées au format texte Prometheus (/metrics)."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram | CallbackMetric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            # Déjà déclarée (module rechargé...) -> on garde la même instance
+            existing = self._metrics.get(metric.name)
+            if existing is not None and type(existing) is type(metric) and not isinstance(metric, CallbackMetric):
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, label: str = None) -> Counter:
+        return self._register(Counter(name, help, label))
+
+    def histogram(self, name: str, help: str) -> Histogram:
+        return self._register(Histogram(name, help))
+
+    def callback(self, name: str, help: str, fn: Callable[[], float | dict], kind: str = "gauge", label: str = None) -> CallbackMetric:
+        """Déclare (ou remplace) une métrique calculée à l'export."""
+        return self._register(CallbackMetric(name, help, kind, fn, label))
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"[METRICS] > WARN: Export de {metric.name} impossible ({e}).")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {value!r}")
+        return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+# Registre global du process (comme les loggers : chaque module y déclare ses métriques)
+REGISTRY = MetricsRegistry()
@@ -1,19 +1,45 @@
-from socket import socket, AF_INET, SOCK_DGRAM, SOL_SOCKET, SO_REUSEADDR
+from collections import Counter
+from socket import socket, AF_INET, SOCK_DGRAM, SOL_SOCKET, SO_REUSEADDR, SO_RCVBUF
+
+try:
+    from socket import MSG_DONTWAIT
+except ImportError:
+    # Pas de MSG_DONTWAIT (Windows) -> recv_batch ne lit qu'un datagramme par appel
+    MSG_DONTWAIT = None
 
 class BroadCastReceiver:
     """
     Classe récepteur Broadcast UDP qui nous permet de recevoir les commandes de pizzas.
     """
-    def __init__(self, port: int, msg_len: int = 8192, timeout:int = None) -> None:
+    def __init__(self, port: int, msg_len: int = 8192, timeout:int = None, rcvbuf: int = None, ring_slots: int = 64) -> None:
         """
         Constructeur de la classe, nécessite forcément un port d'écoute, autre arguments optionnels.
+
+        - rcvbuf     : Taille (octets) du buffer noyau SO_RCVBUF, à augmenter pour encaisser les rafales
+        - ring_slots : Nombre max de datagrammes lus d'un coup par recv_batch()
         """
         self.sock = socket(AF_INET, SOCK_DGRAM)
         self.sock.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+        if rcvbuf: self.sock.setsockopt(SOL_SOCKET, SO_RCVBUF, rcvbuf)
         if timeout: self.sock.settimeout(timeout)
         self.sock.bind(('', port))
         self.msg_len = msg_len
 
+        # Anneau pré-alloué pour recv_batch() : un seul bytearray découpé en cases,
+        # recvfrom_into écrit directement dedans (pas d'allocation par datagramme)
+        self._ring = bytearray(msg_len * ring_slots)
+        self._ring_view = memoryview(self._ring)
+        self._slots = [self._ring_view[i * msg_len:(i + 1) * msg_len] for i in range(ring_slots)]
+
+        # Statistiques des lectures groupées (taille de lot -> nombre d'appels)
+        self.last_batch_size = 0
+        self.batch_sizes = Counter()
+
+    @property
+    def rcvbuf(self) -> int:
+        """Taille réelle du buffer noyau (Linux double la valeur demandée)."""
+        return self.sock.getsockopt(SOL_SOCKET, SO_RCVBUF)
+
     def __iter__(self):
         return self
 
@@ -27,6 +53,41 @@ class BroadCastReceiver:
         except Exception as e:
             print("Got exception trying to recv %s" % e)
             raise StopIteration
+
+    def recv_batch(self) -> list[memoryview]:
+        """
+        Méthode pour vider d'un coup tous les datagrammes en attente dans le socket.
+        (À appeler quand select() indique que le socket est prêt.)
+
+        Le premier recvfrom_into est bloquant comme __next__, les suivants non :
+        on s'arrête dès que le noyau n'a plus rien (ou que l'anneau est plein).
+
+        ATTENTION : Les memoryview retournées pointent dans l'anneau,
+                    elles ne sont valides que jusqu'au prochain appel.
+        """
+        batch = []
+        try:
+            for slot in self._slots:
+                if not batch:
+                    nbytes, _ = self.sock.recvfrom_into(slot)
+                elif MSG_DONTWAIT is None:
+                    break
+                else:
+                    nbytes, _ = self.sock.recvfrom_into(slot, 0, MSG_DONTWAIT)
+                batch.append(slot[:nbytes])
+
+        # Plus rien dans le buffer noyau -> fin du lot
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            # Erreur au milieu d'un lot : on rend déjà ce qu'on a lu
+            if not batch:
+                print("Got exception trying to recv %s" % e)
+                raise StopIteration
+
+        self.last_batch_size = len(batch)
+        self.batch_sizes[len(batch)] += 1
+        return batch
              
     def __enter__(self):
         return self
@@ -1,8 +1,12 @@
 from datetime import datetime, time, timedelta
+from time import perf_counter
 
 
 class Order:
 
+    # Pas de __dict__ par commande : moins de mémoire et accès aux attributs plus rapide
+    __slots__ = ("timestamp", "client_id", "pizza_name", "pizza_size", "quantity", "delivery_time", "received_at")
+
     def __init__(self, order_time: str, client_id: int, pizza_name: str, pizza_size: str, quantity: int, delivery_time: str):
         try:
             self.timestamp = datetime.strptime(order_time, "%d/%m/%Y %H:%M:%S")
@@ -14,8 +18,26 @@ class Order:
         self.quantity = int(quantity)
         formatted_deadline = delivery_time.split(":")
         self.delivery_time = time(int(formatted_deadline[0]), int(formatted_deadline[1]), 0)
+        # Instant de décodage (perf_counter), pour mesurer le délai réception -> décision
+        self.received_at = perf_counter()
     
 
+    @classmethod
+    def from_values(cls, timestamp: datetime, client_id: int, pizza_name: str, pizza_size: str, quantity: int, delivery_time: time) -> "Order":
+        """
+        Construit une commande à partir de valeurs DÉJÀ converties
+        (utilisé par le parser rapide, évite strptime et les conversions du constructeur).
+        """
+        order = cls.__new__(cls)
+        order.timestamp = timestamp
+        order.client_id = client_id
+        order.pizza_name = pizza_name
+        order.pizza_size = pizza_size
+        order.quantity = quantity
+        order.delivery_time = delivery_time
+        order.received_at = perf_counter()
+        return order
+
     def __str__(self):
         return ""
 
@@ -33,8 +55,5 @@ class Order:
             duration = delivery_date - ref_now
             return duration
         except ValueError:
-            # Traitement de l'erreur
-            print(f"\n--- ❌ COMMANDE REFUSÉE (ID {self.client_id}) ---")
-            print(f"Raison : Format d'heure invalide: {self.delivery_time}")
-            print("----------------------------------\n")
+            # Traitement de l'erreur (le refus est journalisé par l'appelant)
             return None
@@ -0,0 +1,112 @@
+from datetime import datetime, time
+from .order import Order
+
+class OrderParseError(ValueError):
+    """Datagramme de commande invalide."""
+
+
+# Caches du parser :
+# -> Noms / tailles de pizza : quelques valeurs qui reviennent sans arrêt, on réutilise les mêmes str
+# -> Heures de livraison     : 1440 valeurs "HH:MM" (mais une infinité d'écritures : "7:5", "007:05"...)
+# -> Horodatage              : à haut débit, plusieurs commandes partagent la même seconde
+# -> Date du jour            : identique pour quasiment toutes les commandes
+_MAX_INTERNED = 1024
+_strings: dict[bytes, str] = {}
+_delivery_times: dict[bytes, time] = {}
+_last_timestamp: tuple[bytes, datetime] = (b"", None)
+_last_date: tuple[bytes, tuple[int, int, int]] = (b"", (0, 0, 0))
+
+def _intern(raw: bytes) -> str:
+    """Décode un nom de pizza / une taille en réutilisant la même str à chaque fois."""
+    value = _strings.get(raw)
+    if value is None:
+        if not raw:
+            raise OrderParseError("Champ vide.")
+        try:
+            value = raw.decode()
+        except UnicodeDecodeError as e:
+            raise OrderParseError(f"Champ illisible: {raw!r}") from e
+        if len(_strings) < _MAX_INTERNED:
+            _strings[raw] = value
+    return value
+
+def _digits(raw: bytes, field: str) -> int:
+    # int() accepte aussi " 12", "+12" ou "1_2" -> on veut uniquement des chiffres
+    if not raw.isdigit():
+        raise OrderParseError(f"{field} invalide: {raw!r}")
+    return int(raw)
+
+def _parse_timestamp(raw: bytes) -> datetime:
+    """
+    "dd/mm/YYYY HH:MM:SS" découpé par position (format fixe de 19 octets).
+    Date illisible -> OrderParseError (et pas l'heure actuelle comme Order : en replay,
+    l'heure réelle n'a aucun sens et rendrait le rejeu non déterministe).
+    """
+    global _last_date, _last_timestamp
+    if raw == _last_timestamp[0]:
+        return _last_timestamp[1]
+    if len(raw) != 19 or raw[2:3] != b"/" or raw[5:6] != b"/" or raw[10:11] != b" " or raw[13:14] != b":" or raw[16:17] != b":":
+        # Format inhabituel (ex: "1/1/2025 ...") -> chemin lent, rare
+        try:
+            return datetime.strptime(raw.decode().strip(), "%d/%m/%Y %H:%M:%S")
+        except (UnicodeDecodeError, ValueError) as e:
+            raise OrderParseError(f"Horodatage invalide: {raw!r}") from e
+    try:
+        date_part = raw[:10]
+        if date_part == _last_date[0]:
+            year, month, day = _last_date[1]
+        else:
+            year, month, day = _digits(raw[6:10], "Année"), _digits(raw[3:5], "Mois"), _digits(raw[0:2], "Jour")
+        timestamp = datetime(year, month, day, _digits(raw[11:13], "Heure"), _digits(raw[14:16], "Minute"), _digits(raw[17:19], "Seconde"))
+        _last_date = (date_part, (year, month, day))
+        _last_timestamp = (raw, timestamp)
+        return timestamp
+    except ValueError as e:
+        raise OrderParseError(f"Horodatage invalide: {raw!r}") from e
+
+def _parse_delivery_time(raw: bytes) -> time:
+    """ "HH:MM" -> time(HH, MM) (objets mis en cache). """
+    value = _delivery_times.get(raw)
+    if value is None:
+        hours, sep, minutes = raw.partition(b":")
+        if not sep:
+            raise OrderParseError(f"Heure de livraison invalide: {raw!r}")
+        try:
+            value = time(_digits(hours, "Heure de livraison"), _digits(minutes.strip(), "Heure de livraison"), 0)
+        except ValueError as e:
+            raise OrderParseError(f"Heure de livraison invalide: {raw!r}") from e
+        # Même plafond que les noms : des datagrammes fantaisistes ne doivent pas faire grossir le cache
+        if len(_delivery_times) < _MAX_INTERNED:
+            _delivery_times[raw] = value
+    return value
+
+def parse_order(data: bytes | bytearray | memoryview) -> Order:
+    """
+    Parser rapide du format de commande envoyé par le broadcaster :
+
+        b"26/11/2025 10:03:12,530080,Reine,G,3,10:40"
+          date heure           client nom  taille qté livraison
+
+    Tout est fait directement sur les octets (découpage + int()), sans decode() global
+    ni strptime, qui est très lent en CPython.
+
+    Lève OrderParseError si la commande est invalide.
+    """
+    fields = bytes(data).split(b",")
+    if len(fields) != 6:
+        raise OrderParseError(f"{len(fields)} champs au lieu de 6.")
+
+    raw_timestamp, raw_client, raw_name, raw_size, raw_quantity, raw_delivery = fields
+
+    quantity = _digits(raw_quantity.strip(), "Quantité")
+    if quantity <= 0:
+        raise OrderParseError(f"Quantité invalide: {quantity}")
+
+    return Order.from_values(
+        _parse_timestamp(raw_timestamp),
+        _digits(raw_client.strip(), "ID client"),
+        _intern(raw_name),
+        _intern(raw_size),
+        quantity,
+        _parse_delivery_time(raw_delivery.strip())
+    )
@@ -1,5 +1,11 @@
+from collections import Counter
+from typing import Iterable, Iterator
+from .cache import EntityCache
+
 class Pizza:
 
+    __slots__ = ("name", "size", "composition", "production_time", "price")
+
     def __init__(self, name: str, size: str, compositon: str, production_time: int, price: str):
         self.name = name
         self.size = size
@@ -34,3 +40,86 @@ class Pizza:
                 display += "\n"
         print(display)
         return display
+
+
+class PizzaCatalog:
+    """
+    Catalogue des pizzas indexé par (Nom, Taille).
+
+    -> Recherche en O(1) au lieu de parcourir la liste des pizzas à chaque commande
+    -> Nombre d'ingrédients de chaque pizza pré-calculé une seule fois
+    -> Pizza inconnue : on passe par le cache BDD et on l'ajoute au catalogue si elle existe
+    """
+
+    # Caractères de la composition qui ne sont pas des ingrédients
+    _NOT_INGREDIENTS = {',', '-'}
+
+    def __init__(self, pizzas: Iterable[Pizza] = (), cache: EntityCache = None) -> None:
+        self.cache = cache
+        self._pizzas: dict[tuple[str, str], Pizza] = {}
+        self._ingredients: dict[tuple[str, str], tuple[tuple[str, int], ...]] = {}
+        for pizza in pizzas:
+            self.add(pizza)
+
+    def __len__(self) -> int:
+        return len(self._pizzas)
+
+    def __iter__(self) -> Iterator[Pizza]:
+        return iter(self._pizzas.values())
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._pizzas
+
+    def add(self, pizza: Pizza) -> None:
+        """Ajoute (ou remplace) une pizza et pré-calcule ses ingrédients."""
+        key = (pizza.name, pizza.size)
+        self._pizzas[key] = pizza
+
+        # "JVBJ,VBJV,..." -> (('J', 9), ('V', 8), ('B', 7))
+        counts = Counter(c for c in pizza.composition if c not in self._NOT_INGREDIENTS)
+        self._ingredients[key] = tuple(counts.items())
+
+    def remove(self, pizza_name: str, pizza_size: str) -> None:
+        """Retire une pizza du catalogue (si elle y est)."""
+        self._pizzas.pop((pizza_name, pizza_size), None)
+        self._ingredients.pop((pizza_name, pizza_size), None)
+
+    def get(self, pizza_name: str, pizza_size: str) -> Pizza | None:
+        """
+        Retourne la pizza demandée.
+        Si elle n'est pas au catalogue, peut-être nouvelle pizza sortie par le gérant
+        -> On vérifie via le cache BDD, et on l'ajoute au catalogue si elle existe.
+        """
+        key = (pizza_name, pizza_size)
+        pizza = self._pizzas.get(key)
+        if pizza is None and self.cache is not None:
+            pizza = self.cache.get(key)
+            if pizza is not None:
+                self.add(pizza)
+        return pizza
+
+    def prefetch(self, keys: Iterable[tuple[str, str]]) -> None:
+        """
+        Résout en une fois toutes les pizzas inconnues d'un lot (via le cache BDD)
+        et ajoute au catalogue celles qui existent.
+        """
+        if self.cache is None: return
+        unknown = {key for key in keys if key not in self._pizzas}
+        if not unknown: return
+        self.cache.prefetch(unknown)
+        for key in unknown:
+            if key in self.cache:
+                pizza = self.cache.get(key)
+                if pizza is not None:
+                    self.add(pizza)
+
+    def prod_time(self, pizza_name: str, pizza_size: str) -> int:
+        """Temps de prod (INT) de la pizza, 999 (pénalisant) si elle est inconnue."""
+        pizza = self.get(pizza_name, pizza_size)
+        if pizza:
+            return pizza.production_time
+        return 999 # Valeur par défaut pénalisante
+
+    def ingredient_counts(self, pizza_name: str, pizza_size: str) -> tuple[tuple[str, int], ...]:
+        """Nombre de chaque ingrédient pour UNE pizza : (('R', 6), ('J', 10), ...)."""
+        return self._ingredients.get((pizza_name, pizza_size), ())
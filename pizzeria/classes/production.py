@@ -1,10 +1,39 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from operator import attrgetter
 from datetime import datetime, timedelta
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, NamedTuple
+from .timeline import CapacityTimeline
+from .metrics import REGISTRY
+from .log import get_logger
+from .clock import Clock, SYSTEM_CLOCK
+
+log = get_logger("PROD")
+
+ASSIGN_SECONDS = REGISTRY.histogram("pizzeria_assign_seconds", "Durée de find_and_assign_station (s)")
+
+class Task(NamedTuple):
+    """
+    Tâche planifiée sur un poste.
+    (Un NamedTuple prend autant de place qu'un tuple, mais les champs ont un nom.)
+    """
+    quantity: int
+    start: datetime
+    end: datetime
+    pizza_name: str
+    pizza_size: str
+
+# Clé de tri du planning (par fin de cuisson)
+_TASK_END = attrgetter("end")
+
 
 class ProductionStation:
     """
     Poste de production gérant la capacité PARALLÈLE.
     """
+
+    __slots__ = ("id", "max_capacity", "is_available", "supported_size", "restrictions", "planning", "timeline")
+
     def __init__(self, station_id: int, max_capacity: int, is_available: bool, supported_size: str, restrictions_str: str):
         self.id = station_id
         self.max_capacity = int(max_capacity)
@@ -12,38 +41,55 @@ class ProductionStation:
         self.supported_size = supported_size
         self.restrictions = set(r.strip() for r in restrictions_str.split(',') if r.strip() and r.strip() != '---')
         
-        # Format: (quantity, start_time, end_time, pizza_name, pizza_size)
-        self.planning: List[Tuple[int, datetime, datetime, str, str]] = [] 
+        # Format: Task(quantity, start, end, pizza_name, pizza_size)
+        # Trié par fin de cuisson : les tâches terminées sont toujours en tête (cf. update)
+        self.planning: List[Task] = [] 
+
+        # Index de la charge dans le temps (maintenu en même temps que planning)
+        self.timeline = CapacityTimeline()
+
+    def reconfigure(self, other: "ProductionStation") -> None:
+        """
+        Applique la configuration d'un poste (capacité, disponibilité, taille, restrictions)
+        en GARDANT le planning en cours (les pizzas déjà au four y restent).
+        """
+        self.max_capacity = other.max_capacity
+        self.is_available = other.is_available
+        self.supported_size = other.supported_size
+        self.restrictions = other.restrictions
 
     def __str__(self):
         return f"ID: {self.id} | Capacité : {self.max_capacity} | Taille : {self.supported_size} | Restrict. : {self.restrictions}"
 
     def update(self, current_time: datetime) -> None:
-        # On ne garde que les tâches qui finissent dans le futur
-        self.planning = [t for t in self.planning if t[2] > current_time]
+        # On ne garde que les tâches qui finissent dans le futur :
+        # planning trié par fin -> on coupe seulement le début (rien à faire si rien n'a expiré)
+        if not self.planning or self.planning[0].end > current_time: return
+        del self.planning[:bisect_right(self.planning, current_time, key=_TASK_END)]
+        self.timeline.expire(current_time)
 
     def get_load_at_time(self, t: datetime) -> int:
-        return sum(qty for qty, start, end, _, _ in self.planning if start <= t < end)
+        return self.timeline.load_at(t)
+
+    def accepts(self, pizza_name: str, pizza_size: str, quantity: int) -> bool:
+        """Le poste peut-il cuire cette commande (disponibilité, restrictions, taille, capacité) ?"""
+        # Si poste est désactivé
+        if not self.is_available: return False
+        # Si le poste interdit la pizza 
+        if pizza_name in self.restrictions: return False
+        # Si le poste ne prend pas cette taille de pizza
+        if self.supported_size != "-" and pizza_size != self.supported_size: return False
+        # Si on dépasse la capacité max du poste
+        return quantity <= self.max_capacity
 
     def check_capacity_interval(self, start_t: datetime, end_t: datetime, qty_needed: int) -> bool:
         """
         Vérifie si la capacité est suffisante sur TOUT l'intervalle [start_t, end_t].
+        (Le pic de charge sur l'intervalle est lu directement dans la timeline.)
         """
-        # 1. Vérifier la charge au moment du lancement
-        if (self.max_capacity - self.get_load_at_time(start_t)) < qty_needed:
-            return False
+        return (self.max_capacity - self.timeline.max_load(start_t, end_t)) >= qty_needed
 
-        # 2. Vérifier les pics de charge futurs pendant la cuisson
-        for task_qty, task_start, task_end, _, _ in self.planning:
-            
-            # Si une autre tâche commence PENDANT que la nôtre est en cours
-            if start_t < task_start < end_t:
-                # On vérifie si ça passe à ce moment précis
-                if (self.max_capacity - self.get_load_at_time(task_start)) < qty_needed:
-                    return False
-        return True
-
-    def calculate_earliest_start(self, pizza_name: str, pizza_size: str, quantity: int, duration_minutes: int) -> Optional[datetime]:
+    def calculate_earliest_start(self, pizza_name: str, pizza_size: str, quantity: int, duration_minutes: int, now: datetime = None) -> Optional[datetime]:
         """
         Méthode qui calcule le temps de départ de cuisson d'une pizza
 
@@ -53,44 +99,42 @@ class ProductionStation:
            - Disponibilité du poste et capacité
 
         2. Check chaque tâche du poste pour avoir le début de cuisson le plus rapide           
-        """
-        # Si poste est désactivé
-        if not self.is_available: return None
-        # Si le poste interdit la pizza 
-        if pizza_name in self.restrictions: return None
-        # Si le poste ne prend pas cette taille de pizza
-        if self.supported_size != "-" and pizza_size != self.supported_size: return None
-        # Si on dépasse la capacité max du poste
-        if quantity > self.max_capacity: return None
-
-        try:
-            now = datetime.now()
-            duration = timedelta(minutes=duration_minutes)
 
-            # On teste "Maintenant" et chaque moment où une tâche se termine
-            potential_starts = [now] + [t[2] for t in self.planning if t[2] > now]
-            potential_starts.sort()
-
-            for start_t in potential_starts:
-                # Petit décalage pour être sûr d'être après la fin de la tâche précédente
-                if start_t != now:
-                    start_t += timedelta(seconds=1)
+        now : Instant de référence (horloge du moteur), datetime.now() par défaut
+        """
+        if not self.accepts(pizza_name, pizza_size, quantity): return None
+        return self.earliest_start(quantity, timedelta(minutes=duration_minutes), now or datetime.now())
 
-                end_t = start_t + duration
-                
-                # Utilisation de la nouvelle vérification sur intervalle
-                if self.check_capacity_interval(start_t, end_t, quantity):
-                    return start_t
+    def start_lower_bound(self, quantity: int, now: datetime) -> Optional[datetime]:
+        """Démarrage le plus tôt ENVISAGEABLE : dès que la charge laisse quantity places (minorant de earliest_start)."""
+        return self.timeline.free_from(now, self.max_capacity - quantity)
 
-            return None
+    def earliest_start(self, quantity: int, duration: timedelta, now: datetime, latest_start: datetime = None) -> Optional[datetime]:
+        """
+        Recherche seule, SANS les vérifications de accepts() (poste déjà connu comme éligible,
+        cf. ProductionManager.eligible_stations). None si pas de démarrage possible avant latest_start.
+        """
+        try:
+            # On teste "Maintenant" et chaque moment où une tâche se termine,
+            # la timeline saute directement les instants où le four est saturé
+            return self.timeline.earliest_start(now, duration, quantity, self.max_capacity, latest_start)
         except Exception as e:
-            print(f"[PROD] > ERROR: {e}")
+            log.error("%s", e)
 
     def assign_task(self, pizza_name: str, pizza_size: str, quantity: int, prod_time: int, start_time: datetime) -> datetime:
         end_time = start_time + timedelta(minutes=prod_time)
-        self.planning.append((quantity, start_time, end_time, pizza_name, pizza_size))
+        insort(self.planning, Task(quantity, start_time, end_time, pizza_name, pizza_size), key=_TASK_END)
+        self.timeline.add(start_time, end_time, quantity)
         return end_time
 
+    def cancel_task(self, start_time: datetime, end_time: datetime, quantity: int) -> None:
+        """Annule la DERNIÈRE réservation identique faite par assign_task (essais du BatchScheduler)."""
+        i = bisect_right(self.planning, end_time, key=_TASK_END) - 1
+        while self.planning[i].start != start_time or self.planning[i].quantity != quantity:
+            i -= 1
+        del self.planning[i]
+        self.timeline.remove(start_time, end_time, quantity)
+
 
 class ProductionManager:
 
@@ -99,10 +143,22 @@ class ProductionManager:
     l'attribution des commandes aux différents postes de production.
     """
 
-    def __init__(self, db_instance):
+    def __init__(self, db_instance, clock: Clock = SYSTEM_CLOCK, bounded_search: bool = True):
+
+        # Horloge du moteur (simulée pour le replay / les benchmarks)
+        self.clock = clock
+
+        # Recherche du meilleur poste guidée par les minorants (False : tous les postes éligibles, cf. find_best_station)
+        self.bounded_search = bounded_search
 
         # Liste des postes (objets Poste)
         self.stations: List[ProductionStation] = []
+
+        # Index d'éligibilité : (pizza, taille, tranche de quantité) -> postes candidats (triés par ID)
+        # Construit à la demande, vidé dès que l'ensemble des postes change (cf. _stations_changed)
+        self._eligibility: dict[tuple[str, str, int], List[ProductionStation]] = {}
+        self._capacities: List[int] = []
+
         self._load_stations(db_instance)
 
     def _load_stations(self, db):
@@ -119,11 +175,65 @@ class ProductionManager:
         # En cas de non connexion à la BDD
         except Exception:
             self.stations = []
+        self._stations_changed()
+
+    def _stations_changed(self) -> None:
+        """
+        À appeler à chaque ajout / modification / suppression de poste
+        (un poste ne doit donc être reconfiguré que via upsert_station).
+        """
+        self._eligibility.clear()
+        # Capacités distinctes : deux quantités entre les mêmes capacités ont les mêmes postes candidats
+        self._capacities = sorted({station.max_capacity for station in self.stations})
+
+    def eligible_stations(self, pizza_name: str, pizza_size: str, quantity: int) -> List[ProductionStation]:
+        """Postes pouvant cuire la commande (disponibles, non restreints, bonne taille, capacité suffisante)."""
+        key = (pizza_name, pizza_size, bisect_left(self._capacities, quantity))
+        candidates = self._eligibility.get(key)
+        if candidates is None:
+            candidates = [station for station in self.stations if station.accepts(pizza_name, pizza_size, quantity)]
+            self._eligibility[key] = candidates
+        return candidates
+
+    def upsert_station(self, station: ProductionStation) -> None:
+        """Ajoute un nouveau poste, ou met à jour la configuration d'un poste existant."""
+        for existing in self.stations:
+            if existing.id == station.id:
+                existing.reconfigure(station)
+                self._stations_changed()
+                return
+        self.stations.append(station)
+        self.stations.sort(key=lambda s: s.id)
+        self._stations_changed()
+
+    def remove_station(self, station_id: int) -> None:
+        """Retire un poste (ses réservations en cours sont perdues)."""
+        for existing in self.stations:
+            if existing.id == station_id:
+                if existing.planning:
+                    log.warning("Poste %s supprimé avec %d tâche(s) planifiée(s).", station_id, len(existing.planning))
+                self.stations.remove(existing)
+                self._stations_changed()
+                return
 
     def update_all_stations(self, current_time: datetime) -> None:
         for station in self.stations:
             station.update(current_time)
 
+    def next_event(self, current_time: datetime) -> Optional[datetime]:
+        """
+        Prochain instant (strictement après current_time) où une cuisson démarre ou se termine,
+        c'est-à-dire où la charge d'un poste change. None si rien n'est planifié.
+        Lu dans les points de rupture des timelines, chacune gardant sa réponse
+        en cache tant que son planning ne change pas : appel quasi gratuit entre deux lots.
+        """
+        upcoming = None
+        for station in self.stations:
+            t = station.timeline.next_change(current_time)
+            if t is not None and (upcoming is None or t < upcoming):
+                upcoming = t
+        return upcoming
+
     def find_and_assign_station(self, pizza_name: str, pizza_size: str, quantity: int, prod_time: int, delivery_deadline: datetime) -> Tuple[Optional[int], Optional[datetime]]:
         """
         Méthode qui implémente la logique pour déterminer le meilleure poste de Pizza.
@@ -135,44 +245,102 @@ class ProductionManager:
         Retourne l'ID du meilleur poste (best candidate) une fois trouvé ainsi que le temps du début de cuisson
         
         """
+        with ASSIGN_SECONDS.time():
+            return self._find_and_assign_station(pizza_name, pizza_size, quantity, prod_time, delivery_deadline)
+
+    def _find_and_assign_station(self, pizza_name: str, pizza_size: str, quantity: int, prod_time: int, delivery_deadline: datetime) -> Tuple[Optional[int], Optional[datetime]]:
+        station_obj, start_t = self.find_best_station(pizza_name, pizza_size, quantity, prod_time, delivery_deadline)
+
+        # Si on a un poste -> Retourne l'ID de poste + fin de cuisson
+        if station_obj:
+            final_end = station_obj.assign_task(pizza_name, pizza_size, quantity, prod_time, start_t)
+            return station_obj.id, final_end
+
+        # Fallback si pas de poste (théoriquement impossible)
+        return None, None
+
+    def find_best_station(self, pizza_name: str, pizza_size: str, quantity: int, prod_time: int, delivery_deadline: datetime) -> Tuple[Optional[ProductionStation], Optional[datetime]]:
+        """
+        Recherche seule (sans réservation) : poste qui finit le plus tôt avant la deadline
+        (à égalité, l'ID le plus bas) et début de cuisson sur ce poste, (None, None) si aucun.
+        """
+        now = self.clock.now()
+        duration = timedelta(minutes=prod_time)
+        stations = self.eligible_stations(pizza_name, pizza_size, quantity)
+
+        # Fin de cuisson AVANT deadline de livraison -> démarrage au plus tard
+        latest_start = delivery_deadline - duration
+
+        if self.bounded_search:
+            return self._bounded_search(stations, quantity, duration, now, latest_start)
+        return self._scan_stations(stations, quantity, duration, now, latest_start)
+
+    def _scan_stations(self, stations: List[ProductionStation], quantity: int, duration: timedelta, now: datetime, latest_start: datetime) -> Tuple[Optional[ProductionStation], Optional[datetime]]:
+        """Parcours de TOUS les postes éligibles, dans l'ordre des ID."""
         best_station = None
-        best_end_time = None
 
-        # Boucle pour parcourir chaque poste
-        for station in self.stations:
+        for station in stations:
             
             # Estimation temps d'attente avant démarrage cuisson sur le poste
-            start_time = station.calculate_earliest_start(pizza_name, pizza_size, quantity, prod_time)
+            # (abandon dès que le poste ne peut plus faire mieux que le meilleur)
+            start_time = station.earliest_start(quantity, duration, now, latest_start)
 
-            # Si on a un temps de démarrage (poste valide -> Non valide = pas bonne taille ou restriction)
+            # Si on a un temps de démarrage (avant la deadline et plus tôt que le meilleur poste)
             if start_time:
 
-                # Récupère le temps de fin de cussion
-                end_time = start_time + timedelta(minutes=prod_time)
-                
-                # Si fin de cuisson AVANT deadline de livraison
-                if end_time <= delivery_deadline:
+                # Défini le meilleur poste
+                best_station = (station, start_time)
 
-                    # Compare avec le meilleur temps enregistré au fil des intérations de boucler
-                    if best_end_time is None or end_time < best_end_time:
-                        best_end_time = end_time
+                # Démarrage immédiat : aucun poste ne peut finir plus tôt
+                if start_time <= now: break
 
-                        # Défini le meilleur poste
-                        best_station = (station, start_time)
+                # Les postes suivants doivent finir STRICTEMENT plus tôt (à égalité, l'ID le plus bas gagne) :
+                # démarrage au plus tard 1 µs (résolution de datetime) avant celui-ci
+                latest_start = start_time - timedelta(microseconds=1)
 
-        # Si on a un poste -> Retourne l'ID de poste + fin de cuisson
-        if best_station:
-            station_obj, start_t = best_station
-            final_end = station_obj.assign_task(pizza_name, pizza_size, quantity, prod_time, start_t)
-            return station_obj.id, final_end
+        return best_station or (None, None)
+
+    def _bounded_search(self, stations: List[ProductionStation], quantity: int, duration: timedelta, now: datetime, latest_start: datetime) -> Tuple[Optional[ProductionStation], Optional[datetime]]:
+        """
+        Postes essayés dans l'ordre de leur démarrage le plus tôt ENVISAGEABLE (start_lower_bound, en cache) :
+        -> Tas de (démarrage, ID) : minorant pour les postes pas encore calculés, valeur exacte sinon
+        -> Le calcul exact (earliest_start) n'est fait que pour le poste en tête du tas
+        -> Dès qu'une valeur exacte arrive en tête, aucun poste restant ne peut faire mieux : c'est le meilleur
+        Même résultat que _scan_stations (fin la plus tôt, puis ID le plus bas).
+        """
+        heap = []
+        for station in stations:
+            bound = station.start_lower_bound(quantity, now)
+            if bound is None or bound > latest_start: continue
+
+            if bound <= now:
+                start_time = station.earliest_start(quantity, duration, now, latest_start)
+                if start_time is None: continue
+                # Démarrage immédiat : les postes d'ID plus bas ne le pouvaient pas
+                if start_time <= now: return station, start_time
+                heap.append((start_time, station.id, True, station))
+                latest_start = min(latest_start, start_time)
+            else:
+                heap.append((bound, station.id, False, station))
+        heapq.heapify(heap)
+
+        while heap:
+            start_time, station_id, exact, station = heapq.heappop(heap)
+            if exact: return station, start_time
+
+            # Minorant en tête : calcul exact (borne inclusive : à égalité, l'ID le plus bas gagne)
+            if start_time > latest_start: break
+            start_time = station.earliest_start(quantity, duration, now, latest_start)
+            if start_time is not None:
+                heapq.heappush(heap, (start_time, station_id, True, station))
+                latest_start = start_time
 
-        # Fallback si pas de poste (théoriquement impossible)
         return None, None
 
     def display_queues(self):
         """Affiche l'utilisation de la capacité parallèle."""
         print("\n🏭 --- ÉTAT DES FOURS ---")
-        now = datetime.now()
+        now = self.clock.now()
         
         for station in sorted(self.stations, key=lambda st: st.id):
             load = station.get_load_at_time(now)
@@ -187,8 +355,8 @@ class ProductionManager:
             else:
                 print(f"Poste {station.id} [{state}] [{bar}] {load}/{station.max_capacity} slots utilisés [🚫 {station.restrictions}]")
             
-            active_tasks = [t for t in station.planning if t[1] <= now < t[2]]
-            future_tasks = [t for t in station.planning if t[1] > now]
+            active_tasks = [t for t in station.planning if t.start <= now < t.end]
+            future_tasks = [t for t in station.planning if t.start > now]
             
             for qty, s, e, name, size in active_tasks:
                 print(f"   🔥 CUISSON : {qty}x {name:<10} {size} (Fin : {e.strftime('%H:%M')})")
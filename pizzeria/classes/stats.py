@@ -1,10 +1,72 @@
+import json
+from datetime import datetime
+from types import MappingProxyType
+from typing import NamedTuple, Mapping
+from .events import SnapshotHub
+
+class StationSnapshot(NamedTuple):
+    """État figé d'un poste, tel qu'affiché sur le dashboard."""
+    id: int
+    available: bool
+    max_capacity: int
+    current_load: int
+    size: str
+    restrictions: tuple[str, ...]
+
+
+class StatsSnapshot(NamedTuple):
+    """
+    Photo IMMUABLE de l'état du moteur, publiée par le thread moteur après chaque
+    changement et lue telle quelle par le thread web (aucun verrou, aucun parcours
+    du planning côté web : on remplace simplement la référence, copy-on-write).
+
+    payload : JSON déjà sérialisé (servi tel quel par /api/stats et /api/stream)
+    """
+    version: int
+    taken_at: datetime
+    accepted: int
+    refused: int
+    ingredients: Mapping[str, int]
+    stations: tuple[StationSnapshot, ...]
+    payload: bytes
+
+    @classmethod
+    def take(cls, stats: "PizzeriaStats", prod_manager, now: datetime, version: int = 0) -> "StatsSnapshot":
+        """Construit la photo (à appeler depuis le thread qui modifie stats / planning)."""
+        stations = tuple(
+            StationSnapshot(station.id, station.is_available, station.max_capacity, station.get_load_at_time(now),
+                            station.supported_size, tuple(station.restrictions) if station.restrictions else ())
+            for station in (prod_manager.stations if prod_manager else ())
+        )
+        ingredients = MappingProxyType(dict(stats.ingredients))
+
+        data = {
+            "stats": {
+                "accepted": stats.accepted_orders,
+                "refused": stats.refused_orders,
+                "ingredients": dict(ingredients)
+            },
+            "stations": [s._asdict() | {"restrictions": list(s.restrictions)} for s in stations]
+        }
+        payload = json.dumps(data).encode('utf-8')
+        return cls(version, now, stats.accepted_orders, stats.refused_orders, ingredients, stations, payload)
+
+
 class SharedContext:
     def __init__(self):
         self.stats = None
         self.prod_manager = None
 
+        # Photos de l'état publiées par le moteur (/api/stats et flux /api/stream)
+        self.hub = SnapshotHub(StatsSnapshot.take(PizzeriaStats(), None, datetime.now()))
+
+    @property
+    def snapshot(self) -> StatsSnapshot:
+        """Dernière photo publiée par le moteur (immuable, versionnée)."""
+        return self.hub.snapshot
+
 class PizzeriaStats:
     def __init__(self):
         self.accepted_orders = 0
         self.refused_orders = 0
-        self.ingredients = {'R': 0, 'J': 0, 'V': 0, 'B': 0}
\ No newline at end of file
+        self.ingredients = {'R': 0, 'J': 0, 'V': 0, 'B': 0}
@@ -0,0 +1,201 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+class CapacityTimeline:
+    """
+    Ligne de temps de la charge d'un poste de production.
+
+    La charge est une fonction en escalier : elle ne change qu'au début ou
+    à la fin d'une tâche. On stocke donc uniquement ces points de rupture
+    (triés) et la charge constante sur chaque segment :
+
+        times = [t0,  t1,  t2,  t3]
+        loads = [ 5,  12,   7,   0]   -> charge 12 sur [t1, t2[
+
+    La dernière charge vaut toujours 0 (après la fin de la dernière tâche).
+
+    Toutes les recherches se font par dichotomie (bisect), ce qui évite de
+    re-scanner toute la liste des tâches à chaque instant testé.
+    """
+
+    __slots__ = ("_times", "_loads", "_ends", "_free_cache", "_next_cache")
+
+    def __init__(self) -> None:
+        self._times: List[datetime] = []
+        self._loads: List[int] = []
+
+        # Fins de tâches triées (candidats de démarrage pour une nouvelle tâche)
+        self._ends: List[datetime] = []
+
+        # Cache de free_from() : seuil -> (maintenant, premier instant libre)
+        self._free_cache: Dict[int, Tuple[datetime, datetime]] = {}
+
+        # Cache de next_change() : (maintenant, prochain point de rupture)
+        self._next_cache: Optional[Tuple[datetime, Optional[datetime]]] = None
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def _split(self, t: datetime) -> int:
+        """
+        Garantit qu'un point de rupture existe à l'instant t et retourne son index.
+        Le nouveau segment hérite de la charge du segment qu'il coupe.
+        """
+        i = bisect_left(self._times, t)
+        if i < len(self._times) and self._times[i] == t:
+            return i
+        load = self._loads[i - 1] if i > 0 else 0
+        self._times.insert(i, t)
+        self._loads.insert(i, load)
+        return i
+
+    def _merge(self, i: int) -> None:
+        """
+        Supprime le point de rupture i s'il ne sert plus à rien
+        (même charge que le segment précédent).
+        """
+        if not 0 <= i < len(self._times): return
+        previous = self._loads[i - 1] if i > 0 else 0
+        if self._loads[i] == previous:
+            del self._times[i]
+            del self._loads[i]
+
+    def _apply(self, start: datetime, end: datetime, delta: int) -> None:
+        """Ajoute delta à la charge sur [start, end[."""
+        if end <= start: return
+        i = self._split(start)
+        j = self._split(end)
+        for k in range(i, j):
+            self._loads[k] += delta
+
+        # On nettoie d'abord le point de droite pour ne pas décaler l'index de gauche
+        self._merge(j)
+        self._merge(i)
+
+    def add(self, start: datetime, end: datetime, quantity: int) -> None:
+        """Réserve quantity places sur [start, end[."""
+        self._apply(start, end, quantity)
+        insort(self._ends, end)
+        self._free_cache.clear()
+        self._next_cache = None
+
+    def remove(self, start: datetime, end: datetime, quantity: int) -> None:
+        """Libère une réservation précédemment ajoutée avec add()."""
+        self._apply(start, end, -quantity)
+        i = bisect_left(self._ends, end)
+        if i < len(self._ends) and self._ends[i] == end:
+            del self._ends[i]
+        self._free_cache.clear()
+        self._next_cache = None
+
+    def expire(self, now: datetime) -> None:
+        """
+        Oublie les tâches terminées à l'instant now (end <= now).
+        Pour toute requête à partir de now, équivaut à un remove() de chacune d'elles :
+        seul le début des listes est supprimé (le passé n'est plus jamais interrogé).
+        """
+        j = bisect_right(self._ends, now)
+        if not j: return
+        del self._ends[:j]
+
+        # On garde le segment qui contient now (sa charge ne compte déjà plus les tâches terminées)
+        i = bisect_right(self._times, now) - 1
+        if i > 0:
+            del self._times[:i]
+            del self._loads[:i]
+        if self._loads and self._loads[0] == 0:
+            del self._times[0]
+            del self._loads[0]
+        self._free_cache.clear()
+        self._next_cache = None
+
+    def load_at(self, t: datetime) -> int:
+        """Charge du poste à l'instant t (tâches telles que start <= t < end)."""
+        i = bisect_right(self._times, t) - 1
+        return self._loads[i] if i >= 0 else 0
+
+    def max_load(self, start: datetime, end: datetime) -> int:
+        """Charge maximale sur l'intervalle [start, end[."""
+        i = bisect_right(self._times, start) - 1
+        j = max(bisect_left(self._times, end), i + 1)
+        if i < 0:
+            i = 0
+            if j == 0: return 0
+        return max(self._loads[i:j])
+
+    def next_change(self, now: datetime) -> Optional[datetime]:
+        """
+        Premier point de rupture strictement après now (début ou fin de cuisson), None si aucun.
+        Mis en cache jusqu'au prochain add/remove/expire : tant que now ne l'a pas atteint, il ne bouge pas.
+        """
+        cached = self._next_cache
+        if cached and cached[0] <= now and (cached[1] is None or now < cached[1]):
+            return cached[1]
+        i = bisect_right(self._times, now)
+        upcoming = self._times[i] if i < len(self._times) else None
+        self._next_cache = (now, upcoming)
+        return upcoming
+
+    def free_from(self, now: datetime, threshold: int) -> Optional[datetime]:
+        """
+        Premier instant >= now où la charge est <= threshold : minorant de earliest_start
+        (quelle que soit la durée), qui ne dépend que du seuil.
+        Résultat mis en cache par seuil jusqu'au prochain add/remove : tant que le planning
+        ne change pas, il reste valable pour tout "maintenant" situé avant lui.
+        """
+        if threshold < 0: return None
+        cached = self._free_cache.get(threshold)
+        if cached and cached[0] <= now <= cached[1]:
+            return cached[1]
+
+        i = bisect_right(self._times, now) - 1
+        free = now
+        if i >= 0 and self._loads[i] > threshold:
+            # La dernière charge vaut 0 : on finit toujours par trouver un segment assez libre
+            i += 1
+            while self._loads[i] > threshold:
+                i += 1
+            free = self._times[i]
+        self._free_cache[threshold] = (now, free)
+        return free
+
+    def earliest_start(self, now: datetime, duration: timedelta, quantity: int, max_capacity: int, latest_start: datetime = None) -> Optional[datetime]:
+        """
+        Premier instant de démarrage où quantity places sont libres pendant duration.
+        latest_start : on abandonne (None) dès que le démarrage dépasserait cet instant
+                       (deadline, ou meilleur poste déjà trouvé ailleurs).
+
+        Les instants candidats sont "maintenant" puis la fin de chaque tâche
+        future (+1s). Au lieu de tester chaque candidat l'un après l'autre, quand un segment trop chargé bloque la fenêtre, on saute directement
+        au premier candidat situé après la fin de ce segment.
+        """
+        threshold = max_capacity - quantity
+        if threshold < 0: return None
+
+        # Seules les fins de tâches futures servent de candidats
+        first_end = bisect_right(self._ends, now)
+        start_t = now
+
+        while True:
+            if latest_start is not None and start_t > latest_start:
+                return None
+            end_t = start_t + duration
+
+            # Dernier segment saturé qui chevauche [start_t, end_t[
+            i = bisect_right(self._times, start_t) - 1
+            j = max(bisect_left(self._times, end_t), i + 1)
+            blocked_until = None
+            for k in range(j - 1, max(i, 0) - 1, -1):
+                if self._loads[k] > threshold:
+                    blocked_until = self._times[k + 1]
+                    break
+
+            if blocked_until is None:
+                return start_t
+
+            # Prochain candidat (fin de tâche + 1s) situé après le blocage
+            c = bisect_left(self._ends, blocked_until - timedelta(seconds=1), lo=first_end)
+            if c >= len(self._ends):
+                return None
+            start_t = self._ends[c] + timedelta(seconds=1)
@@ -1,21 +1,181 @@
+import time
 import select
+import logging
+from functools import partial
 from datetime import datetime, timedelta
 from .classes.order import Order
+from .classes.parser import parse_order, OrderParseError
 from .classes.database import Database
 from .classes.network import BroadCastReceiver
-from .classes.client import Client
-from .classes.pizza import Pizza
+from .classes.client import Client, ClientIndex
+from .classes.pizza import Pizza, PizzaCatalog
 from .classes.production import ProductionManager
-from .classes.stats import SharedContext, PizzeriaStats
+from .classes.batch_scheduler import BatchScheduler, BatchRequest
+from .classes.journal import Journal, Accepted, Refused
+from .classes.stats import SharedContext, PizzeriaStats, StatsSnapshot
+from .classes.cache import EntityCache, LoadError
+from .classes.listener import ChangeListener, Change
+from .classes.metrics import REGISTRY
+from .classes.log import get_logger
+from .classes.clock import Clock, SYSTEM_CLOCK
+
+log = get_logger("ORDER")
+decision_log = get_logger("DECISION")
+listen_log = get_logger("LISTEN")
+cache_log = get_logger("CACHE")
+
+# Métriques du traitement des commandes (exportées sur /metrics)
+ORDERS_RECEIVED = REGISTRY.counter("pizzeria_orders_received_total", "Commandes décodées")
+ORDERS_MALFORMED = REGISTRY.counter("pizzeria_orders_malformed_total", "Datagrammes illisibles ignorés")
+ORDERS_ACCEPTED = REGISTRY.counter("pizzeria_orders_accepted_total", "Commandes acceptées")
+ORDERS_REJECTED = REGISTRY.counter("pizzeria_orders_rejected_total", "Commandes refusées, par raison", label="reason")
+BATCH_SIZES = REGISTRY.histogram("pizzeria_batch_size", "Nombre de commandes par lot")
+FLUSH_SECONDS = REGISTRY.histogram("pizzeria_flush_seconds", "Durée de traitement d'un lot (s)")
+DECISION_SECONDS = REGISTRY.histogram("pizzeria_order_decision_seconds", "Délai entre le décodage d'une commande et sa décision (s)")
+
+# Les loaders passent par get_entities, qui distingue "introuvable" (liste vide) de "BDD en erreur" (None),
+# contrairement à get_entity qui retourne None dans les deux cas
+def _load_client(db: Database, client_id: int) -> Client | None:
+    """Loader du cache client : appelé seulement si le client est inconnu (ou périmé)."""
+    cache_log.info("MISS : recherche BDD pour Client %s...", client_id)
+    clients = db.get_entities("Client", ("ID",), [client_id])
+    if clients is None: raise LoadError(f"Client {client_id}")
+    return clients[0] if clients else None
+
+def _load_pizza(db: Database, key: tuple[str, str]) -> Pizza | None:
+    """Loader du cache pizza : appelé seulement si la pizza est inconnue (ou périmée)."""
+    cache_log.info("MISS : recherche BDD pour Pizza %s...", key[0])
+    pizzas = db.get_entities("Pizza", ("Nom", "Taille"), [key])
+    if pizzas is None: raise LoadError(f"Pizza {key[0]} ({key[1]})")
+    return pizzas[0] if pizzas else None
+
+def _load_clients(db: Database, client_ids: list[int]) -> dict[int, Client]:
+    """Loader groupé du cache client : tous les clients inconnus d'un lot en une requête."""
+    cache_log.info("MISS : recherche BDD groupée pour %d client(s)...", len(client_ids))
+    clients = db.get_entities("Client", ("ID",), client_ids)
+    if clients is None: raise LoadError(f"{len(client_ids)} client(s)")
+    return {c.id: c for c in clients}
+
+def _load_pizzas(db: Database, keys: list[tuple[str, str]]) -> dict[tuple[str, str], Pizza]:
+    """Loader groupé du cache pizza : toutes les pizzas inconnues d'un lot en une requête."""
+    cache_log.info("MISS : recherche BDD groupée pour %d pizza(s)...", len(keys))
+    pizzas = db.get_entities("Pizza", ("Nom", "Taille"), keys)
+    if pizzas is None: raise LoadError(f"{len(keys)} pizza(s)")
+    return {(p.name, p.size): p for p in pizzas}
+
+def _resolve_unknowns(orders: list[Order], client_map: dict[int, Client] | ClientIndex, client_cache: EntityCache, catalog: PizzaCatalog) -> None:
+    """
+    Étape de pré-résolution d'un lot : on collecte TOUS les clients et pizzas
+    inconnus du buffer et on les cherche en une requête par table.
+    -> O(1) allers-retours BDD par lot au lieu de O(taille du lot)
+    """
+    client_cache.prefetch(o.client_id for o in orders if o.client_id not in client_map)
+    catalog.prefetch((o.pizza_name, o.pizza_size) for o in orders)
 
-def get_pizza_prod_time(pizza_name: str, pizza_size: str, pizzas_list: list[Pizza]) -> int:
-    """Helper pour retrouver le temps de prod (INT) depuis la liste des pizzas."""
-    for p in pizzas_list:
-        if p.name == pizza_name and p.size == pizza_size:
-            return int(p.production_time)
-    return 999 # Valeur par défaut pénalisante
+def find_client(client_id: int, client_map: dict[int, Client] | ClientIndex, client_cache: EntityCache) -> Client | None:
+    """Helper pour retrouver un client : table chargée au lancement, sinon cache BDD."""
+    client = client_map.get(client_id)
+    if client is None:
+        client = client_cache.get(client_id)
+    return client
 
-def _check_feasibility(order: Order, client_map: dict[int, Client], pizza_list: list[Pizza], prod_manager: ProductionManager, stats: PizzeriaStats, db: Database) -> bool:
+def _record_decision(order: Order, reason: str = None, detail: str = "", **fields) -> None:
+    """
+    Compte la décision (reason=None -> acceptée) et le délai réception -> décision,
+    puis l'écrit en UN enregistrement de log structuré (champs en extra, cf. log JSON-lines).
+    L'écriture elle-même est faite par le thread de log : aucune I/O ici.
+    """
+    latency = time.perf_counter() - order.received_at
+    DECISION_SECONDS.observe(latency)
+    if reason is None: ORDERS_ACCEPTED.inc()
+    else: ORDERS_REJECTED.inc(1, reason)
+
+    if not decision_log.isEnabledFor(logging.INFO): return
+    decision = {
+        "accepted": reason is None,
+        "reason": reason,
+        "client_id": order.client_id,
+        "pizza": order.pizza_name,
+        "size": order.pizza_size,
+        "quantity": order.quantity,
+        "latency_ms": round(latency * 1000, 3),
+        **fields
+    }
+    verdict = "✅ COMMANDE VALIDÉE" if reason is None else "❌ COMMANDE REFUSÉE"
+    decision_log.info("%s (ID %s) : %sx %s (%s) | %s", verdict, order.client_id, order.quantity,
+                      order.pizza_name, order.pizza_size, detail, extra={"decision": decision})
+
+def _validate_order(order: Order, client_map: dict[int, Client] | ClientIndex, catalog: PizzaCatalog, client_cache: EntityCache, now: datetime) -> tuple[Pizza, Client, datetime] | None:
+    """
+    Vérifications préalables au placement d'une commande (communes aux deux ordonnanceurs).
+    Retourne (pizza, client, deadline de fin de production), ou None si la commande est refusée d'office.
+    """
+
+    # Check que la pizza est bien dans notre DB (préventif pour empêcher erreur)
+    # Si pizza non trouvée localement, peut-être nouvelle pizza sortie par le gérant
+    # -> Le catalogue vérifie dans la DB centrale via son cache (qui se souvient des pizzas inexistantes)
+    target_pizza = catalog.get(order.pizza_name, order.pizza_size)
+
+    if not target_pizza: 
+        # Si pas de nouvelle pizza -> Erreur, commande refusée
+        # FALLBACK
+        _record_decision(order, "unknown_pizza", f"Raison: La pizza {order.pizza_name} n'existe pas.")
+        return None
+
+    # Si client inexistant dans notre DB, peut-être nouveau client
+    # -> Même principe, le cache vérifie dans la DB centrale
+    client = find_client(order.client_id, client_map, client_cache)
+
+    if not client:
+        # Si pas de nouveau client -> Erreur, commande refusée
+        # FALLBACK
+        _record_decision(order, "unknown_client", f"Raison: Le client {order.client_id} n'existe pas.")
+        return None
+
+    # Si on a bien un client existant (et une pizza)
+    # NOTE: On a besoin que les deux existent pour récupérer le temps de livraison 
+    #       nécessaire ainsi que les infos de durée de prod de pizza
+
+    # Calcul du temps disponible pour prod + livraison
+    time_before_delivery = order.get_time_before_delivery()
+    if not time_before_delivery:
+        _record_decision(order, "invalid_deadline", f"Raison: Format d'heure invalide: {order.delivery_time}")
+        return None
+    delivery_deadline = now + time_before_delivery - timedelta(minutes=client.distance)
+    return target_pizza, client, delivery_deadline
+
+def _count_accepted(stats: PizzeriaStats, ingredients: tuple[tuple[str, int], ...]) -> None:
+    """Compteurs d'une commande acceptée (aussi rejoués depuis le journal au redémarrage)."""
+    stats.accepted_orders += 1
+    for ingredient, count in ingredients:
+        stats.ingredients[ingredient] += count
+    stats.accepted_orders += 1
+
+def _accept(order: Order, client: Client, station_id: int, start_time: datetime, end_time: datetime, catalog: PizzaCatalog, stats: PizzeriaStats, journal: Journal | None = None) -> None:
+    """Commande placée sur un poste : stats, ingrédients, journal et décision."""
+        
+    # --- LOGIQUE DE COMPTAGE DES INGRÉDIENTS ---
+    # Les ingrédients de chaque pizza sont déjà comptés dans le catalogue
+    # (target_pizza.composition ressemble à "JVBJ,VBJV,VVJJ...")
+    # On multiplie par la quantité commandée !
+    ingredients = tuple((ingredient, count * order.quantity)
+                        for ingredient, count in catalog.ingredient_counts(order.pizza_name, order.pizza_size)
+                        if ingredient in stats.ingredients)
+    _count_accepted(stats, ingredients)
+    if journal:
+        journal.accepted(Accepted(station_id, start_time, end_time, order.quantity, order.pizza_name, order.pizza_size, ingredients))
+    # prod_manager.display_queues()
+    _record_decision(order, None, f"Dist: {client.distance}m | Poste #{station_id} | Fin Production : {end_time.strftime('%H:%M:%S')}",
+                     distance=client.distance, station=station_id, end=end_time.isoformat(timespec='seconds'))
+
+def _refuse_deadline(order: Order, client: Client, stats: PizzeriaStats, journal: Journal | None = None) -> None:
+    """Aucun poste ne peut finir la commande à temps."""
+    stats.refused_orders += 1
+    if journal: journal.refused()
+    _record_decision(order, "deadline", f"Raison: Deadline impossible à respecter (à livrer avant {order.delivery_time})",
+                     distance=client.distance, deliver_before=order.delivery_time.isoformat())
+
+def _check_feasibility(order: Order, client_map: dict[int, Client] | ClientIndex, catalog: PizzaCatalog, prod_manager: ProductionManager, stats: PizzeriaStats, client_cache: EntityCache, clock: Clock = SYSTEM_CLOCK, journal: Journal | None = None) -> bool:
     """
     Fonction qui détermine la faisabilité d'une commande de pizzas.
     1.  On vérifie que la pizza existe bien dans notre DB locale et que le client aussi
@@ -33,67 +193,10 @@ def _check_feasibility(order: Order, client_map: dict[int, Client], pizza_list:
     ->  Commande rejetée (False)
 
     """
-
-    # Check que la pizza est bien dans notre DB (préventif pour empêcher erreur)
-    target_pizza = None
-    for pizza in pizza_list:
-        if pizza.name == order.pizza_name and pizza.size == order.pizza_size:
-            target_pizza = pizza
-            break
-    # Si pizza non trouvée
-    if not target_pizza: 
-        # Peut-être nouvelle pizza sortie par le gérant
-        # Donc on vérifie dans la DB centrale si on a une nouvelle pizza
-        print(f"[CACHE MISS] Recherche BDD pour Pizza: {order.pizza_name}...")
-        
-        new_pizza = db.get_entity("Pizza", ("Nom", order.pizza_name), ("Taille", order.pizza_size))
-        
-        # Si on a bien une nouvelle pizza on ajoute notre nouvelle pizza à la liste.
-        if new_pizza:
-            target_pizza = new_pizza
-            pizza_list.append(new_pizza)
-        else:
-            # Si pas de nouvelle pizza -> Erreur, commande refusée
-            # FALLBACK
-            print(f"\n--- ❌ COMMANDE REFUSÉE (ID {order.client_id}) ---")
-            print(f"Raison: La pizza {order.pizza_name} n'existe pas.")
-            print("----------------------------------\n")
-            return False
-
-    client = client_map.get(order.client_id)
-
-    # Si client inexistant dans notre DB
-    if not client:
-        # Peut-être nouveau client
-        # Donc on vérifie dans la DB centrale si on a un nouveau client
-        print(f"[CACHE MISS] Recherche BDD pour Client: {order.client_id}...")
-        
-        new_client = db.get_entity("Client", ("ID", order.client_id))
-        
-        # Si on a bien un nouveau client on ajoute notre nouveau client à la liste
-        if new_client:
-            client = new_client
-            client_map[client.id] = client
-            
-        else:
-            # Si pas de nouveau client -> Erreur, commande refusée
-            # FALLBACK
-            print(f"\n--- ❌ COMMANDE REFUSÉE (ID {order.client_id}) ---")
-            print(f"Raison: Le client {order.client_id} n'existe pas.")
-            print("----------------------------------\n")
-            return False
-
-    # Si on a bien un client existant (et une pizza)
-    # NOTE: On a besoin que les deux existent pour récupérer le temps de livraison 
-    #       nécessaire ainsi que les infos de durée de prod de pizza
-
-    # Calcul du temps disponible pour prod + livraison
-    time_before_delivery = order.get_time_before_delivery()
-    if not time_before_delivery: return False 
-    delivery_deadline = datetime.now() + time_before_delivery - timedelta(minutes=client.distance)
-    
-    # On met à jour les infos qu'on a sur chacun des postes de production
-    prod_manager.update_all_stations(datetime.now())
+    now = clock.now()
+    validated = _validate_order(order, client_map, catalog, client_cache, now)
+    if not validated: return False
+    target_pizza, client, delivery_deadline = validated
 
     # On détermine le meilleur poste de production pour notre commande (best candidate)
     station_id, end_time = prod_manager.find_and_assign_station(
@@ -106,72 +209,320 @@ def _check_feasibility(order: Order, client_map: dict[int, Client], pizza_list:
 
     # Une fois qu'on a notre poste de prod assigné, on envoie la commande
     if station_id:
-        stats.accepted_orders += 1
-            
-        # --- LOGIQUE DE COMPTAGE DES INGRÉDIENTS ---
-        # On parcourt chaque caractère de la composition de la pizza cible
-        # target_pizza.composition ressemble à "JVBJ,VBJV,VVJJ..."
-        for char in target_pizza.composition:
-            if char in stats.ingredients:
-                # On multiplie par la quantité commandée !
-                stats.ingredients[char] += (1 * order.quantity)
-
-        stats.accepted_orders += 1
-        print("\n--- ✅ COMMANDE VALIDÉE ---")
-        print(f"Client          : {order.client_id} (Dist: {client.distance}m)")
-        print(f"Pizza           : {order.quantity}x {order.pizza_name} ({order.pizza_size})")
-        print(f"Poste           : #{station_id}")
-        print(f"Fin Production  : {end_time.strftime('%H:%M:%S')}")
-        print("---------------------------")
-        # prod_manager.display_queues()
+        start_time = end_time - timedelta(minutes=target_pizza.production_time)
+        _accept(order, client, station_id, start_time, end_time, catalog, stats, journal)
         return True
     
     # FALLBACK si deadline impossible à respecter
     else:
-        stats.refused_orders += 1
-        print(f"\n--- ❌ COMMANDE REFUSÉE (ID {order.client_id}) ---")
-        print(f"Raison: Deadline impossible à respecter {order.pizza_name}")
-        print(f"A livrer avant : {order.delivery_time}")
-
-        print("----------------------------------\n")
+        _refuse_deadline(order, client, stats, journal)
         return False
 
-def start_processing(context: SharedContext) -> None:
+def _schedule_batch(orders: list[Order], state: "EngineState") -> list[bool]:
+    """
+    Ordonnanceur "lookahead" / "revenue" : les commandes valides du lot sont placées
+    TOUTES ENSEMBLE par le BatchScheduler (recherche sur le lot entier), dans l'ordre des marges.
+    """
+    now = state.clock.now()
+    validated = [_validate_order(o, state.client_map, state.catalog, state.client_cache, now) for o in orders]
+
+    requests = []
+    for order, v in zip(orders, validated):
+        if not v: continue
+        target_pizza, _, delivery_deadline = v
+        value = int(target_pizza.price or 0) * order.quantity if state.scheduler == "revenue" else 1
+        requests.append(BatchRequest(order.pizza_name, order.pizza_size, order.quantity, target_pizza.production_time, delivery_deadline, value))
+    placements = iter(state.batch_scheduler.schedule(requests, now))
+
+    decisions = []
+    for order, v in zip(orders, validated):
+        if not v:
+            decisions.append(False)
+            continue
+        _, client, _ = v
+        placement = next(placements)
+        if placement:
+            _accept(order, client, placement.station_id, placement.start, placement.end, state.catalog, state.stats, state.journal)
+        else:
+            _refuse_deadline(order, client, state.stats, state.journal)
+        decisions.append(placement is not None)
+    return decisions
+
+class EngineState:
+    """
+    Tout ce dont le traitement d'un lot a besoin, chargé une seule fois au lancement.
+    (Partagé par la boucle 'select' et le mode asyncio.)
+    """
+    def __init__(self, db: Database, context: SharedContext, compact_clients: bool = True, clock: Clock = SYSTEM_CLOCK, scheduler: str = "greedy") -> None:
+        """
+        compact_clients : Table client stockée en arrays parallèles (ClientIndex)
+                          plutôt qu'en dict d'objets Client (beaucoup moins de mémoire).
+        clock           : Horloge du moteur (SimulatedClock pour rejouer un journal plus vite que le temps réel)
+        scheduler       : "greedy" (commande par commande), ou pour les benchmarks seulement "lookahead"
+                          (max de commandes acceptées par lot) / "revenue" (max de chiffre d'affaires par lot), cf. SCHEDULERS
+        """
+        if scheduler not in SCHEDULERS: raise ValueError(f"Ordonnanceur inconnu : {scheduler}")
+        self.db = db
+        self.clock = clock
+        self.scheduler = scheduler
+        self.prod_manager = ProductionManager(db, clock)
+        self.batch_scheduler = BatchScheduler(self.prod_manager)
+        # Journal des décisions (cf. open_journal)
+        self.journal: Journal | None = None
+
+        # Initialisations des stats et infos IHM
+        context.prod_manager = self.prod_manager
+        self.stats = context.stats
+        self.hub = context.hub
+
+        # NOTE : Ici on simplifie la complexité, la liste des clients 
+        #        est très longue, la parcourir à chaque commande est 
+        #        gourmande en complexité donc on la cartographie.
+        #        O(n) -> O(1) (dict) ou O(log n) (ClientIndex, bien plus compact)
+        #        La table est lue en streaming (curseur côté serveur) et l'index
+        #        est construit au fil de l'eau, sans liste d'objets intermédiaire.
+        rows = db.iter_table("Client", "ID", "Distance", order_by="ID")
+        if compact_clients:
+            self.client_map = ClientIndex.from_pairs(rows)
+        else:
+            self.client_map = {client_id: Client(client_id, distance) for client_id, distance in rows}
+
+        # Cache des entités inconnues au lancement (positives ET négatives),
+        # partagé entre le calcul du slack et la vérification de faisabilité
+        self.client_cache = EntityCache(partial(_load_client, db), bulk_loader=partial(_load_clients, db))
+
+        # Même idée pour les pizzas : catalogue indexé par (Nom, Taille) -> O(1)
+        self.catalog = PizzaCatalog(db.get_table("Pizza"), EntityCache(partial(_load_pizza, db), bulk_loader=partial(_load_pizzas, db)))
+
+        # Compteurs des caches, lus à l'export /metrics
+        for stat in ("hits", "negative_hits", "misses", "load_errors", "evictions"):
+            REGISTRY.callback(f"pizzeria_cache_{stat}_total", f"Caches d'entités : {stat}", partial(self._cache_stat, stat), kind="counter", label="cache")
+        REGISTRY.callback("pizzeria_cache_entries", "Caches d'entités : entrées en mémoire", lambda: {"client": len(self.client_cache), "pizza": len(self.catalog.cache)}, label="cache")
+        REGISTRY.callback("pizzeria_clients_known", "Clients indexés en mémoire", lambda: len(self.client_map))
+
+    def _cache_stat(self, stat: str) -> dict[str, int]:
+        return {"client": getattr(self.client_cache, stat), "pizza": getattr(self.catalog.cache, stat)}
+
+    def apply_changes(self, changes: list[Change]) -> None:
+        """
+        Applique aux caches en mémoire les modifications de lignes reçues par LISTEN/NOTIFY
+        (au lieu de recharger les tables entières ou d'attendre un redémarrage).
+        """
+        for change in changes:
+            deleted = change.op == "DELETE"
+            entity = None if deleted else self.db.build_entity(change.table, change.row)
+            if entity is None and not deleted: continue
+
+            if change.table == "Client":
+                # Clé modifiée par un UPDATE -> on oublie aussi l'ancienne
+                for row in (change.old, change.row if deleted else None):
+                    if row:
+                        self.client_map.pop(row["ID"], None)
+                        self.client_cache.invalidate(row["ID"])
+                if entity:
+                    self.client_map[entity.id] = entity
+                    self.client_cache.invalidate(entity.id)
+
+            elif change.table == "Pizza":
+                for row in (change.old, change.row if deleted else None):
+                    if row:
+                        self.catalog.remove(row["Nom"], row["Taille"])
+                        self.catalog.cache.invalidate((row["Nom"], row["Taille"]))
+                if entity:
+                    self.catalog.add(entity)
+                    self.catalog.cache.invalidate((entity.name, entity.size))
+
+            elif change.table == "Production":
+                if change.old and (entity is None or change.old["Poste"] != entity.id):
+                    self.prod_manager.remove_station(change.old["Poste"])
+                if deleted:
+                    self.prod_manager.remove_station(change.row["Poste"])
+                else:
+                    self.prod_manager.upsert_station(entity)
+
+            listen_log.info("%s sur %s appliqué.", change.op, change.table)
+
+        if changes: self.publish()
+
+    def open_journal(self, directory: str) -> None:
+        """
+        Reprend l'état enregistré dans 'directory' (dernière photo + décisions suivantes : réservations
+        des fours et compteurs), puis y journalise les prochaines décisions.
+        """
+        restore_start = time.perf_counter()
+        self.journal = Journal(directory)
+        snapshot, records = self.journal.load()
+        stations = {station.id: station for station in self.prod_manager.stations}
+        lost = 0
+
+        def restore(station_id: int, start: datetime, end: datetime, quantity: int, pizza_name: str, pizza_size: str) -> None:
+            nonlocal lost
+            station = stations.get(station_id)
+            if station is None:
+                lost += 1
+                return
+            station.assign_task(pizza_name, pizza_size, quantity, (end - start) // timedelta(minutes=1), start)
+
+        if snapshot:
+            self.stats.accepted_orders = snapshot.accepted
+            self.stats.refused_orders = snapshot.refused
+            self.stats.ingredients.update(snapshot.ingredients)
+            for station_id, task in snapshot.tasks:
+                restore(station_id, task.start, task.end, task.quantity, task.pizza_name, task.pizza_size)
+        for record in records:
+            if isinstance(record, Refused):
+                self.stats.refused_orders += 1
+            else:
+                restore(record.station_id, record.start, record.end, record.quantity, record.pizza_name, record.pizza_size)
+                _count_accepted(self.stats, record.ingredients)
+        self.prod_manager.update_all_stations(self.clock.now())
+
+        if lost: log.warning("Journal : %d tâche(s) sur des postes disparus ignorée(s).", lost)
+        log.info("Journal : photo %s + %d décision(s) rejouées en %.1f ms (%d tâche(s) en cours).",
+                 "chargée" if snapshot else "absente", len(records), (time.perf_counter() - restore_start) * 1000,
+                 sum(len(station.planning) for station in self.prod_manager.stations))
+        self.journal.start()
+
+    def close(self) -> None:
+        """À appeler depuis le thread d'ordonnancement, ou une fois celui-ci arrêté (aucun lot en cours)."""
+        if self.journal:
+            # Photo finale : le prochain démarrage n'a rien à rejouer
+            self.journal.snapshot(self.stats, self.prod_manager)
+            self.journal.close()
+            self.journal = None
+
+    def publish(self) -> None:
+        """
+        Publie une nouvelle photo de l'état (/api/stats, /api/stream). Appelé seulement quand
+        il a pu changer : après un lot, une modification de la BDD, ou un début / une fin de cuisson.
+        La photo est construite ici, dans le thread moteur : le thread web ne touche jamais au planning.
+        """
+        self.hub.publish(StatsSnapshot.take(self.stats, self.prod_manager, self.clock.now()))
+
+def _init_engine(context: SharedContext, journal: str | None = None) -> EngineState | None:
+    """Initialisation des Bases de Données et de l'état du moteur (None si BDD injoignable)."""
+    init_start = time.perf_counter()
+    db = Database()
+    if not db.pool: return None
+    state = EngineState(db, context)
+    if journal: state.open_journal(journal)
+    state.publish()
+    log.info("Moteur initialisé en %.1f ms.", (time.perf_counter() - init_start) * 1000)
+    return state
+
+def parse_datagram(data: bytes | memoryview) -> Order | None:
+    """Transforme un datagramme "date,id,nom,taille,qté,heure" en commande (None si invalide)."""
+    try:
+        order = parse_order(data)
+    except OrderParseError as e:
+        # Un datagramme illisible ne doit pas faire perdre le reste du lot
+        log.warning("Commande illisible ignorée (%s)", e)
+        ORDERS_MALFORMED.inc()
+        return None
+    ORDERS_RECEIVED.inc()
+    return order
+
+def calculate_slack(o: Order, state: EngineState) -> timedelta:
+    """
+    Fonction qui détermine l'urgence (Slackà d'une commande :
+    Une pizza livrée en 1h qui a une grosse durée de 
+    livraison sera traitée AVANT qu'une pizza à livrer 
+    dans 30min mais qui n'a que 2min de route.
+
+    # Slack = (Heure Livraison) - (Maintenant) - (Prod) - (Trajet)
+    # Plus le Slack est petit, plus c'est URGENT.
+    """
+    client = find_client(o.client_id, state.client_map, state.client_cache)
+    dist = client.distance if client else 0
+    prod = state.catalog.prod_time(o.pizza_name, o.pizza_size)
+    
+    time_avail = o.get_time_before_delivery()
+    if not time_avail: return timedelta(days=999) # Non prioritaire si erreur
+    
+    # Temps nécessaire minimal (Trajet + Prod)
+    time_needed = timedelta(minutes=dist + prod)
+    
+    # Marge de manœuvre (Slack)
+    return time_avail - time_needed
+
+def flush_batch(state: EngineState, order_buffer: list[Order], trigger: str) -> list[bool]:
+    """
+    Traitement d'un lot (comparaison des Slack (Urgences)) :
+    ->  On résout d'un coup les clients / pizzas inconnus du lot
+    ->  On trie par marge croissante (les plus tendus en premier)
+    ->  On check la faisabilité dans l'ordre d'importance
+
+    Retourne la décision (acceptée ou non) de chaque commande, dans l'ordre de order_buffer (trié).
+    """
+    decisions = []
+    log.info("Tri Intelligent déclenché par : %s (%d commande(s))", trigger, len(order_buffer))
+    BATCH_SIZES.observe(len(order_buffer))
+
+    with FLUSH_SECONDS.time():
+        _resolve_unknowns(order_buffer, state.client_map, state.client_cache, state.catalog)
+        order_buffer.sort(key=partial(calculate_slack, state=state))
+
+        # On met à jour les infos qu'on a sur chacun des postes de production (une fois par lot :
+        # une tâche qui se termine pendant le lot ne gêne pas, les recherches partent de "maintenant")
+        state.prod_manager.update_all_stations(state.clock.now())
+
+        if state.scheduler == "greedy":
+            for sorted_order in order_buffer:
+                decisions.append(_check_feasibility(sorted_order, state.client_map, state.catalog, state.prod_manager, state.stats, state.client_cache, state.clock, state.journal))
+        else:
+            decisions = _schedule_batch(order_buffer, state)
+
+        # Photo périodique de l'état (écrite par le thread du journal)
+        if state.journal and state.journal.snapshot_due():
+            state.journal.snapshot(state.stats, state.prod_manager)
+
+    state.publish()
+    return decisions
+
+# Paramètres du Batch Processing
+BATCH_SIZE = 4          # Taille idéale du lot
+BUFFER_TIMEOUT = 12.0    # Temps max d'attente (secondes)
+
+# Ordonnanceurs des lots : glouton (commande par commande, le plus rapide, seul utilisé par main.py),
+# ou recherche sur le lot entier (BatchScheduler) maximisant les commandes acceptées / le chiffre d'affaires.
+# Ces deux derniers ne servent qu'aux benchmarks (benchmarks.scheduler_quality) : sur les journaux générés,
+# "lookahead" accepte exactement autant que "greedy" et "revenue" fait moins bien sur la durée.
+SCHEDULERS = ("greedy", "lookahead", "revenue")
+
+# Paramètres de réception UDP
+UDP_PORT = 40100
+UDP_RCVBUF = 4 * 1024 * 1024    # Buffer noyau (octets) pour encaisser les rafales pendant un flush
+
+def _start_listener(state: EngineState) -> ChangeListener | None:
+    """Abonnement aux modifications de la BDD (mode --listen), None si impossible."""
+    try:
+        return ChangeListener(state.db)
+    except Exception as e:
+        listen_log.error("Abonnement impossible (%s), on continue sans.", e)
+        return None
+
+def start_processing(context: SharedContext, listen: bool = False, journal: str | None = None) -> None:
     """"
     Fonction principale qui est une boucle itérative.
 
     ->  On récupère quelques commandes
     ->  On compare l'urgence de chacune pour avoir la priorité (Least Slack Time)
     ->  On envoie en prod les commandes
+
+    listen    : Applique en direct les modifications des tables (LISTEN/NOTIFY)
+    journal   : Dossier du journal des décisions (reprise des réservations au redémarrage), None : désactivé
     """
     
-    # Initialisation des Bases de Données
-    db = Database()
-    if (db.conn, db.cur) == (None, None): return
-    clients_list = db.get_table("Client")
-    pizzas = db.get_table("Pizza")
-    prod_manager = ProductionManager(db)
-
-    # Initialisations des stats et infos IHM
-    context.prod_manager = prod_manager
-    stats = context.stats
-
-    # NOTE : Ici on simplifie la complexité, la liste des clients 
-    #        est très longue, la parcourir à chaque commande est 
-    #        gourmande en complexité donc on la cartographie.
-    #        O(n) -> O(1)
-    client_map = {c.id: c for c in clients_list}
-
-    # Paramètres du Batch Processing
-    BATCH_SIZE = 4          # Taille idéale du lot
-    BUFFER_TIMEOUT = 12.0    # Temps max d'attente (secondes)
+    state = _init_engine(context, journal)
+    if state is None: return
+    listener = _start_listener(state) if listen else None
     
     order_buffer = []
     buffer_start_time = None
 
     # On démarre l'écoute du serveur de commandes UDP
-    with BroadCastReceiver(40100) as r:
-        print("[ORDER] > INFO: En attente de commandes...")
+    with BroadCastReceiver(UDP_PORT, rcvbuf=UDP_RCVBUF) as r:
+        log.info("En attente de commandes... (SO_RCVBUF: %d octets)", r.rcvbuf)
         sock = r.sock 
         
         while True:
@@ -184,75 +535,67 @@ def start_processing(context: SharedContext) -> None:
                 #    qu'une première commande arrive
 
                 if order_buffer and buffer_start_time:
-                    elapsed = (datetime.now() - buffer_start_time).total_seconds()
+                    elapsed = (state.clock.now() - buffer_start_time).total_seconds()
                     remaining = BUFFER_TIMEOUT - elapsed
                     current_select_timeout = max(0, int(remaining)) # Si négatif, on met 0 (non-bloquant)
                 else:
                     current_select_timeout = None
 
+                # -> Le dashboard doit aussi être prévenu quand une cuisson
+                #    démarre ou se termine : on se réveille à ce moment-là
+                next_event = state.prod_manager.next_event(state.clock.now())
+                if next_event:
+                    event_timeout = max(0.0, (next_event - state.clock.now()).total_seconds())
+                    if current_select_timeout is None or event_timeout < current_select_timeout:
+                        current_select_timeout = event_timeout
+
                 # 2. Attente intelligente (Réseau OU Timeout)
                 #    La fonction 'select.select()' autorise le programme à "dormir" 
                 #    jusqu'à ce qu'il se passe quelque chose (ex: paquet reçu) _OU_
                 #    que le temps imparti (ex: le reste des 6 secondes) soit écoulé.
 
-                ready, _, _ = select.select([sock], [], [], current_select_timeout)
+                # -> Abonnement LISTEN coupé : on ne le surveille plus, on retente à intervalles croissants
+                watched = [sock]
+                if listener:
+                    if listener.reconnect():
+                        watched.append(listener)
+                    elif current_select_timeout is None or listener.retry_in() < current_select_timeout:
+                        current_select_timeout = listener.retry_in()
+                ready, _, _ = select.select(watched, [], [], current_select_timeout)
+
+                # Début / fin de cuisson atteint -> nouvel état pour le dashboard
+                if next_event and state.clock.now() >= next_event:
+                    state.publish()
+
+                # Modifications de la BDD (clients, pizzas, postes) -> caches à jour
+                if listener and listener in ready:
+                    state.apply_changes(listener.poll())
 
                 # 3. Traitement Réseau
-                if ready:
-                    data = next(r)
-                    if data:
-                        parts = data.split(',')
-                        if len(parts) == 6:
-                            order = Order(*parts)
-                            
+                #    On vide d'un coup tout ce qui attend dans le socket
+                #    (un réveil de select -> potentiellement plusieurs commandes)
+                if sock in ready:
+                    for data in r.recv_batch():
+                        order = parse_datagram(data)
+                        if order:
                             # Initialisation du chrono au premier élément du buffer
                             if not order_buffer:
-                                buffer_start_time = datetime.now()
+                                buffer_start_time = state.clock.now()
                                 
                             order_buffer.append(order)
-                            print(f"[BUFFER] Reçu: {order.quantity}x {order.pizza_name} (En attente: {len(order_buffer)}/{BATCH_SIZE})")
+                            log.debug("Reçu: %dx %s (En attente: %d/%d)", order.quantity, order.pizza_name, len(order_buffer), BATCH_SIZE)
 
                 # 4. Vérification des conditions de déclenchement (Flush)
                 is_batch_full = len(order_buffer) >= BATCH_SIZE
                 is_timeout = False
                 if order_buffer and buffer_start_time:
-                    if (datetime.now() - buffer_start_time).total_seconds() >= BUFFER_TIMEOUT:
+                    if (state.clock.now() - buffer_start_time).total_seconds() >= BUFFER_TIMEOUT:
                         is_timeout = True
 
                 # 5. Traitement du lot (comparaison des Slack (Urgences))
                 if order_buffer and (is_batch_full or is_timeout):
                     trigger = "TAILLE ATTEINTE" if is_batch_full else f"TIMEOUT ({BUFFER_TIMEOUT}s)"
-                    print(f"\n[OPTIMISATION] > Tri Intelligent déclenché par : {trigger}")
-                    
-                    def calculate_slack(o: Order) -> timedelta:
-                        """
-                        Fonction qui détermine l'urgence (Slackà d'une commande :
-                        Une pizza livrée en 1h qui a une grosse durée de 
-                        livraison sera traitée AVANT qu'une pizza à livrer 
-                        dans 30min mais qui n'a que 2min de route.
-
-                        # Slack = (Heure Livraison) - (Maintenant) - (Prod) - (Trajet)
-                        # Plus le Slack est petit, plus c'est URGENT.
-                        """
-                        client = client_map.get(o.client_id)
-                        dist = client.distance if client else 0
-                        prod = get_pizza_prod_time(o.pizza_name, o.pizza_size, pizzas)
-                        
-                        time_avail = o.get_time_before_delivery()
-                        if not time_avail: return timedelta(days=999) # Non prioritaire si erreur
-                        
-                        # Temps nécessaire minimal (Trajet + Prod)
-                        time_needed = timedelta(minutes=dist + prod)
-                        
-                        # Marge de manœuvre (Slack)
-                        return time_avail - time_needed
-
-                    # On trie par marge croissante (les plus tendus en premier)
-                    order_buffer.sort(key=calculate_slack)
-
-                    # Exécution, on check la faisabilité dans l'ordre d'importance
-                    for sorted_order in order_buffer:
-                        _check_feasibility(sorted_order, client_map, pizzas, prod_manager, stats, db)
+                    flush_batch(state, order_buffer, trigger)
 
                     # Reset du buffer
                     order_buffer.clear()
@@ -260,9 +603,13 @@ def start_processing(context: SharedContext) -> None:
 
             # FALLBACK si Ctrl+C ou crash fatal
             except (StopIteration, KeyboardInterrupt):
-                print("\n[ORDER] > KILL: Arrêt du processeur de commandes.")
+                log.info("Arrêt du processeur de commandes.")
+                log.info("Datagrammes lus par réveil (taille: nb) : %s", dict(sorted(r.batch_sizes.items())))
+                log.info("Lots : %s | Décisions : %s", FLUSH_SECONDS.summary(), DECISION_SECONDS.summary())
+                if listener: listener.close()
+                state.close()
                 break
             except Exception as e:
-                print(f"[ORDER] > FATAL: Erreur boucle principale: {e.args[0]}")
+                log.critical("Erreur boucle principale: %s", e.args[0] if e.args else e)
                 order_buffer.clear()
-                buffer_start_time = None
\ No newline at end of file
+                buffer_start_time = None
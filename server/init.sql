@@ -68,4 +68,33 @@ INSERT INTO "Production" ("Poste", "Capacite", "Disponibilite", "Taille", "Restr
 (3, 18, TRUE,  'G', 'Chevre, 4_Fromages'),
 (4, 15, FALSE, '-', '-'),
 (5, 22, TRUE,  'M', '-'),
-(6, 22, FALSE,  '-',  '-');
\ No newline at end of file
+(6, 22, FALSE,  '-',  '-');
+
+-- Notification des modifications (LISTEN/NOTIFY)
+-- Chaque INSERT / UPDATE / DELETE envoie la ligne modifiée en JSON sur le canal
+-- 'pizzeria_changes', le gestionnaire (python main.py --listen) met à jour ses
+-- caches en mémoire sans recharger les tables.
+CREATE OR REPLACE FUNCTION notify_pizzeria_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('pizzeria_changes', json_build_object(
+            'table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_to_json(OLD))::text);
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM pg_notify('pizzeria_changes', json_build_object(
+            'table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_to_json(NEW), 'old', row_to_json(OLD))::text);
+    ELSE
+        PERFORM pg_notify('pizzeria_changes', json_build_object(
+            'table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_to_json(NEW))::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "Client_changes" AFTER INSERT OR UPDATE OR DELETE ON "Client"
+    FOR EACH ROW EXECUTE FUNCTION notify_pizzeria_change();
+
+CREATE TRIGGER "Pizza_changes" AFTER INSERT OR UPDATE OR DELETE ON "Pizza"
+    FOR EACH ROW EXECUTE FUNCTION notify_pizzeria_change();
+
+CREATE TRIGGER "Production_changes" AFTER INSERT OR UPDATE OR DELETE ON "Production"
+    FOR EACH ROW EXECUTE FUNCTION notify_pizzeria_change();
@@ -1,6 +1,12 @@
-import socket
+import os
+import re
+import sys
 import time
+import queue
 import random
+import socket
+import argparse
+import multiprocessing
 from datetime import datetime, timedelta
 
 # --- Configuration ---
@@ -17,56 +23,214 @@ LISTE_PIZZAS = [
     "Andalouse", "4_Fromages", "Chevre", "Chorizo", "Calzone"
 ]
 LISTE_TAILLES = ["G", "M"]
+# Clients de server/init.sql
+LISTE_CLIENT_IDS = [529997, 530143, 529996, 530111, 530080]
+
+def simulateur(host: str = HOST, port: int = PORT, intervalle: float = INTERVALLE) -> None:
+    """Mode historique : une commande toutes les 'intervalle' secondes, clients de init.sql."""
+    print(f"--- Simulateur de Commandes Pizzas ---")
+    print(f"Envoi des commandes vers {host}:{port} toutes les {intervalle} secondes.")
+    print("Appuyez sur CTRL+C pour arrêter.")
+
+    # Création du socket UDP
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        # L'option SO_BROADCAST n'est pas nécessaire pour localhost, mais
+        # elle serait requise pour un vrai broadcast réseau.
+        # s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        try:
+            while True:
+                # 1. Générer l'heure et la date actuelles
+                # Format: 26/11/2025 10:03:12
+                now = datetime.now()
+                date_heure = now.strftime('%d/%m/%Y %H:%M:%S')
+
+                # 2. Générer un ID client aléatoire
+                # Exemple: 530080
+                # On choisit un ID au hasard DANS CETTE LISTE
+                id_client = random.choice(LISTE_CLIENT_IDS)
+
+                # 3. Choisir une pizza et une taille
+                nom_pizza = random.choice(LISTE_PIZZAS)
+                taille = random.choice(LISTE_TAILLES)
 
-print(f"--- Simulateur de Commandes Pizzas ---")
-print(f"Envoi des commandes vers {HOST}:{PORT} toutes les {INTERVALLE} secondes.")
-print("Appuyez sur CTRL+C pour arrêter.")
-
-# Création du socket UDP
-with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-    # L'option SO_BROADCAST n'est pas nécessaire pour localhost, mais
-    # elle serait requise pour un vrai broadcast réseau.
-    # s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-
-    try:
-        while True:
-            # 1. Générer l'heure et la date actuelles
-            # Format: 26/11/2025 10:03:12
-            now = datetime.now()
-            date_heure = now.strftime('%d/%m/%Y %H:%M:%S')
-
-            # 2. Générer un ID client aléatoire
-            # Exemple: 530080
-            LISTE_CLIENT_IDS = [529997, 530143, 529996, 530111, 530080]
-            # On choisit un ID au hasard DANS CETTE LISTE
-            id_client = random.choice(LISTE_CLIENT_IDS)
-
-            # 3. Choisir une pizza et une taille
-            nom_pizza = random.choice(LISTE_PIZZAS)
-            taille = random.choice(LISTE_TAILLES)
-
-            # 4. Générer une quantité
-            quantite = random.randint(1, 5)
-
-            # 5. Générer une heure de livraison souhaitée
-            # (par ex. dans 30 à 90 minutes)
-            delta_livraison = timedelta(minutes=random.randint(30, 90))
-            heure_livraison = (now + delta_livraison).strftime('%H:%M') # Format: 10:40
-
-            # Construire la chaîne de caractères de la commande
-            # Format: << Date Heure, ID_Client, Nom_Pizza, Taille, Quantité, Heure_Livraison_Souhaitée »
-            commande_str = f"{date_heure},{id_client},{nom_pizza},{taille},{quantite},{heure_livraison}"
+                # 4. Générer une quantité
+                quantite = random.randint(1, 5)
+
+                # 5. Générer une heure de livraison souhaitée
+                # (par ex. dans 30 à 90 minutes)
+                delta_livraison = timedelta(minutes=random.randint(30, 90))
+                heure_livraison = (now + delta_livraison).strftime('%H:%M') # Format: 10:40
+
+                # Construire la chaîne de caractères de la commande
+                # Format: << Date Heure, ID_Client, Nom_Pizza, Taille, Quantité, Heure_Livraison_Souhaitée »
+                commande_str = f"{date_heure},{id_client},{nom_pizza},{taille},{quantite},{heure_livraison}"
             
-            # Encoder le message en bytes pour l'envoi
-            message_bytes = commande_str.encode('utf-8')
+                # Encoder le message en bytes pour l'envoi
+                message_bytes = commande_str.encode('utf-8')
 
-            # Envoyer le paquet UDP
-            s.sendto(message_bytes, (HOST, PORT))
+                # Envoyer le paquet UDP
+                s.sendto(message_bytes, (host, port))
             
-            print(f"Commande envoyée : {commande_str}")
+                print(f"Commande envoyée : {commande_str}")
+
+                # Attendre avant d'envoyer la prochaine commande
+                time.sleep(intervalle)
+
+        except KeyboardInterrupt:
+            print("\nArrêt du simulateur.")
+
+
+# --- Mode générateur de charge ---
+# Ex: python server/order_broadcaster.py --rate 5000 --processes 4 --clients 100000 --duration 30
+# Les clients synthétiques ont les IDs CLIENT_ID_BASE .. CLIENT_ID_BASE + N - 1 :
+# --write-sql génère le init.sql correspondant (mêmes pizzas / postes, table Client remplacée).
+CLIENT_ID_BASE = 600000
+INIT_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "init.sql")
+_CLIENT_INSERT = re.compile(r'INSERT INTO "Client".*?;[^\n]*', re.S)
+
+def write_init_sql(path: str, clients: int, seed: int = 0, template: str = INIT_SQL) -> None:
+    """Écrit un init.sql avec 'clients' clients synthétiques (distance aléatoire de 5 à 30)."""
+    rng = random.Random(seed)
+    rows = ",\n".join(f"({CLIENT_ID_BASE + i}, {rng.randint(5, 30)})" for i in range(clients))
+    with open(template, encoding='utf-8') as f:
+        script = f.read()
+    insert = f'INSERT INTO "Client" ("ID", "Distance") VALUES\n{rows};'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_CLIENT_INSERT.sub(lambda _: insert, script, count=1))
+
+def arrival_gaps(profile: str, rate: float, burst_size: int, rng: random.Random):
+    """
+    Intervalles (s) entre deux envois, pour un débit moyen de 'rate' commandes/s :
+    -> constant : 1 / rate
+    -> poisson  : exponentiels (arrivées indépendantes)
+    -> bursty   : rafales de 'burst_size' commandes d'un coup, rafales espacées selon Poisson
+    """
+    while True:
+        if profile == "constant":
+            yield 1 / rate
+        elif profile == "poisson":
+            yield rng.expovariate(rate)
+        else:
+            yield rng.expovariate(rate / burst_size)
+            for _ in range(burst_size - 1):
+                yield 0.0
+
+def _time_strings(second: int) -> tuple[str, list[str]]:
+    """Date de la commande et heures de livraison possibles (30 à 90 min), calculées une fois par seconde."""
+    now = datetime.fromtimestamp(second)
+    return now.strftime('%d/%m/%Y %H:%M:%S'), [(now + timedelta(minutes=m)).strftime('%H:%M') for m in range(30, 91)]
+
+def sender(index: int, args: argparse.Namespace, results: multiprocessing.Queue, stop: multiprocessing.Event) -> None:
+    """Un processus émetteur : débit args.rate / args.processes jusqu'à 'stop', bilan envoyé dans 'results'."""
+    rng = random.Random(args.seed + index)
+    count = args.count // args.processes + (index < args.count % args.processes) if args.count else 0
+    gaps = arrival_gaps(args.profile, args.rate / args.processes, args.burst_size, rng)
+    pizzas = [(nom, taille) for nom in LISTE_PIZZAS for taille in LISTE_TAILLES]
+
+    sent = errors = 0
+    max_lag = 0.0
+    current_second, date_heure, livraisons = None, "", []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        addr = (args.host, args.port)
+        start = time.perf_counter()
+        deadline = start + args.duration if args.duration else float("inf")
+        next_send = start
+        try:
+            while not count or sent + errors < count:
+                next_send += next(gaps)
+                if next_send >= deadline: break
+                delay = next_send - time.perf_counter()
+                # En avance : on dort. En retard : on envoie tout de suite pour rattraper
+                # (sleep() n'est pas assez précis sous la milliseconde)
+                if delay > 0.001: time.sleep(delay)
+                elif delay < -max_lag: max_lag = -delay
+
+                second = int(time.time())
+                if second != current_second:
+                    if stop.is_set(): break
+                    current_second = second
+                    date_heure, livraisons = _time_strings(second)
+                id_client = CLIENT_ID_BASE + rng.randrange(args.clients) if args.clients else rng.choice(LISTE_CLIENT_IDS)
+                nom_pizza, taille = rng.choice(pizzas)
+                commande = f"{date_heure},{id_client},{nom_pizza},{taille},{rng.randint(1, 5)},{rng.choice(livraisons)}"
+                try:
+                    s.sendto(commande.encode('utf-8'), addr)
+                    sent += 1
+                except OSError:
+                    # Buffer d'envoi plein (ENOBUFS / EAGAIN) : la commande est perdue
+                    errors += 1
+        except KeyboardInterrupt:
+            pass
+        elapsed = time.perf_counter() - start
+    results.put((index, sent, errors, elapsed, max_lag))
+
+def load_generator(args: argparse.Namespace) -> None:
+    """Lance args.processes émetteurs et affiche le débit réellement atteint."""
+    clients = f"{args.clients} clients synthétiques" if args.clients else f"{len(LISTE_CLIENT_IDS)} clients de init.sql"
+    print(f"[LOAD] > Cible {args.host}:{args.port} : {args.rate:,.0f} commandes/s ({args.profile}), "
+          f"{args.processes} processus, {clients}.")
+    print("[LOAD] > Appuyez sur CTRL+C pour arrêter." if not (args.duration or args.count) else
+          f"[LOAD] > Arrêt après {f'{args.duration} s' if args.duration else f'{args.count} commandes'}.")
+
+    results, stop = multiprocessing.Queue(), multiprocessing.Event()
+    processes = [multiprocessing.Process(target=sender, args=(i, args, results, stop)) for i in range(args.processes)]
+    for p in processes: p.start()
+
+    reports = []
+    while len(reports) < len(processes):
+        try:
+            reports.append(results.get(timeout=1.0))
+        except queue.Empty:
+            if not any(p.is_alive() for p in processes): break
+        except KeyboardInterrupt:
+            # Les émetteurs s'arrêtent (à la seconde suivante au plus tard) et envoient leur bilan
+            stop.set()
+    for p in processes: p.join()
+
+    total_sent = total_errors = 0
+    for index, sent, errors, elapsed, max_lag in sorted(reports):
+        total_sent += sent
+        total_errors += errors
+        print(f"[LOAD] > Processus {index} : {sent} envoyées, {errors} erreurs, "
+              f"{sent / elapsed:,.0f} commandes/s, retard max {max_lag * 1000:.1f} ms")
+    elapsed = max((r[3] for r in reports), default=0.0)
+    if not elapsed:
+        print("[LOAD] > ERROR: Aucun bilan reçu des émetteurs.")
+        return
+    achieved = total_sent / elapsed
+    print(f"[LOAD] > Total : {total_sent} envoyées en {elapsed:.2f} s, {total_errors} erreurs d'envoi")
+    print(f"[LOAD] > Débit atteint : {achieved:,.0f} / {args.rate:,.0f} commandes/s ({achieved / args.rate:.1%})")
+    # Un retard qui grandit = l'émetteur lui-même sature (ajouter des --processes)
+    # À comparer avec pizzeria_orders_received_total (/metrics) pour le point de saturation du récepteur
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulateur de commandes (UDP). Sans --rate : une commande toutes les --interval secondes.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--interval", type=float, default=INTERVALLE, help="Mode historique : secondes entre deux commandes")
+    parser.add_argument("--rate", type=float, help="Générateur de charge : débit cible total (commandes/s)")
+    parser.add_argument("--profile", choices=["constant", "poisson", "bursty"], default="poisson", help="Loi des arrivées")
+    parser.add_argument("--burst-size", type=int, default=50, help="Commandes par rafale (--profile bursty)")
+    parser.add_argument("--processes", type=int, default=1, help="Nombre de processus émetteurs")
+    parser.add_argument("--duration", type=float, default=0, help="Durée de l'envoi en secondes (0 : jusqu'à CTRL+C)")
+    parser.add_argument("--count", type=int, default=0, help="Nombre total de commandes (0 : illimité)")
+    parser.add_argument("--clients", type=int, default=0, help=f"Clients synthétiques (IDs à partir de {CLIENT_ID_BASE}, 0 : clients de init.sql)")
+    parser.add_argument("--write-sql", metavar="FICHIER", help="Écrit le init.sql correspondant à --clients puis continue (ou s'arrête sans --rate)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
 
-            # Attendre avant d'envoyer la prochaine commande
-            time.sleep(INTERVALLE)
+    if args.write_sql:
+        if not args.clients: parser.error("--write-sql nécessite --clients N.")
+        write_init_sql(args.write_sql, args.clients, args.seed)
+        print(f"[LOAD] > {args.write_sql} écrit ({args.clients} clients). À charger à la place de server/init.sql.")
+        if args.rate is None: sys.exit(0)
 
-    except KeyboardInterrupt:
-        print("\nArrêt du simulateur.")
\ No newline at end of file
+    if args.rate is None:
+        simulateur(args.host, args.port, args.interval)
+    elif args.rate <= 0 or args.processes < 1 or args.burst_size < 1:
+        parser.error("--rate, --processes et --burst-size doivent être positifs.")
+    else:
+        load_generator(args)
@@ -0,0 +1,88 @@
+"""
+Tests d'EntityCache : entrées positives / négatives, et différence entre une entité supprimée
+(entrée négative) et une BDD en erreur (l'entité déjà connue est gardée).
+"""
+import pytest
+from pizzeria.classes import cache as cache_module
+from pizzeria.classes.cache import EntityCache, LoadError
+from pizzeria.classes.memory_db import MemoryDatabase
+
+class FakeDb:
+    """Table Client en dict ; up=False : la BDD ne répond plus."""
+    def __init__(self) -> None:
+        self.rows = {1: "client 1"}
+        self.up = True
+
+    def load(self, key):
+        if not self.up: raise LoadError(key)
+        return self.rows.get(key)
+
+    def load_many(self, keys: list) -> dict:
+        if not self.up: raise LoadError(keys)
+        return {k: self.rows[k] for k in keys if k in self.rows}
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge monotone pilotée par le test."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+@pytest.fixture
+def db():
+    return FakeDb()
+
+@pytest.fixture
+def cache(db):
+    return EntityCache(db.load, refresh_ttl=300.0, negative_ttl=5.0, bulk_loader=db.load_many)
+
+
+def test_deleted_entity_becomes_negative_on_refresh(clock, db, cache):
+    assert cache.get(1) == "client 1"
+    del db.rows[1]
+    clock[0] += 300
+    assert cache.get(1) is None
+    assert cache.get(1) is None and cache.negative_hits == 1
+
+def test_db_error_keeps_known_entity_until_next_retry(clock, db, cache):
+    assert cache.get(1) == "client 1"
+    db.up = False
+    clock[0] += 300
+    assert cache.get(1) == "client 1" and cache.load_errors == 1
+    # Gardée negative_ttl secondes seulement, puis re-vérifiée
+    assert cache.get(1) == "client 1" and cache.hits == 1
+    db.up = True
+    del db.rows[1]
+    clock[0] += 5
+    assert cache.get(1) is None
+
+def test_db_error_on_unknown_key_is_not_cached(clock, db, cache):
+    db.up = False
+    assert cache.get(2) is None
+    assert 2 not in cache
+    db.up = True
+    db.rows[2] = "client 2"
+    assert cache.get(2) == "client 2"
+
+def test_prefetch_stores_misses_but_not_errors(clock, db, cache):
+    db.up = False
+    cache.prefetch([1, 2])
+    assert len(cache) == 0 and cache.load_errors == 1
+    db.up = True
+    cache.prefetch([1, 2])
+    assert cache.get(1) == "client 1" and cache.get(2) is None
+    assert cache.misses == 4 and cache.hits == 1 and cache.negative_hits == 1
+
+def test_loaders_tell_error_from_miss():
+    pytest.importorskip("psycopg2")
+    from pizzeria.order_processor import _load_client, _load_clients
+    db = MemoryDatabase({"Client": [(7, 12)]})
+    assert _load_client(db, 7).id == 7
+    assert _load_client(db, 8) is None
+    assert _load_clients(db, [7, 8]).keys() == {7}
+
+    db.get_entities = lambda *args: None
+    with pytest.raises(LoadError):
+        _load_client(db, 7)
+    with pytest.raises(LoadError):
+        _load_clients(db, [7])
@@ -0,0 +1,175 @@
+"""
+Tests du découpage des requêtes HTTP du dashboard (_read_request) et des ETag de /api/stats,
+sur une paire de sockets locale, puis du serveur complet (connexions keep-alive inactives) et du flux SSE.
+"""
+import time
+import socket
+import threading
+from collections import namedtuple
+from types import SimpleNamespace
+import pytest
+from pizzeria.classes.events import SnapshotHub
+from pizzeria.classes.stats import SharedContext
+from web import tcp
+from web.tcp import _read_request, _handle_request, _serve, BadRequest, EventStream, HttpRequest, MAX_BODY_SIZE, MAX_HEADER_SIZE, WORKERS
+
+@pytest.fixture
+def conn():
+    """(côté client, côté serveur) : le client envoie, le serveur lit avec _read_request."""
+    client, server = socket.socketpair()
+    server.settimeout(2.0)
+    yield client, server
+    client.close()
+    server.close()
+
+def read(conn, raw: bytes, close: bool = False):
+    client, server = conn
+    client.sendall(raw)
+    if close: client.shutdown(socket.SHUT_WR)
+    buffer = bytearray()
+    return _read_request(server, buffer), buffer
+
+
+def test_simple_get(conn):
+    request, buffer = read(conn, b"GET /api/stats?t=123 HTTP/1.1\r\nHost: x\r\nAccept-Encoding: gzip, br\r\n\r\n")
+    assert (request.method, request.path, request.version) == ("GET", "/api/stats", "HTTP/1.1")
+    assert request.headers["host"] == "x"
+    assert request.accepts_gzip() and request.keep_alive
+    assert request.body == b"" and buffer == b""
+
+def test_keep_alive_depends_on_version(conn):
+    request, _ = read(conn, b"GET / HTTP/1.0\r\n\r\n")
+    assert not request.keep_alive
+
+def test_body_is_consumed_and_pipelined_request_kept(conn):
+    request, buffer = read(conn, b"POST /x HTTP/1.1\r\nContent-Length: 5\r\n\r\nhelloGET /next HTTP/1.1\r\n\r\n")
+    assert request.body == b"hello"
+    # La requête suivante reste dans le buffer pour le prochain appel
+    assert buffer == b"GET /next HTTP/1.1\r\n\r\n"
+    request = _read_request(conn[1], buffer)
+    assert request.path == "/next"
+
+def test_closed_connection_returns_none(conn):
+    request, _ = read(conn, b"", close=True)
+    assert request is None
+
+def test_body_cut_short_returns_none(conn):
+    request, _ = read(conn, b"POST / HTTP/1.1\r\nContent-Length: 10\r\n\r\nabc", close=True)
+    assert request is None
+
+@pytest.mark.parametrize("raw, status", [
+    (b"GARBAGE\r\n\r\n", 400),
+    (b"GET / HTTP/1.1\r\nNo colon here\r\n\r\n", 400),
+    (b"POST / HTTP/1.1\r\nContent-Length: abc\r\n\r\n", 400),
+    (b"POST / HTTP/1.1\r\nContent-Length: -1\r\n\r\n", 400),
+    (b"POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (MAX_BODY_SIZE + 1), 413),
+    (b"GET / HTTP/1.1\r\nX-Big: " + b"a" * (MAX_HEADER_SIZE + 1), 431),
+], ids=["request-line", "header", "length-nan", "length-negative", "length-too-big", "headers-too-big"])
+def test_bad_requests(conn, raw, status):
+    with pytest.raises(BadRequest) as e:
+        read(conn, raw)
+    assert e.value.status == status
+
+def get_stats(conn, version: int, if_none_match: str = None) -> tuple[int, dict]:
+    """Statut et en-têtes de la réponse de /api/stats pour une photo de version 'version'."""
+    client, server = conn
+    context = SimpleNamespace(snapshot=SimpleNamespace(version=version, payload=b"{}"))
+    headers = {"if-none-match": if_none_match} if if_none_match else {}
+    _handle_request(server, HttpRequest("GET", "/api/stats", "HTTP/1.1", headers, b""), context, None, None, True)
+    head = client.recv(65536).split(b"\r\n\r\n")[0].decode("latin-1").split("\r\n")
+    return int(head[0].split()[1]), dict(line.split(": ", 1) for line in head[1:])
+
+def test_stats_etag_changes_across_restarts(conn, monkeypatch):
+    status, headers = get_stats(conn, 3)
+    etag = headers["ETag"]
+    assert status == 200
+    assert get_stats(conn, 3, etag)[0] == 304
+    assert get_stats(conn, 4, etag)[0] == 200
+
+    # Nouveau processus : même numéro de version, mais ce n'est plus la même photo
+    monkeypatch.setattr(tcp, "BOOT_ID", "redemarre")
+    assert get_stats(conn, 3, etag)[0] == 200
+
+@pytest.fixture
+def server():
+    """Serveur complet (thread daemon) sur un port libre, retourne son adresse."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(tcp.BACKLOG)
+    threading.Thread(target=_serve, args=(sock, SharedContext()), daemon=True).start()
+    return sock.getsockname()
+
+def fetch(client: socket.socket, path: str = "/api/stats") -> bytes:
+    """Une requête keep-alive, retourne la ligne de statut."""
+    client.sendall(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += client.recv(65536)
+    return response.split(b"\r\n", 1)[0]
+
+def test_idle_connections_do_not_hold_workers(server):
+    # Plus de connexions inactives que de threads : nouvelles, et keep-alive après une requête
+    idle = [socket.create_connection(server, timeout=2.0) for _ in range(WORKERS + 4)]
+    for client in idle[:WORKERS // 2]:
+        assert fetch(client) == b"HTTP/1.1 200 OK"
+
+    start = time.monotonic()
+    with socket.create_connection(server, timeout=2.0) as client:
+        assert fetch(client) == b"HTTP/1.1 200 OK"
+        # Même connexion, après être passée par le sélecteur
+        assert fetch(client) == b"HTTP/1.1 200 OK"
+    assert time.monotonic() - start < 1.0
+
+    # Les connexions inactives sont toujours servies
+    assert fetch(idle[-1]) == b"HTTP/1.1 200 OK"
+    for client in idle:
+        client.close()
+
+def test_idle_connection_is_closed_after_timeout(server, monkeypatch):
+    monkeypatch.setattr(tcp, "KEEPALIVE_TIMEOUT", 0.2)
+    with socket.create_connection(server, timeout=5.0) as client:
+        assert fetch(client) == b"HTTP/1.1 200 OK"
+        assert client.recv(1) == b""
+
+Snapshot = namedtuple("Snapshot", "version payload")
+
+def read_until(sock: socket.socket, marker: bytes, received: dict) -> None:
+    """Lit le socket (dans un thread) jusqu'à voir marker, puis le note dans received."""
+    data = bytearray()
+    sock.settimeout(5.0)
+    while marker not in data:
+        chunk = sock.recv(1 << 20)
+        if not chunk: return
+        data += chunk
+    received[sock] = True
+
+def test_slow_subscriber_does_not_block_the_stream(monkeypatch):
+    monkeypatch.setattr(EventStream, "SEND_TIMEOUT", 0.5)
+    hub = SnapshotHub(Snapshot(0, b"{}"))
+    stream = EventStream(hub)
+    slow, fast, late = (socket.socketpair() for _ in range(3))
+    received = {}
+    readers = [threading.Thread(target=read_until, args=(sock, b"x\n\n", received), daemon=True) for sock in (fast[0], late[0])]
+
+    # Le navigateur "slow" ne lit jamais : la photo suivante ne tient pas dans les buffers du noyau
+    stream.subscribe(slow[1])
+    readers[0].start()
+    stream.subscribe(fast[1])
+    hub.publish(Snapshot(0, b"x" * 2_000_000))
+
+    # Pendant que le thread de diffusion attend "slow", une inscription n'attend pas
+    time.sleep(0.1)
+    readers[1].start()
+    start = time.monotonic()
+    stream.subscribe(late[1])
+    assert time.monotonic() - start < 0.3
+
+    for reader in readers:
+        reader.join(5.0)
+    assert received == {fast[0]: True, late[0]: True}
+    deadline = time.monotonic() + 5.0
+    while len(stream) != 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(stream) == 2
+    for pair in (slow, fast, late):
+        for sock in pair: sock.close()
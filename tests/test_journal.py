@@ -0,0 +1,95 @@
+"""
+Tests du journal des décisions : relecture après arrêt brutal (fin tronquée), génération photo / journal,
+valeurs hors format.
+"""
+from datetime import datetime, timedelta
+from pizzeria.classes.journal import Journal, Accepted, Refused
+from pizzeria.classes.memory_db import MemoryDatabase
+from pizzeria.classes.production import ProductionManager
+from pizzeria.classes.stats import PizzeriaStats
+
+T0 = datetime(2025, 11, 26, 10, 0, 0)
+
+def accepted(i: int, quantity: int = 2, pizza_name: str = "Reine") -> Accepted:
+    start = T0 + timedelta(minutes=i)
+    return Accepted(1, start, start + timedelta(minutes=6), quantity, pizza_name, "G", (("R", 2 * quantity), ("J", quantity)))
+
+def write(directory, *records) -> Journal:
+    journal = Journal(str(directory))
+    journal.load()
+    journal.start()
+    for record in records:
+        if isinstance(record, Refused): journal.refused()
+        else: journal.accepted(record)
+    journal.close()
+    return journal
+
+def reload(directory):
+    return Journal(str(directory)).load()
+
+
+def test_records_round_trip(tmp_path):
+    records = [accepted(0), Refused(), accepted(1, quantity=40, pizza_name="4_Fromages")]
+    write(tmp_path, *records)
+    snapshot, decoded = reload(tmp_path)
+    assert snapshot is None
+    assert decoded == records
+
+def test_truncated_tail_is_ignored_then_overwritten(tmp_path):
+    write(tmp_path, accepted(0), accepted(1), accepted(2))
+    wal = tmp_path / "journal.wal"
+    # Arrêt pendant l'écriture du dernier enregistrement
+    wal.write_bytes(wal.read_bytes()[:-3])
+
+    _, decoded = reload(tmp_path)
+    assert decoded == [accepted(0), accepted(1)]
+
+    # Redémarrage : la fin incomplète est coupée, les nouvelles décisions suivent les anciennes
+    write(tmp_path, Refused())
+    _, decoded = reload(tmp_path)
+    assert decoded == [accepted(0), accepted(1), Refused()]
+
+def test_snapshot_replaces_journal(tmp_path):
+    db = MemoryDatabase({"Production": [(1, 32, True, "-", "-")]})
+    manager = ProductionManager(db)
+    manager.stations[0].assign_task("Reine", "G", 2, 6, T0)
+    stats = PizzeriaStats()
+    stats.accepted_orders, stats.refused_orders = 3, 1
+
+    journal = Journal(str(tmp_path))
+    journal.load()
+    journal.start()
+    journal.accepted(accepted(0))
+    journal.snapshot(stats, manager)
+    journal.refused()
+    journal.close()
+
+    snapshot, decoded = reload(tmp_path)
+    assert (snapshot.accepted, snapshot.refused) == (3, 1)
+    assert [(station_id, task.start, task.quantity) for station_id, task in snapshot.tasks] == [(1, T0, 2)]
+    assert decoded == [Refused()]
+
+def test_journal_of_previous_generation_is_ignored(tmp_path):
+    """Arrêt entre le renommage de la photo et la remise à zéro du journal : l'ancien journal est déjà dans la photo."""
+    write(tmp_path, accepted(0), accepted(1))
+    old_wal = (tmp_path / "journal.wal").read_bytes()
+
+    journal = Journal(str(tmp_path))
+    journal.load()
+    journal.start()
+    journal.snapshot(PizzeriaStats(), ProductionManager(MemoryDatabase({"Production": []})))
+    journal.close()
+    (tmp_path / "journal.wal").write_bytes(old_wal)
+
+    snapshot, decoded = reload(tmp_path)
+    assert snapshot is not None
+    assert decoded == []
+
+def test_out_of_range_record_is_dropped_not_fatal(tmp_path):
+    write(tmp_path, accepted(0), accepted(1, quantity=2 ** 40), accepted(2, pizza_name="x" * 70_000), Refused())
+    _, decoded = reload(tmp_path)
+    assert decoded == [accepted(0), Refused()]
+
+def test_garbage_journal_is_not_replayed(tmp_path):
+    (tmp_path / "journal.wal").write_bytes(b"not a journal at all")
+    assert reload(tmp_path) == (None, [])
@@ -0,0 +1,132 @@
+"""
+Tests de ChangeListener : notifications, perte de connexion et ré-abonnement avec délai croissant,
+écoute du mode asyncio (sans PostgreSQL : la BDD et la connexion sont simulées).
+"""
+import json
+import socket
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+from pizzeria.classes import listener as listener_module
+from pizzeria.classes.listener import ChangeListener, Change
+from pizzeria.async_processor import _listen
+
+class FakeNotify:
+    def __init__(self, payload: str) -> None:
+        self.payload = payload
+
+class FakeConn:
+    def __init__(self) -> None:
+        self.notifies = []
+        self.broken = False
+        self.closed = False
+
+    def poll(self) -> None:
+        if self.broken: raise psycopg2.OperationalError("server closed the connection")
+
+    def fileno(self) -> int:
+        return 42
+
+    def close(self) -> None:
+        self.closed = True
+
+class FakeDb:
+    def __init__(self) -> None:
+        self.up = True
+        self.attempts = 0
+
+    def listen(self, channel: str) -> FakeConn:
+        self.attempts += 1
+        if not self.up: raise psycopg2.OperationalError("connection refused")
+        return FakeConn()
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge monotone pilotée par le test."""
+    now = [1000.0]
+    monkeypatch.setattr(listener_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_poll_decodes_notifications():
+    listener = ChangeListener(FakeDb())
+    listener.conn.notifies = [FakeNotify(json.dumps({"table": "Client", "op": "DELETE", "row": {"ID": 1}})), FakeNotify("{pas du json")]
+    assert listener.poll() == [Change("Client", "DELETE", {"ID": 1}, None)]
+
+def test_lost_connection_is_retried_with_backoff(clock):
+    db = FakeDb()
+    listener = ChangeListener(db)
+    conn = listener.conn
+
+    # Connexion perdue, BDD toujours arrêtée : plus de fileno à surveiller, pas d'exception
+    conn.broken = True
+    db.up = False
+    assert listener.poll() == []
+    assert conn.closed and not listener.connected
+    assert listener.poll() == []
+    assert listener.retry_in() == ChangeListener.RETRY_MIN
+
+    # Pas de tentative avant le délai, puis échec -> délai doublé
+    assert not listener.reconnect() and db.attempts == 1
+    clock[0] += ChangeListener.RETRY_MIN
+    assert not listener.reconnect() and db.attempts == 2
+    assert listener.retry_in() == 2 * ChangeListener.RETRY_MIN
+
+    # BDD revenue : ré-abonnement au prochain essai, délai remis au minimum
+    db.up = True
+    clock[0] += 2 * ChangeListener.RETRY_MIN
+    assert listener.reconnect() and listener.connected
+    assert listener.retry_in() is None
+    assert listener.fileno() == 42
+
+def test_backoff_is_capped(clock):
+    db = FakeDb()
+    listener = ChangeListener(db)
+    listener.conn.broken = True
+    db.up = False
+    listener.poll()
+    for _ in range(20):
+        clock[0] += listener.retry_in()
+        listener.reconnect()
+    assert listener.retry_in() == ChangeListener.RETRY_MAX
+
+def test_async_listen_polls_in_executor_and_logs_failures(caplog):
+    """Mode asyncio : poll() et apply_changes() tournent dans le thread d'ordonnancement, une erreur est loguée sans arrêter l'écoute."""
+    ready, notify = socket.socketpair()
+    threads, applied = [], []
+
+    class SocketListener:
+        connected = True
+        def fileno(self) -> int:
+            return ready.fileno()
+        def poll(self) -> list:
+            ready.recv(16)
+            threads.append(threading.current_thread().name)
+            return ["change"]
+
+    class State:
+        def apply_changes(self, changes: list) -> None:
+            applied.append(changes)
+            if len(applied) == 1: raise RuntimeError("boom")
+
+    async def scenario() -> None:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="scheduler") as executor:
+            task = asyncio.create_task(_listen(SocketListener(), State(), executor))
+            for expected in (1, 2):
+                notify.send(b"x")
+                while len(applied) < expected:
+                    await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    with caplog.at_level(logging.ERROR, logger="pizzeria.ASYNC"):
+        asyncio.run(asyncio.wait_for(scenario(), 5))
+    ready.close()
+    notify.close()
+    assert all(name.startswith("scheduler") for name in threads) and len(threads) == 2
+    assert "boom" in caplog.text
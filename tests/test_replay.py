@@ -0,0 +1,38 @@
+"""
+Tests du rejeu (benchmarks.replay) : horodatages illisibles, rejeu déterministe.
+"""
+from pathlib import Path
+import pytest
+from pizzeria.classes.memory_db import MemoryDatabase
+from pizzeria.classes.parser import parse_order, OrderParseError
+
+pytest.importorskip("psycopg2")
+from benchmarks.replay import generate_log, replay
+
+INIT_SQL = Path(__file__).resolve().parent.parent / "server" / "init.sql"
+
+@pytest.fixture(scope="module")
+def db():
+    return MemoryDatabase.from_sql(str(INIT_SQL))
+
+
+@pytest.mark.parametrize("raw", [b"32/11/2025 10:00:00", b"aa/11/2025 10:00:00", b"hier 10h", b"26/11/2025 10:00"])
+def test_unreadable_timestamp_is_a_parse_error(raw):
+    with pytest.raises(OrderParseError):
+        parse_order(raw + b",529997,Reine,G,2,11:00")
+
+def test_unusual_timestamp_format_still_parses():
+    assert parse_order(b"1/2/2025 9:05:00,529997,Reine,G,2,11:00").timestamp.isoformat() == "2025-02-01T09:05:00"
+
+def test_replay_counts_unreadable_timestamps_and_is_deterministic(db):
+    datagrams = generate_log(db, 200, rate=0.2)
+    datagrams[50:50] = [b"32/11/2025 10:00:00,529997,Reine,G,2,11:00", b"pas une date,529997,Reine,G,2,11:00"]
+
+    report = replay(datagrams, db, batch_size=16, buffer_timeout=60.0)
+    assert report["orders"] == 200 and report["malformed"] == 2
+    assert report["accepted"] + report["refused"] == 200
+
+    # Aucune dépendance à l'heure réelle : même journal -> mêmes décisions
+    again = replay(datagrams, db, batch_size=16, buffer_timeout=60.0)
+    assert (again["accepted"], again["refused"], again["revenue"], again["simulated"]) == \
+           (report["accepted"], report["refused"], report["revenue"], report["simulated"])
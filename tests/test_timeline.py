@@ -0,0 +1,105 @@
+"""
+Tests de CapacityTimeline : recherche du premier démarrage, minorant free_from, oubli du passé (expire).
+"""
+import random
+from datetime import datetime, timedelta
+from pizzeria.classes.timeline import CapacityTimeline
+
+T0 = datetime(2025, 11, 26, 10, 0, 0)
+MINUTE = timedelta(minutes=1)
+
+def at(minutes: float) -> datetime:
+    return T0 + minutes * MINUTE
+
+def make_timeline(*tasks: tuple[float, float, int]) -> CapacityTimeline:
+    """Tâches (début, fin, quantité) en minutes après T0."""
+    timeline = CapacityTimeline()
+    for start, end, quantity in tasks:
+        timeline.add(at(start), at(end), quantity)
+    return timeline
+
+
+def test_earliest_start_empty_is_now():
+    assert CapacityTimeline().earliest_start(T0, 5 * MINUTE, 3, 10) == T0
+
+def test_earliest_start_waits_for_end_of_blocking_task():
+    timeline = make_timeline((0, 10, 8))
+    assert timeline.earliest_start(T0, 5 * MINUTE, 2, 10) == T0
+    # Plus de place : on démarre juste après la fin de la tâche (fin + 1s)
+    assert timeline.earliest_start(T0, 5 * MINUTE, 3, 10) == at(10) + timedelta(seconds=1)
+
+def test_earliest_start_needs_the_whole_duration_free():
+    # Trou de 5 min entre deux tâches pleines : une cuisson de 6 min ne passe qu'après la seconde
+    timeline = make_timeline((0, 10, 10), (15, 20, 10))
+    assert timeline.earliest_start(T0, 4 * MINUTE, 1, 10) == at(10) + timedelta(seconds=1)
+    assert timeline.earliest_start(T0, 6 * MINUTE, 1, 10) == at(20) + timedelta(seconds=1)
+
+def test_earliest_start_respects_latest_start_and_capacity():
+    timeline = make_timeline((0, 10, 10))
+    assert timeline.earliest_start(T0, 5 * MINUTE, 1, 10, latest_start=at(5)) is None
+    assert timeline.earliest_start(T0, 5 * MINUTE, 11, 10) is None
+
+def test_free_from_is_first_instant_under_threshold():
+    timeline = make_timeline((0, 10, 6), (5, 20, 3))
+    # Charge : 6 sur [0, 5[, 9 sur [5, 10[, 3 sur [10, 20[, puis 0
+    assert timeline.free_from(T0, 6) == T0
+    assert timeline.free_from(at(5), 6) == at(10)
+    assert timeline.free_from(T0, 5) == at(10)
+    assert timeline.free_from(T0, 2) == at(20)
+    assert timeline.free_from(T0, -1) is None
+
+def test_free_from_cache_is_cleared_by_changes():
+    timeline = make_timeline((0, 10, 10))
+    assert timeline.free_from(T0, 5) == at(10)
+    timeline.add(at(10), at(30), 10)
+    assert timeline.free_from(T0, 5) == at(30)
+    timeline.remove(at(10), at(30), 10)
+    assert timeline.free_from(T0, 5) == at(10)
+    # Un "maintenant" plus tardif que le résultat en cache ne doit pas le réutiliser
+    assert timeline.free_from(at(40), 5) == at(40)
+
+def test_free_from_is_a_lower_bound_of_earliest_start():
+    rng = random.Random(0)
+    timeline = make_timeline(*((s, s + rng.randint(3, 8), rng.randint(1, 4)) for s in (rng.randint(0, 60) for _ in range(40))))
+    for _ in range(200):
+        now, quantity = at(rng.uniform(0, 70)), rng.randint(1, 10)
+        start = timeline.earliest_start(now, rng.randint(1, 8) * MINUTE, quantity, 10)
+        assert start is not None and timeline.free_from(now, 10 - quantity) <= start
+
+def test_expire_forgets_finished_tasks_only():
+    timeline = make_timeline((0, 10, 4), (5, 20, 3), (25, 30, 2))
+    timeline.expire(at(12))
+    assert len(timeline) == 2
+    assert timeline.load_at(at(12)) == 3
+    assert timeline.load_at(at(27)) == 2
+    assert timeline.free_from(at(12), 0) == at(20)
+    assert timeline.earliest_start(at(12), 5 * MINUTE, 7, 10) == at(12)
+    assert timeline.earliest_start(at(12), 5 * MINUTE, 8, 10) == at(20) + timedelta(seconds=1)
+
+def test_expire_is_equivalent_to_removing_finished_tasks():
+    """Pour toute requête à partir de now, expire(now) == remove() de chaque tâche terminée."""
+    rng = random.Random(1)
+    tasks = [(s, s + rng.randint(2, 10), rng.randint(1, 5)) for s in (rng.uniform(0, 100) for _ in range(80))]
+    for now_minutes in (0, 15, 42.5, 70, 200):
+        now = at(now_minutes)
+        expired = make_timeline(*tasks)
+        expired.expire(now)
+        removed = make_timeline(*tasks)
+        for start, end, quantity in tasks:
+            if at(end) <= now:
+                removed.remove(at(start), at(end), quantity)
+
+        for t in (now + k * MINUTE / 2 for k in range(250)):
+            assert expired.load_at(t) == removed.load_at(t)
+        for threshold in (0, 3, 7):
+            assert expired.free_from(now, threshold) == removed.free_from(now, threshold)
+        for quantity in (1, 5, 10):
+            assert expired.earliest_start(now, 4 * MINUTE, quantity, 12) == removed.earliest_start(now, 4 * MINUTE, quantity, 12)
+
+def test_next_change_skips_past_breakpoints():
+    timeline = make_timeline((0, 10, 4), (5, 20, 3))
+    assert timeline.next_change(T0) == at(5)
+    assert timeline.next_change(at(5)) == at(10)
+    assert timeline.next_change(at(20)) is None
+    timeline.add(at(12), at(14), 1)
+    assert timeline.next_change(at(11)) == at(12)
@@ -1,88 +1,498 @@
 import os
-import json
+import gzip
+import time
+import queue
 import socket
-from datetime import datetime
+import hashlib
+import selectors
+import threading
+from pizzeria.classes.metrics import REGISTRY
 
-def run_web_server_thread(context, host='localhost', port=10000):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) 
-    sock.bind((host, port))
-    sock.listen(1)
-    print(f"[WEB] > INFO: Dashboard actif sur http://localhost:{port}")
+WEB_DIR = os.path.dirname(os.path.abspath(f"{__file__}"))
 
-    WEB_DIR = os.path.dirname(os.path.abspath(f"{__file__}"))
-    
+# Paramètres du serveur
+BACKLOG = 128               # Connexions en attente d'accept()
+WORKERS = 16                # Threads qui traitent les requêtes
+KEEPALIVE_TIMEOUT = 15.0    # Inactivité max (s) d'une connexion keep-alive (surveillée par le sélecteur, sans thread)
+REQUEST_TIMEOUT = 5.0       # Temps max (s) pour recevoir la fin d'une requête commencée
+MAX_KEEPALIVE_REQUESTS = 100
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 64 * 1024   # Le dashboard n'envoie jamais de corps : au-delà, on refuse sans lire
+
+# Préfixe des ETag de /api/stats : la version des photos repart de 0 à chaque lancement,
+# un navigateur ne doit pas prendre la photo v3 d'un nouveau processus pour celle qu'il a gardée
+BOOT_ID = os.urandom(4).hex()
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".json": "application/json",
+    ".ico": "image/x-icon",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".svg": "image/svg+xml",
+}
+
+# Types qui valent le coup d'être compressés
+COMPRESSIBLE = {".html", ".css", ".js", ".json", ".svg"}
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Content Too Large", 431: "Request Header Fields Too Large"}
+
+
+class HttpRequest:
+    """Requête HTTP déjà découpée (ligne de requête + en-têtes + corps)."""
+    __slots__ = ("method", "path", "version", "headers", "body")
+
+    def __init__(self, method: str, path: str, version: str, headers: dict[str, str], body: bytes) -> None:
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        """HTTP/1.1 garde la connexion par défaut, HTTP/1.0 seulement si demandé."""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def accepts_gzip(self) -> bool:
+        return "gzip" in self.headers.get("accept-encoding", "")
+
+
+class BadRequest(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class StaticFile:
+    """Fichier statique gardé en mémoire, avec sa version gzip et ses ETags."""
+    __slots__ = ("body", "gzipped", "etag", "gzip_etag", "content_type", "mtime")
+
+    def __init__(self, file_path: str) -> None:
+        with open(file_path, 'rb') as f:
+            self.body = f.read()
+        self.mtime = os.path.getmtime(file_path)
+        extension = os.path.splitext(file_path)[1]
+        self.content_type = CONTENT_TYPES.get(extension, "application/octet-stream")
+        digest = hashlib.sha1(self.body).hexdigest()[:16]
+        self.etag = f'"{digest}"'
+        self.gzipped = gzip.compress(self.body, 6) if extension in COMPRESSIBLE else None
+        self.gzip_etag = f'"{digest}-gz"'
+
+
+class StaticCache:
+    """
+    Cache mémoire des fichiers du dashboard : plus de open()/read() à chaque requête.
+    Un fichier modifié sur le disque est rechargé (on compare la date de modification).
+    """
+    def __init__(self, root: str) -> None:
+        self.root = os.path.realpath(root)
+        self._files: dict[str, StaticFile] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> StaticFile | None:
+        if path == '/': path = '/index.html'
+
+        # Sécurité : on ne sert que des fichiers connus DANS le dossier web/
+        file_path = os.path.realpath(os.path.join(self.root, path.lstrip('/')))
+        if not file_path.startswith(self.root + os.sep): return None
+        if os.path.splitext(file_path)[1] not in CONTENT_TYPES: return None
 
-    while True:
         try:
-            conn, addr = sock.accept()
-            request = conn.recv(1024).decode('utf-8')
-            
-            if not request: continue
-            first_line = request.split('\n')[0]
-            method, path, _ = first_line.split(' ')
-
-            response_body = b""
-            content_type = "text/html"
-
-            
-            if path == '/api/stats':
-                content_type = "application/json"
-                
-                data = {
-                    "stats": {
-                        "accepted": context.stats.accepted_orders,
-                        "refused": context.stats.refused_orders,
-                        "ingredients": context.stats.ingredients
-                    },
-                    "stations": []
-                }
-
-                if context.prod_manager:
-                    now = datetime.now()
-                    for station in context.prod_manager.stations:
-                        load = station.get_load_at_time(now)
-                        restrictions = list(station.restrictions) if station.restrictions else []
-                        
-                        data["stations"].append({
-                            "id": station.id,
-                            "available": station.is_available,
-                            "max_capacity": station.max_capacity,
-                            "current_load": load,
-                            "size": station.supported_size,
-                            "restrictions": restrictions
-                        })
-
-                response_body = json.dumps(data).encode('utf-8')
+            mtime = os.path.getmtime(file_path)
+        except OSError:
+            return None
 
+        cached = self._files.get(file_path)
+        if cached is None or cached.mtime != mtime:
+            with self._lock:
+                try:
+                    cached = StaticFile(file_path)
+                except OSError:
+                    return None
+                self._files[file_path] = cached
+        return cached
+
+
+def _read_request(conn: socket.socket, buffer: bytearray) -> HttpRequest | None:
+    """
+    Lit UNE requête sur la connexion (None si le client a fermé).
+    buffer garde ce qui a déjà été reçu au-delà de la requête (pipelining keep-alive).
+    """
+    while True:
+        end = buffer.find(b"\r\n\r\n")
+        if end >= 0: break
+        if len(buffer) > MAX_HEADER_SIZE:
+            raise BadRequest(431, "En-têtes trop longs")
+        chunk = conn.recv(65536)
+        if not chunk:
+            return None
+        buffer += chunk
+
+    head = bytes(buffer[:end]).decode('latin-1')
+    del buffer[:end + 4]
+
+    lines = head.split("\r\n")
+    try:
+        method, path, version = lines[0].split(' ')
+    except ValueError:
+        raise BadRequest(400, f"Ligne de requête invalide: {lines[0]!r}")
+
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise BadRequest(400, f"En-tête invalide: {line!r}")
+        headers[name.strip().lower()] = value.strip()
+
+    # Corps éventuel (pas utilisé par le dashboard, mais il faut le consommer
+    # pour ne pas le confondre avec la requête suivante)
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise BadRequest(400, "Content-Length invalide")
+    if length < 0:
+        raise BadRequest(400, "Content-Length invalide")
+    if length > MAX_BODY_SIZE:
+        raise BadRequest(413, "Corps trop long")
+    while len(buffer) < length:
+        chunk = conn.recv(65536)
+        if not chunk:
+            return None
+        buffer += chunk
+    body = bytes(buffer[:length])
+    del buffer[:length]
+
+    # On ignore la query string (?t=...) pour le routage
+    path = path.split('?', 1)[0]
+    return HttpRequest(method, path, version, headers, body)
+
+
+def _send_response(conn: socket.socket, status: int, body: bytes = b"", content_type: str = None, keep_alive: bool = False, extra_headers: dict = None, head_only: bool = False) -> None:
+    header_lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    if content_type:
+        header_lines.append(f"Content-Type: {content_type}")
+    header_lines.append(f"Content-Length: {len(body)}")
+    header_lines.append("Access-Control-Allow-Origin: *")
+    header_lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    if keep_alive:
+        header_lines.append(f"Keep-Alive: timeout={int(KEEPALIVE_TIMEOUT)}, max={MAX_KEEPALIVE_REQUESTS}")
+    for name, value in (extra_headers or {}).items():
+        header_lines.append(f"{name}: {value}")
+
+    response = ("\r\n".join(header_lines) + "\r\n\r\n").encode('latin-1')
+    if not head_only:
+        response += body
+    conn.sendall(response)
+
+
+class EventStream:
+    """
+    Diffusion Server-Sent Events de /api/stream.
+
+    Les sockets abonnés ne bloquent pas de thread du pool : un seul thread attend
+    les publications du moteur (SnapshotHub) et écrit le même message, sérialisé
+    une seule fois, sur toutes les connexions. Un navigateur trop lent ou parti
+    est simplement déconnecté (EventSource se reconnecte tout seul).
+    Les envois se font hors du verrou : un abonné lent ne bloque pas les inscriptions.
+    """
+    HEARTBEAT = 15.0    # Commentaire SSE envoyé si rien n'est publié (détecte les clients partis)
+    SEND_TIMEOUT = 1.0  # Temps max pour écrire un message sur un abonné
+
+    def __init__(self, hub) -> None:
+        self.hub = hub
+        self._subscribers: list[socket.socket] = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, name="web-stream", daemon=True).start()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @staticmethod
+    def _frame(version: int, payload: bytes) -> bytes:
+        return b"id: %d\ndata: %s\n\n" % (version, payload)
+
+    def subscribe(self, conn: socket.socket) -> None:
+        """Envoie l'en-tête et l'état courant, puis confie le socket au thread de diffusion."""
+        header = ("HTTP/1.1 200 OK\r\n"
+                  "Content-Type: text/event-stream\r\n"
+                  "Cache-Control: no-cache\r\n"
+                  "Connection: keep-alive\r\n"
+                  "Access-Control-Allow-Origin: *\r\n\r\n"
+                  "retry: 3000\n\n").encode('latin-1')
+        conn.settimeout(self.SEND_TIMEOUT)
+
+        # Sous le verrou : aucune publication ne peut passer entre l'état initial et l'inscription
+        with self._lock:
+            snapshot = self.hub.snapshot
+            conn.sendall(header + self._frame(snapshot.version, snapshot.payload))
+            self._subscribers.append(conn)
+
+    def _run(self) -> None:
+        version = self.hub.version
+        while True:
+            snapshot = self.hub.wait(version, self.HEARTBEAT)
+            if snapshot.version != version:
+                message = self._frame(snapshot.version, snapshot.payload)
             else:
-                if path == '/': 
-                    file_path = os.path.join(WEB_DIR, 'index.html')
-                else:
-                    filename = path.lstrip('/')
-                    file_path = os.path.join(WEB_DIR, filename)
+                message = b": ping\n\n"
+            version = snapshot.version
+
+            # Copie de la liste sous le verrou, envois hors verrou (jusqu'à SEND_TIMEOUT par abonné).
+            # Un abonné inscrit entre la publication et la copie peut recevoir deux fois la même photo : sans effet.
+            with self._lock:
+                subscribers = list(self._subscribers)
+            dead = []
+            for conn in subscribers:
+                try:
+                    conn.sendall(message)
+                except OSError:
+                    dead.append(conn)
+            if not dead: continue
 
-                if file_path.endswith('.css'): content_type = "text/css"
-                elif file_path.endswith('.js'): content_type = "application/javascript"
-                
+            with self._lock:
+                self._subscribers = [conn for conn in self._subscribers if conn not in dead]
+            for conn in dead:
                 try:
-                    with open(file_path, 'rb') as f:
-                        response_body = f.read()
-                except FileNotFoundError:
-                    
-                    response_header = "HTTP/1.1 404 Not Found\n\n"
-                    conn.sendall(response_header.encode('utf-8'))
                     conn.close()
-                    continue
+                except OSError:
+                    pass
 
-            response_header = f"HTTP/1.1 200 OK\nContent-Type: {content_type}\nContent-Length: {len(response_body)}\nAccess-Control-Allow-Origin: *\n\n"
-            
-            conn.sendall(response_header.encode('utf-8') + response_body)
-            conn.close()
 
-        except Exception as e:
-            print(f"[WEB] > ERROR: {e}")
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match: return False
+    if if_none_match.strip() == "*": return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(',')]
+    return etag in candidates
+
+
+def _handle_request(conn: socket.socket, request: HttpRequest, context, static: StaticCache, stream: EventStream, keep_alive: bool) -> bool:
+    """Répond à une requête. Retourne True si le socket a été confié au flux SSE (à ne pas fermer)."""
+    head_only = request.method == "HEAD"
+    if request.method not in ("GET", "HEAD"):
+        _send_response(conn, 405, keep_alive=keep_alive, extra_headers={"Allow": "GET, HEAD"})
+        return False
+
+    if request.path == '/api/stream' and not head_only:
+        stream.subscribe(conn)
+        return True
+
+    if request.path == '/api/stats':
+        # Photo publiée par le moteur : JSON déjà prêt, rien à recalculer ici
+        snapshot = context.snapshot
+        etag = f'"{BOOT_ID}-v{snapshot.version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            _send_response(conn, 304, keep_alive=keep_alive, extra_headers=headers)
+        else:
+            _send_response(conn, 200, snapshot.payload, "application/json", keep_alive, headers, head_only)
+        return False
+
+    if request.path == '/metrics':
+        # Format texte Prometheus (compteurs + histogrammes de latence)
+        _send_response(conn, 200, REGISTRY.render(), "text/plain; version=0.0.4; charset=utf-8", keep_alive,
+                       {"Cache-Control": "no-store"}, head_only)
+        return False
+
+    static_file = static.get(request.path)
+    if static_file is None:
+        _send_response(conn, 404, b"Not Found", "text/plain", keep_alive, head_only=head_only)
+        return False
+
+    use_gzip = static_file.gzipped is not None and request.accepts_gzip()
+    etag = static_file.gzip_etag if use_gzip else static_file.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    # Le navigateur a déjà la bonne version -> 304 sans corps
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        _send_response(conn, 304, keep_alive=keep_alive, extra_headers=headers)
+        return False
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        _send_response(conn, 200, static_file.gzipped, static_file.content_type, keep_alive, headers, head_only)
+    else:
+        _send_response(conn, 200, static_file.body, static_file.content_type, keep_alive, headers, head_only)
+    return False
+
+
+class Connection:
+    """Connexion cliente entre deux requêtes : socket + ce qui a été reçu au-delà de la dernière requête."""
+    __slots__ = ("sock", "buffer", "served", "idle_since")
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.buffer = bytearray()
+        self.served = 0
+        self.idle_since = time.monotonic()
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def _handle_connection(connection: Connection, context, static: StaticCache, stream: EventStream) -> bool:
+    """
+    Traite les requêtes reçues sur une connexion devenue lisible. Tourne dans un thread du pool.
+    Retourne True si la connexion reste ouverte (keep-alive) : elle retourne alors au sélecteur
+    en attendant la requête suivante, sans garder le thread.
+    """
+    conn = connection.sock
+    keep = streaming = False
+    try:
+        conn.settimeout(REQUEST_TIMEOUT)
+        while True:
+            try:
+                request = _read_request(conn, connection.buffer)
+            except BadRequest as e:
+                _send_response(conn, e.status, str(e).encode('utf-8'), "text/plain")
+                return False
+            if request is None:
+                return False
+
+            connection.served += 1
+            keep_alive = request.keep_alive and connection.served < MAX_KEEPALIVE_REQUESTS
+            streaming = _handle_request(conn, request, context, static, stream, keep_alive)
+            if streaming or not keep_alive:
+                return False
+
+            # Requête suivante déjà reçue (pipelining) : le sélecteur ne la verrait pas
+            if b"\r\n\r\n" not in connection.buffer:
+                keep = True
+                return True
+
+    # Client trop lent ou parti -> rien de grave
+    except (socket.timeout, ConnectionError):
+        return False
+    except Exception as e:
+        print(f"[WEB] > ERROR: {e}")
+        return False
+    finally:
+        if not streaming and not keep:
+            connection.close()
+
+
+class ConnectionSelector:
+    """
+    Thread d'accept() : surveille (selectors) le socket d'écoute et les connexions en attente
+    de leur prochaine requête (nouvelles ou keep-alive).
+
+    Une connexion n'est confiée au pool que quand elle a quelque chose à lire : un navigateur
+    qui garde sa connexion ouverte sans rien demander n'occupe aucun thread. Après sa requête,
+    le thread du pool la rend au sélecteur (hand_back). Les connexions inactives depuis
+    KEEPALIVE_TIMEOUT sont fermées.
+    """
+    SWEEP_INTERVAL = 1.0    # Fréquence (s) de la recherche des connexions inactives
+
+    def __init__(self, sock: socket.socket, jobs: queue.Queue) -> None:
+        self.sock = sock
+        self.jobs = jobs
+        self._selector = selectors.DefaultSelector()
+        self._returned: queue.SimpleQueue[Connection] = queue.SimpleQueue()
+        # Réveil du select() quand un thread du pool rend une connexion
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self.sock.setblocking(False)
+        self._selector.register(self.sock, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+
+    def __len__(self) -> int:
+        """Connexions en attente de requête."""
+        return len(self._selector.get_map()) - 2
+
+    def hand_back(self, connection: Connection) -> None:
+        """Appelé par un thread du pool : la connexion attend sa prochaine requête."""
+        self._returned.put(connection)
+        try:
+            self._wakeup_w.send(b"\0")
+        except BlockingIOError:
+            pass    # Réveil déjà en attente
+
+    def _accept(self) -> None:
+        while True:
             try:
-                conn.close()
-            except:
-                pass
\ No newline at end of file
+                conn, _ = self.sock.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f"[WEB] > ERROR: {e}")
+                return
+            self._selector.register(conn, selectors.EVENT_READ, Connection(conn))
+
+    def _sweep(self, now: float) -> None:
+        for key in list(self._selector.get_map().values()):
+            connection = key.data
+            if connection is not None and now - connection.idle_since > KEEPALIVE_TIMEOUT:
+                self._selector.unregister(key.fileobj)
+                connection.close()
+
+    def run(self) -> None:
+        next_sweep = time.monotonic() + self.SWEEP_INTERVAL
+        while True:
+            for key, _ in self._selector.select(self.SWEEP_INTERVAL):
+                if key.fileobj is self.sock:
+                    self._accept()
+                elif key.fileobj is self._wakeup_r:
+                    try:
+                        while self._wakeup_r.recv(4096): pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    # Requête en vue : la connexion passe au pool (bloque si la file est pleine)
+                    self._selector.unregister(key.fileobj)
+                    self.jobs.put(key.data)
+
+            now = time.monotonic()
+            while True:
+                try:
+                    connection = self._returned.get_nowait()
+                except queue.Empty:
+                    break
+                connection.idle_since = now
+                self._selector.register(connection.sock, selectors.EVENT_READ, connection)
+
+            if now >= next_sweep:
+                self._sweep(now)
+                next_sweep = now + self.SWEEP_INTERVAL
+
+
+def _worker(jobs: queue.Queue, selector: ConnectionSelector, context, static: StaticCache, stream: EventStream) -> None:
+    """Thread du pool : traite les connexions qui ont une requête à lire, une à la fois."""
+    while True:
+        connection = jobs.get()
+        if _handle_connection(connection, context, static, stream):
+            selector.hand_back(connection)
+
+
+def _serve(sock: socket.socket, context) -> None:
+    """Boucle du serveur sur un socket déjà en écoute."""
+    static = StaticCache(WEB_DIR)
+    stream = EventStream(context.hub)
+
+    # Chaque requête est traitée par un thread du pool :
+    # plusieurs dashboards peuvent interroger le serveur en même temps.
+    # (Threads daemon, comme celui du serveur : une connexion keep-alive
+    #  ouverte ne doit pas retarder l'arrêt du programme.)
+    # File bornée : si le pool est débordé, le sélecteur attend (et les connexions restent dans le backlog).
+    jobs = queue.Queue(maxsize=BACKLOG)
+    selector = ConnectionSelector(sock, jobs)
+    for i in range(WORKERS):
+        threading.Thread(target=_worker, args=(jobs, selector, context, static, stream), name=f"web-{i}", daemon=True).start()
+    selector.run()
+
+
+def run_web_server_thread(context, host='localhost', port=10000):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(BACKLOG)
+    print(f"[WEB] > INFO: Dashboard actif sur http://localhost:{port}")
+    _serve(sock, context)